@@ -13,6 +13,11 @@ from mpcomp.views import (
     get_prev_after_pages_count,
     recruiter_login_required,
 )
+from mpcomp.resume_search import (
+    get_agency_resume_facets,
+    get_keyset_page,
+    rank_resumes,
+)
 from peeldb.models import (
     MONTHS,
     POST,
@@ -347,7 +352,7 @@ def delete_applicant_status(request, applicant_id):
 def view_resumes(request, job_post_id):
     job_post = get_object_or_404(JobPost, id=job_post_id)
     selected_skills = []
-    agency_resumes = AppliedJobs.objects.filter(job_post=job_post)
+    agency_resumes = AgencyApplicants.objects.filter(job_post=job_post)
 
     if request.POST.get("recruiters"):
         agency_resumes = agency_resumes.filter(
@@ -361,6 +366,9 @@ def view_resumes(request, job_post_id):
         skills = Skill.objects.filter(id__in=request.POST.getlist("skills"))
         agency_resumes = agency_resumes.filter(applicant__skill__in=skills)
         selected_skills = request.POST.getlist("skills")
+    agency_resumes = rank_resumes(
+        agency_resumes, request.POST.get("q", "").strip(), "applicant__search_vector"
+    )
 
     if request.POST.get("apply_job"):
         if request.POST.get("jobposts_type"):
@@ -386,21 +394,15 @@ def view_resumes(request, job_post_id):
                     status=request.POST.get("jobposts_type")
                 )
 
-    no_of_jobs = len(agency_resumes)
-    items_per_page = 10
-    no_pages = int(math.ceil(float(len(agency_resumes)) / items_per_page))
-
+    cursor = request.POST.get("cursor") or request.GET.get("cursor")
     try:
-        if int(request.GET.get("page")) > (no_pages + 2):
-            page = 1
-            return HttpResponseRedirect(reverse("jobs:index"))
-        else:
-            page = int(request.GET.get("page"))
-    except Exception:
-        page = 1
-    agency_resumes = agency_resumes[(page - 1) * items_per_page : page * items_per_page]
-    prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
-        page, no_pages
+        rows, next_cursor = get_keyset_page(agency_resumes, cursor, 10)
+    except ValueError:
+        cursor = None
+        rows, next_cursor = get_keyset_page(agency_resumes, None, 10)
+    # facets only change with the filters, not while paging through them
+    facets = (
+        None if cursor else get_agency_resume_facets(agency_resumes, "applicant__")
     )
     skills = Skill.objects.filter(status="Active")
     recruiters = User.objects.filter(company=request.user.company)
@@ -409,17 +411,12 @@ def view_resumes(request, job_post_id):
         "recruiter/company/job_resume_view.html",
         {
             "job_post": job_post,
-            "agency_resumes": agency_resumes,
+            "agency_resumes": rows,
+            "next_cursor": next_cursor,
+            "facets": facets,
             "recruiters": recruiters,
             "years": YEARS,
             "skills": skills,
-            "aft_page": aft_page,
-            "after_page": after_page,
-            "prev_page": prev_page,
-            "previous_page": previous_page,
-            "current_page": page,
-            "last_page": no_pages,
-            "no_of_jobs": no_of_jobs,
             "status": POST,
             "selected_skills": selected_skills,
         },
@@ -498,9 +495,9 @@ def jobs_billing_process(request, job_post_id):
 def hired_candidates(request, job_post_id):
     job_post = get_object_or_404(JobPost, id=job_post_id)
     agency_resumes = job_post.get_hired_applicants()
-    no_of_jobs = len(agency_resumes)
+    no_of_jobs = agency_resumes.count()
     items_per_page = 10
-    no_pages = int(math.ceil(float(len(agency_resumes)) / items_per_page))
+    no_pages = int(math.ceil(float(no_of_jobs) / items_per_page))
 
     try:
         if int(request.GET.get("page")) > (no_pages + 2):
@@ -6,9 +6,11 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from rest_framework.pagination import PageNumberPagination
 from django.db.models import Count, Q
+from django.utils.decorators import method_decorator
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
 
+from mpcomp.db_router import read_replica
 from peeldb.models import Company, JobPost, Industry, City
 from .serializers import CompanyListSerializer, CompanyDetailSerializer
 
@@ -20,6 +22,7 @@ class CompanyPagination(PageNumberPagination):
     max_page_size = 100
 
 
+@method_decorator(read_replica(), name="get")
 class CompanyListView(generics.ListAPIView):
     """
     List all companies with filtering and pagination
@@ -139,6 +142,7 @@ class CompanyListView(generics.ListAPIView):
         return queryset.distinct()
 
 
+@method_decorator(read_replica(), name="get")
 class CompanyDetailView(generics.RetrieveAPIView):
     """
     Get detailed company information by slug
@@ -170,6 +174,7 @@ class CompanyDetailView(generics.RetrieveAPIView):
     tags=['Companies'],
 )
 @api_view(['GET'])
+@read_replica()
 def company_filter_options(request):
     """
     Get available filter options for companies page
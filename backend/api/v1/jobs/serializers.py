@@ -209,10 +209,17 @@ class JobListSerializer(serializers.ModelSerializer):
 
     def get_applicants_count(self, obj):
         """Get number of applicants for this job"""
+        # Bulk lookups annotate the count to avoid a query per job
+        applicants_total = getattr(obj, 'applicants_total', None)
+        if applicants_total is not None:
+            return applicants_total
         return AppliedJobs.objects.filter(job_post=obj).count()
 
     def get_is_saved(self, obj):
         """Check if job is saved by current user"""
+        saved_job_ids = self.context.get('saved_job_ids')
+        if saved_job_ids is not None:
+            return obj.id in saved_job_ids
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return SavedJobs.objects.filter(job_post=obj, user=request.user).exists()
@@ -220,6 +227,9 @@ class JobListSerializer(serializers.ModelSerializer):
 
     def get_is_applied(self, obj):
         """Check if user has already applied for this job"""
+        applied_job_ids = self.context.get('applied_job_ids')
+        if applied_job_ids is not None:
+            return obj.id in applied_job_ids
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return AppliedJobs.objects.filter(job_post=obj, user=request.user).exists()
@@ -0,0 +1,277 @@
+"""
+Tests for Jobs API
+"""
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from peeldb.models import User, JobPost, AppliedJobs, SavedJobs
+
+
+class JobBatchAPITests(TestCase):
+    """Test suite for the bulk job lookup endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.batch_url = reverse("api:v1:jobs:job-batch")
+        self.recruiter = User.objects.create(
+            email="recruiter@mp.com", username="recruiter", user_type="RR"
+        )
+        self.user = User.objects.create(
+            email="seeker@mp.com", username="seeker", user_type="JS"
+        )
+        self.jobs = []
+        for each in range(3):
+            job = JobPost.objects.create(
+                user=self.recruiter,
+                title="Python Developer " + str(each),
+                vacancies=1,
+                description="job post description",
+                job_type="full-time",
+                status="Live",
+            )
+            job.slug = job.get_absolute_url()
+            job.save()
+            self.jobs.append(job)
+        self.disabled_job = JobPost.objects.create(
+            user=self.recruiter,
+            title="Disabled job",
+            vacancies=1,
+            description="job post description",
+            job_type="full-time",
+            status="Disabled",
+        )
+
+    def test_batch_returns_jobs_in_requested_order(self):
+        """Jobs come back in the order they were requested"""
+        ids = [self.jobs[2].id, self.jobs[0].id, self.jobs[1].id]
+        response = self.client.get(
+            self.batch_url, {"ids": ",".join(str(i) for i in ids)}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["job"]["id"] for item in response.data["results"]], ids
+        )
+        self.assertEqual(response.data["not_found"], [])
+
+    def test_batch_marks_missing_and_non_live_jobs(self):
+        """Unknown and non-live jobs are returned as not-found markers"""
+        response = self.client.get(
+            self.batch_url,
+            {"ids": f"{self.jobs[0].id},{self.disabled_job.id},999999"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual([item["found"] for item in results], [True, False, False])
+        self.assertIsNone(results[1]["job"])
+        self.assertEqual(
+            response.data["not_found"], [str(self.disabled_job.id), "999999"]
+        )
+
+    def test_batch_lookup_by_slug(self):
+        """Slugs are normalized the same way as the retrieve endpoint"""
+        slug = self.jobs[1].slug.strip("/")
+        response = self.client.get(self.batch_url, {"slugs": slug})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["job"]["id"], self.jobs[1].id)
+
+    def test_batch_user_flags_and_counts(self):
+        """Saved/applied flags and applicant counts are computed in bulk"""
+        AppliedJobs.objects.create(
+            job_post=self.jobs[0], user=self.user, status="Pending"
+        )
+        SavedJobs.objects.create(job_post=self.jobs[1], user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(
+            self.batch_url, {"ids": f"{self.jobs[0].id},{self.jobs[1].id}"}
+        )
+
+        first, second = [item["job"] for item in response.data["results"]]
+        self.assertTrue(first["is_applied"])
+        self.assertFalse(first["is_saved"])
+        self.assertEqual(first["applicants_count"], 1)
+        self.assertTrue(second["is_saved"])
+        self.assertFalse(second["is_applied"])
+        self.assertEqual(second["applicants_count"], 0)
+
+    def test_batch_requires_lookups(self):
+        """Request without ids or slugs fails"""
+        response = self.client.get(self.batch_url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_rejects_invalid_id(self):
+        """Non-numeric ids are rejected"""
+        response = self.client.get(self.batch_url, {"ids": "abc"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_rejects_out_of_range_id(self):
+        """Ids the id column cannot hold are rejected instead of erroring"""
+        for value in (str(2**31), str(2**63), "\u00b2"):
+            response = self.client.get(
+                self.batch_url, {"ids": "%s,%s" % (self.jobs[0].id, value)}
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_size_limit(self):
+        """Requests above the configured batch size are rejected"""
+        with self.settings(JOBS_BATCH_MAX_SIZE=2):
+            response = self.client.get(
+                self.batch_url,
+                {"ids": ",".join(str(job.id) for job in self.jobs)},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(JOBS_CHANGES_SETTLE_SECONDS=0)
+class JobChangesAPITests(TestCase):
+    """Test suite for the job catalogue delta-sync feed"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.changes_url = reverse("api:v1:jobs:job-changes")
+        self.recruiter = User.objects.create(
+            email="recruiter@mp.com", username="recruiter", user_type="RR"
+        )
+        self.job = JobPost.objects.create(
+            user=self.recruiter,
+            title="Python Developer",
+            vacancies=1,
+            description="job post description",
+            job_type="full-time",
+            status="Draft",
+        )
+
+    def test_publish_and_close_are_recorded(self):
+        """Recruiter status transitions write to the change feed"""
+        self.client.force_authenticate(user=self.recruiter)
+        self.client.post(reverse("api:v1:recruiter:jobs-publish", args=[self.job.id]))
+
+        response = self.client.get(self.changes_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        change = response.data["changes"][0]
+        self.assertEqual(change["change_type"], "Live")
+        self.assertEqual(change["job"]["id"], self.job.id)
+        watermark = response.data["next_since"]
+
+        self.client.post(reverse("api:v1:recruiter:jobs-close", args=[self.job.id]))
+
+        response = self.client.get(self.changes_url, {"since": watermark})
+        self.assertEqual(len(response.data["changes"]), 1)
+        change = response.data["changes"][0]
+        self.assertEqual(change["change_type"], "Disabled")
+        self.assertIsNone(change["job"])
+
+    def test_feed_collapses_and_paginates(self):
+        """Only the latest change per job is returned and pages follow the watermark"""
+        self.job.status = "Live"
+        self.job.save()
+        self.job.log_change("Live")
+        self.job.log_change("Updated")
+        other_job = JobPost.objects.create(
+            user=self.recruiter,
+            title="Java Developer",
+            vacancies=1,
+            description="job post description",
+            job_type="full-time",
+            status="Live",
+        )
+        other_job.log_change("Live")
+
+        response = self.client.get(self.changes_url, {"limit": 2})
+        self.assertTrue(response.data["has_more"])
+        self.assertEqual(
+            [change["change_type"] for change in response.data["changes"]],
+            ["Updated"],
+        )
+
+        response = self.client.get(
+            self.changes_url, {"since": response.data["next_since"], "limit": 2}
+        )
+        self.assertFalse(response.data["has_more"])
+        self.assertEqual(response.data["changes"][0]["job_id"], other_job.id)
+
+    def test_unsettled_changes_are_held_back(self):
+        """Changes younger than the settle lag may still be committing"""
+        self.job.log_change("Updated")
+
+        with self.settings(JOBS_CHANGES_SETTLE_SECONDS=60):
+            response = self.client.get(self.changes_url)
+        self.assertEqual(response.data["changes"], [])
+        self.assertEqual(response.data["next_since"], 0)
+
+    def test_legacy_recruiter_api_is_recorded(self):
+        """Closing a job from the legacy recruiter API writes to the feed"""
+        self.recruiter.user_type = "EM"
+        self.recruiter.save()
+        self.client.force_authenticate(user=self.recruiter)
+        response = self.client.get(
+            reverse("api_recruiter:api_delete_job", args=[self.job.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.changes_url)
+        self.assertEqual(response.data["changes"][0]["change_type"], "Disabled")
+
+    def test_invalid_watermark(self):
+        """Non-numeric watermarks are rejected"""
+        response = self.client.get(self.changes_url, {"since": "yesterday"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class JobConditionalGetTests(TestCase):
+    """Test suite for ETag handling on the job detail endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.recruiter = User.objects.create(
+            email="recruiter@mp.com", username="recruiter", user_type="RR"
+        )
+        self.job = JobPost.objects.create(
+            user=self.recruiter,
+            title="Python Developer",
+            vacancies=1,
+            description="job post description",
+            job_type="full-time",
+            status="Live",
+        )
+        self.detail_url = reverse("api:v1:jobs:job-detail", args=[self.job.id])
+
+    def test_matching_etag_returns_not_modified(self):
+        """A client with the current ETag gets a 304"""
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_when_job_changes(self):
+        """Updating the job or receiving an application invalidates the ETag"""
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        self.job.title = "Senior Python Developer"
+        self.job.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        AppliedJobs.objects.create(job_post=self.job, status="Pending")
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_authenticated_requests_are_not_conditional(self):
+        """Responses with user specific flags carry no ETag"""
+        self.client.force_authenticate(user=self.recruiter)
+        response = self.client.get(self.detail_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header("ETag"))
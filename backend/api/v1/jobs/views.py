@@ -2,6 +2,8 @@
 Job Views for API v1
 Provides job listing, detail, and filter options endpoints
 """
+from datetime import datetime, timedelta
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -10,15 +12,54 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
 from rest_framework import filters as drf_filters
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
+from django.db import connection, transaction
 from django.db.models import Count, Q
+from django.utils.decorators import method_decorator
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
-from peeldb.models import JobPost, City, Skill, Industry, Qualification, SavedJobs, AppliedJobs
+from dashboard.tasks import application_submitted
+from mpcomp.conditional import api_job_conditional_response
+from mpcomp.db_router import read_replica
+from peeldb.models import (
+    JobPost, JobPostChange, City, Skill, Industry, Qualification, SavedJobs, AppliedJobs
+)
 from .serializers import JobListSerializer, JobDetailSerializer
 from .filters import JobFilter
 
 
+def normalize_job_slug(value):
+    """
+    Normalize a job slug to the database format (with leading/trailing slashes)
+    """
+    normalized_slug = value.strip()
+    if not normalized_slug.startswith('/'):
+        normalized_slug = '/' + normalized_slug
+    if not normalized_slug.endswith('/'):
+        normalized_slug = normalized_slug + '/'
+    return normalized_slug
+
+
+def _split_lookup_values(request, param):
+    """Read a lookup param given as comma-separated and/or repeated values"""
+    values = []
+    for raw in request.query_params.getlist(param):
+        values.extend(v.strip() for v in raw.split(',') if v.strip())
+    return values
+
+
+def _parse_job_id(value):
+    """The job id of a lookup value, None unless it fits the id column"""
+    if not (value.isascii() and value.isdigit()):
+        return None
+    low, high = connection.ops.integer_field_range(
+        JobPost._meta.pk.get_internal_type()
+    )
+    job_id = int(value)
+    return job_id if low <= job_id <= high else None
+
+
 class JobPagination(PageNumberPagination):
     """Custom pagination for job listings"""
     page_size = 20
@@ -26,6 +67,10 @@ class JobPagination(PageNumberPagination):
     max_page_size = 100
 
 
+@method_decorator(read_replica(), name="list")
+@method_decorator(read_replica(), name="retrieve")
+@method_decorator(read_replica(), name="batch")
+@method_decorator(read_replica(), name="changes")
 class JobViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for job listings and details.
@@ -95,24 +140,21 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
         Retrieve job by ID or slug
         Supports both numeric ID and string slug
         Normalizes slug to match database format (with leading/trailing slashes)
+        Anonymous requests with a matching If-None-Match get a 304 before serialization
         """
         lookup_value = kwargs.get('id')
+        if lookup_value.isdigit():
+            lookup = {'id': int(lookup_value)}
+        else:
+            lookup = {'slug': normalize_job_slug(lookup_value)}
+
+        not_modified, etag = api_job_conditional_response(request, lookup)
+        if not_modified is not None:
+            return not_modified
 
-        # Try to retrieve by ID first
         try:
-            if lookup_value.isdigit():
-                instance = self.get_queryset().get(id=int(lookup_value))
-            else:
-                # Normalize slug: ensure it starts and ends with /
-                # Database slugs are stored as /slug-text/
-                normalized_slug = lookup_value.strip()
-                if not normalized_slug.startswith('/'):
-                    normalized_slug = '/' + normalized_slug
-                if not normalized_slug.endswith('/'):
-                    normalized_slug = normalized_slug + '/'
-
-                # Try by normalized slug
-                instance = self.get_queryset().get(slug=normalized_slug)
+            # Database slugs are stored as /slug-text/
+            instance = self.get_queryset().get(**lookup)
         except JobPost.DoesNotExist:
             return Response(
                 {'detail': 'Job not found.'},
@@ -120,7 +162,240 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
             )
 
         serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        response = Response(serializer.data)
+        if etag:
+            response['ETag'] = etag
+        return response
+
+    @extend_schema(
+        summary="Get jobs in bulk",
+        description=(
+            "Fetch several jobs by ID and/or slug in a single request. "
+            "Results are returned in the requested order (ids first, then slugs); "
+            "lookups that do not match a live job are returned as not-found markers."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='ids',
+                type=OpenApiTypes.STR,
+                description='Comma-separated job IDs (can also be specified multiple times)',
+                required=False,
+            ),
+            OpenApiParameter(
+                name='slugs',
+                type=OpenApiTypes.STR,
+                description='Comma-separated job slugs (can also be specified multiple times)',
+                required=False,
+            ),
+        ],
+        responses={
+            200: {
+                'type': 'object',
+                'properties': {
+                    'results': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'lookup': {'type': 'string'},
+                                'found': {'type': 'boolean'},
+                                'job': {'type': 'object', 'nullable': True},
+                            }
+                        }
+                    },
+                    'not_found': {'type': 'array', 'items': {'type': 'string'}},
+                }
+            },
+            400: {'description': 'No lookups, an invalid id or too many lookups'},
+        },
+        tags=['Jobs'],
+    )
+    @action(detail=False, methods=['get'], url_path='batch')
+    def batch(self, request):
+        """
+        Bulk lookup of jobs by ID and/or slug.
+        All jobs are loaded with one prefetch-batched query instead of
+        one retrieve call per job.
+        """
+        max_size = getattr(settings, 'JOBS_BATCH_MAX_SIZE', 50)
+        lookups = []
+        seen = set()
+        for value in _split_lookup_values(request, 'ids'):
+            job_id = _parse_job_id(value)
+            if job_id is None:
+                return Response(
+                    {'error': f'Invalid job id: {value}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if ('id', job_id) not in seen:
+                seen.add(('id', job_id))
+                lookups.append(('id', job_id, value))
+        for value in _split_lookup_values(request, 'slugs'):
+            slug = normalize_job_slug(value)
+            if ('slug', slug) not in seen:
+                seen.add(('slug', slug))
+                lookups.append(('slug', slug, value))
+
+        if not lookups:
+            return Response(
+                {'error': 'ids or slugs is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(lookups) > max_size:
+            return Response(
+                {'error': f'A maximum of {max_size} jobs can be requested at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ids = [key for kind, key, _ in lookups if kind == 'id']
+        slugs = [key for kind, key, _ in lookups if kind == 'slug']
+        jobs = list(
+            self.get_queryset()
+            .filter(Q(id__in=ids) | Q(slug__in=slugs))
+            .annotate(applicants_total=Count('appliedjobs', distinct=True))
+        )
+        jobs_by_id = {job.id: job for job in jobs}
+        jobs_by_slug = {job.slug: job for job in jobs}
+
+        context = self.get_serializer_context()
+        if request.user.is_authenticated:
+            job_ids = list(jobs_by_id)
+            context['saved_job_ids'] = set(
+                SavedJobs.objects.filter(user=request.user, job_post_id__in=job_ids)
+                .values_list('job_post_id', flat=True)
+            )
+            context['applied_job_ids'] = set(
+                AppliedJobs.objects.filter(user=request.user, job_post_id__in=job_ids)
+                .values_list('job_post_id', flat=True)
+            )
+
+        results = []
+        not_found = []
+        for kind, key, value in lookups:
+            job = jobs_by_id.get(key) if kind == 'id' else jobs_by_slug.get(key)
+            if job is None:
+                not_found.append(value)
+                results.append({'lookup': value, 'found': False, 'job': None})
+            else:
+                results.append({
+                    'lookup': value,
+                    'found': True,
+                    'job': JobListSerializer(job, context=context).data,
+                })
+
+        return Response({'results': results, 'not_found': not_found})
+
+    @extend_schema(
+        summary="Get job catalogue changes",
+        description=(
+            "Delta-sync feed of jobs that went live, were updated, expired or were "
+            "disabled after the given change id. Changes are served once they are "
+            "a few seconds old. Only the latest change of each job "
+            "within a page is returned; `job` is null when the job is no longer live. "
+            "Pass `next_since` from the response as `since` to fetch the next page."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='since',
+                type=OpenApiTypes.INT,
+                description='Change id watermark from the previous sync (default: 0)',
+                required=False,
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                description='Maximum number of change records to scan (max 500)',
+                required=False,
+            ),
+        ],
+        responses={
+            200: {
+                'type': 'object',
+                'properties': {
+                    'changes': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'change_id': {'type': 'integer'},
+                                'job_id': {'type': 'integer'},
+                                'change_type': {'type': 'string'},
+                                'status': {'type': 'string'},
+                                'changed_on': {'type': 'string', 'format': 'date-time'},
+                                'job': {'type': 'object', 'nullable': True},
+                            }
+                        }
+                    },
+                    'next_since': {'type': 'integer'},
+                    'has_more': {'type': 'boolean'},
+                }
+            },
+            400: {'description': 'Invalid since or limit'},
+        },
+        tags=['Jobs'],
+    )
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        """
+        Incremental sync of the job catalogue, paginated by the monotonic
+        JobPostChange id
+        """
+        max_limit = getattr(settings, 'JOBS_CHANGES_MAX_PAGE_SIZE', 500)
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = int(request.query_params.get('limit', 100))
+        except ValueError:
+            return Response(
+                {'error': 'since and limit must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if since < 0 or limit < 1:
+            return Response(
+                {'error': 'since must be >= 0 and limit must be >= 1'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = min(limit, max_limit)
+
+        # ids are taken at insert, not at commit: a change still being committed
+        # can have a lower id than a visible one, so only settled changes are
+        # served and a client never moves its watermark past an unseen change
+        settle_seconds = getattr(settings, 'JOBS_CHANGES_SETTLE_SECONDS', 10)
+        change_rows = list(
+            JobPostChange.objects.filter(
+                id__gt=since,
+                changed_on__lt=datetime.now() - timedelta(seconds=settle_seconds),
+            ).order_by('id')[:limit + 1]
+        )
+        has_more = len(change_rows) > limit
+        change_rows = change_rows[:limit]
+
+        # Keep only the latest change of each job within this page
+        latest = {}
+        for change in change_rows:
+            latest[change.job_post_id] = change
+        page_changes = sorted(latest.values(), key=lambda change: change.id)
+
+        live_jobs = self.get_queryset().filter(id__in=latest.keys())
+        jobs_by_id = {job.id: job for job in live_jobs}
+        context = self.get_serializer_context()
+
+        results = []
+        for change in page_changes:
+            job = jobs_by_id.get(change.job_post_id)
+            results.append({
+                'change_id': change.id,
+                'job_id': change.job_post_id,
+                'change_type': change.change_type,
+                'status': change.status,
+                'changed_on': change.changed_on,
+                'job': JobListSerializer(job, context=context).data if job else None,
+            })
+
+        return Response({
+            'changes': results,
+            'next_since': change_rows[-1].id if change_rows else since,
+            'has_more': has_more,
+        })
 
     @extend_schema(
         summary="List jobs",
@@ -395,6 +670,7 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
             ip_address=ip_address,
             user_agent=user_agent
         )
+        transaction.on_commit(lambda: application_submitted.delay(application.id))
 
         return Response(
             {
@@ -405,6 +681,7 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
         )
 
 
+@method_decorator(read_replica(), name="get")
 class JobFilterOptionsView(APIView):
     """
     API endpoint to get available filter options with job counts.
@@ -1,3 +1,4 @@
+from django.utils.decorators import method_decorator
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -5,6 +6,7 @@ from rest_framework.permissions import AllowAny
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
+from mpcomp.db_router import read_replica
 from peeldb.models import Country, State, City
 from .serializers import (
     CountrySerializer,
@@ -14,6 +16,7 @@ from .serializers import (
 )
 
 
+@method_decorator(read_replica(), name="get")
 class CountryListView(APIView):
     """
     Get list of all enabled countries
@@ -32,6 +35,7 @@ class CountryListView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@method_decorator(read_replica(), name="get")
 class StateListView(APIView):
     """
     Get list of states, optionally filtered by country
@@ -66,6 +70,7 @@ class StateListView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@method_decorator(read_replica(), name="get")
 class CityListView(APIView):
     """
     Get list of cities, optionally filtered by state or country
@@ -121,6 +126,7 @@ class CityListView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@method_decorator(read_replica(), name="get")
 class CityDetailView(APIView):
     """
     Get details of a specific city
@@ -9,6 +9,9 @@ from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample
 from django.utils import timezone
 
+from dashboard.tasks import process_resume
+from mpcomp.views import get_resume_status
+
 from .serializers import ProfileSerializer, ProfileUpdateSerializer
 
 
@@ -189,6 +192,21 @@ class ProfileUploadView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
+    @extend_schema(
+        summary="Get resume processing status",
+        description="Status of the text extraction of the last uploaded resume: pending, processing, completed or failed",
+        responses={
+            200: OpenApiResponse(description="Resume processing status"),
+            401: OpenApiResponse(description="Authentication required")
+        },
+        tags=["Profile"]
+    )
+    def get(self, request):
+        """Get resume text extraction status"""
+        return Response(
+            {'status': get_resume_status(request.user)}, status=status.HTTP_200_OK
+        )
+
     @extend_schema(
         summary="Upload profile picture",
         description="Upload or update the user's profile picture",
@@ -287,13 +305,18 @@ class ProfileUploadView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
+            # Text extraction runs in the background, poll GET for its status
             user.resume = file
+            user.resume_status = 'pending'
             user.save()
 
+            process_resume.delay(user.id, user.resume.name)
+
             return Response(
                 {
                     'message': 'Resume uploaded successfully',
-                    'resume_url': request.build_absolute_uri(user.resume.url)
+                    'resume_url': request.build_absolute_uri(user.resume.url),
+                    'resume_status': 'pending'
                 },
                 status=status.HTTP_200_OK
             )
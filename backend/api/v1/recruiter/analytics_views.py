@@ -9,11 +9,13 @@ from rest_framework.response import Response
 from django.db.models import Count
 from django.utils import timezone
 from datetime import timedelta, datetime, date
+from mpcomp.db_router import read_replica
 from peeldb.models import JobPost, AppliedJobs
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@read_replica()
 def get_application_analytics(request):
     """
     Get comprehensive application analytics for recruiter
@@ -204,6 +206,7 @@ def get_application_analytics(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@read_replica()
 def get_job_application_analytics(request, job_id):
     """
     Get application analytics for a specific job
@@ -8,8 +8,11 @@ from peeldb.models import (
     AppliedJobs, User
 )
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.text import slugify
 
+from mpcomp.job_publishing import get_expiry_cutoff
+
 
 class RecruiterJobListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for recruiter's job listings"""
@@ -105,17 +108,17 @@ class RecruiterJobListSerializer(serializers.ModelSerializer):
             months = diff.days // 30
             return f"{months}mo ago"
 
+    @cached_property
+    def expiry_cutoff(self):
+        return get_expiry_cutoff()
+
     def get_days_until_expiry(self, obj):
-        """Calculate days until job expires (30-day rule from published_on)"""
+        """Days until the job expires, from the cutoff shared by the whole list"""
         if not obj.published_on:
             return None
-
-        from django.conf import settings
-        max_age_days = getattr(settings, 'JOB_APPLICATION_MAX_AGE_DAYS', 30)
-        age = timezone.now() - obj.published_on
-        days_remaining = max_age_days - age.days
-
-        return days_remaining if days_remaining >= 0 else 0
+        if obj.status == 'Expired':
+            return 0
+        return max((obj.published_on.date() - self.expiry_cutoff).days, 0)
 
     def get_is_expiring_soon(self, obj):
         """Check if job is expiring within 7 days"""
@@ -654,3 +657,29 @@ class ApplicantDetailSerializer(serializers.ModelSerializer):
             })
 
         return certifications
+
+
+class ResumeSearchResultSerializer(serializers.ModelSerializer):
+    """Compact candidate card for resume search results"""
+    current_city = serializers.CharField(source='current_city.name', default=None)
+    skills = serializers.SerializerMethodField()
+    score = serializers.FloatField(source='rank')
+
+    class Meta:
+        model = User
+        fields = [
+            'id',
+            'first_name',
+            'last_name',
+            'job_title',
+            'year',
+            'month',
+            'current_city',
+            'skills',
+            'resume_title',
+            'profile_updated',
+            'score',
+        ]
+
+    def get_skills(self, obj):
+        return [tech_skill.skill.name for tech_skill in obj.skills.all()]
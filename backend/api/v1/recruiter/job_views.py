@@ -306,6 +306,7 @@ def publish_job(request, job_id):
     job.status = 'Live'
     job.published_on = timezone.now()
     job.save()
+    job.log_change('Live')
 
     serializer = RecruiterJobDetailSerializer(job, context={'request': request})
     return Response({
@@ -342,6 +343,7 @@ def close_job(request, job_id):
 
     job.status = 'Disabled'
     job.save()
+    job.log_change('Disabled')
 
     serializer = RecruiterJobDetailSerializer(job, context={'request': request})
     return Response({
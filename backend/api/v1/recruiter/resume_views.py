@@ -0,0 +1,81 @@
+"""
+Resume search endpoints for recruiters
+Ranked full text search over job seeker profiles with facets and keyset pagination
+"""
+
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
+from django.conf import settings
+
+from mpcomp.resume_search import get_keyset_page, get_user_facets, rank_resumes
+from peeldb.models import User
+from .job_serializers import ResumeSearchResultSerializer
+
+
+@extend_schema(
+    tags=["Recruiter - Resumes"],
+    summary="Search Resumes",
+    description="Ranked full text search over job seeker resumes, skills, role and city",
+    parameters=[
+        OpenApiParameter('q', OpenApiTypes.STR, description='Search text, supports "quoted phrases", OR and -exclusions'),
+        OpenApiParameter('city', OpenApiTypes.STR, description='Filter by current city name'),
+        OpenApiParameter('experience', OpenApiTypes.STR, description='Filter by years of experience'),
+        OpenApiParameter('skill', OpenApiTypes.STR, description='Filter by skill name'),
+        OpenApiParameter('cursor', OpenApiTypes.STR, description='next_cursor of the previous page'),
+        OpenApiParameter('limit', OpenApiTypes.INT, description='Page size (default: 20)'),
+    ],
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_resumes(request):
+    """Search job seeker resumes"""
+    if not request.user.is_recruiter:
+        return Response(
+            {"error": "Only recruiters can search resumes"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    max_limit = getattr(settings, 'RESUME_SEARCH_MAX_PAGE_SIZE', 50)
+    try:
+        limit = int(request.GET.get('limit', 20))
+    except ValueError:
+        return Response({"error": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+    if limit < 1 or limit > max_limit:
+        return Response(
+            {"error": f"limit must be between 1 and {max_limit}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    candidates = User.objects.filter(user_type='JS', is_active=True)
+    if request.GET.get('city'):
+        candidates = candidates.filter(current_city__name__iexact=request.GET['city'])
+    if request.GET.get('experience'):
+        candidates = candidates.filter(year=request.GET['experience'])
+    if request.GET.get('skill'):
+        candidates = candidates.filter(
+            skills__skill__name__iexact=request.GET['skill']
+        ).distinct()
+
+    results = rank_resumes(candidates, request.GET.get('q', '').strip())
+    cursor = request.GET.get('cursor')
+    try:
+        rows, next_cursor = get_keyset_page(
+            results.select_related('current_city').prefetch_related('skills__skill'),
+            cursor,
+            limit
+        )
+    except ValueError:
+        return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = {
+        "results": ResumeSearchResultSerializer(rows, many=True).data,
+        "next_cursor": next_cursor,
+    }
+    # Facets only change with the filters, not while paging through them
+    if not cursor:
+        data["facets"] = get_user_facets(results)
+    return Response(data)
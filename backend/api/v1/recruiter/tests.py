@@ -0,0 +1,98 @@
+"""
+Tests for Recruiter API
+"""
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from mpcomp.resume_search import update_user_search_vectors
+from peeldb.models import User, Skill, TechnicalSkill, Country, State, City
+
+
+class ResumeSearchAPITests(TestCase):
+    """Test suite for recruiter resume search"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.search_url = reverse("api:v1:recruiter:resumes-search")
+        self.recruiter = User.objects.create(
+            email="recruiter@mp.com", username="recruiter", user_type="EM"
+        )
+        country = Country.objects.create(name="India", slug="india")
+        state = State.objects.create(name="Karnataka", slug="karnataka", country=country)
+        self.city = City.objects.create(name="Bangalore", slug="bangalore", state=state)
+        python = Skill.objects.create(name="Python", slug="python")
+        java = Skill.objects.create(name="Java", slug="java")
+
+        self.python_dev = self.create_seeker(
+            "python@mp.com", "Backend developer building Django services", python
+        )
+        self.java_dev = self.create_seeker(
+            "java@mp.com", "Spring developer, some python scripting", java
+        )
+        self.other = self.create_seeker("other@mp.com", "Accountant", None)
+        update_user_search_vectors(
+            [self.python_dev.id, self.java_dev.id, self.other.id]
+        )
+        self.client.force_authenticate(user=self.recruiter)
+
+    def create_seeker(self, email, resume_text, skill):
+        user = User.objects.create(
+            email=email,
+            username=email,
+            user_type="JS",
+            is_active=True,
+            resume_text=resume_text,
+            current_city=self.city,
+        )
+        if skill:
+            user.skills.add(TechnicalSkill.objects.create(skill=skill))
+        return user
+
+    def test_results_are_ranked(self):
+        """Skill matches rank above resume text matches"""
+        response = self.client.get(self.search_url, {"q": "python"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["id"] for result in response.data["results"]],
+            [self.python_dev.id, self.java_dev.id],
+        )
+        self.assertEqual(response.data["results"][0]["skills"], ["Python"])
+        self.assertEqual(response.data["facets"]["cities"][0]["count"], 2)
+
+    def test_keyset_pagination(self):
+        """Pages follow the cursor without repeating candidates"""
+        response = self.client.get(self.search_url, {"q": "python", "limit": 1})
+        first = response.data["results"][0]["id"]
+        self.assertIsNotNone(response.data["next_cursor"])
+
+        response = self.client.get(
+            self.search_url,
+            {"q": "python", "limit": 1, "cursor": response.data["next_cursor"]},
+        )
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertNotEqual(response.data["results"][0]["id"], first)
+        self.assertIsNone(response.data["next_cursor"])
+        self.assertNotIn("facets", response.data)
+
+    def test_filters(self):
+        """Skill filter narrows results without a search text"""
+        response = self.client.get(self.search_url, {"skill": "java"})
+
+        self.assertEqual(
+            [result["id"] for result in response.data["results"]], [self.java_dev.id]
+        )
+
+    def test_invalid_cursor(self):
+        """Malformed cursors are rejected"""
+        response = self.client.get(self.search_url, {"cursor": "abc"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_job_seekers_cannot_search(self):
+        """Only recruiters can search resumes"""
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get(self.search_url, {"q": "python"})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -2,7 +2,7 @@
 URL routing for Recruiter API (Auth + Team Management + Jobs + Analytics)
 """
 from django.urls import path
-from . import views, auth_views, job_views, analytics_views
+from . import views, auth_views, job_views, analytics_views, resume_views
 
 app_name = "recruiter"
 
@@ -77,6 +77,9 @@ urlpatterns = [
     path("jobs/<int:job_id>/applicants/<int:applicant_id>/", job_views.get_applicant_detail, name="applicant-detail"),
     path("jobs/<int:job_id>/applicants/<int:applicant_id>/update/", job_views.update_applicant_status, name="applicant-update"),
 
+    # ===== RESUME SEARCH =====
+    path("resumes/search/", resume_views.search_resumes, name="resumes-search"),
+
     # ===== COMPANY PROFILE =====
     path("company/profile/", views.get_company_profile, name="company-profile"),
     path("company/profile/update/", views.update_company_profile, name="company-profile-update"),
@@ -1,3 +1,4 @@
+from django.utils.decorators import method_decorator
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -5,6 +6,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
+from mpcomp.db_router import read_replica
 from peeldb.models import Skill, TechnicalSkill
 from .serializers import (
     SkillSerializer,
@@ -13,6 +15,7 @@ from .serializers import (
 )
 
 
+@method_decorator(read_replica(), name="get")
 class SkillListView(APIView):
     """
     Get list of all available skills with optional search
@@ -5,10 +5,24 @@ when you run "manage.py test".
 Replace this with more appropriate tests for your application.
 """
 
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from .forms import *
 from peeldb.models import *
+from peeldb.testing import create_job
+from dashboard.tasks import process_resume
+from mpcomp.views import get_email_resume, get_resume_status
+from rest_framework.test import APIClient
 
 
 class personalinfo_form_test(TestCase):
@@ -336,3 +350,162 @@ class applicant_get_views_test(TestCase):
         response = self.client.get("/")
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "index.html")
+
+
+class resume_processing_test(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.user = User.objects.create(
+            email="applicant@mp.com", username="applicant", user_type="JS"
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.media_root)
+
+    def get_docx(self, *paragraphs):
+        document = io.BytesIO()
+        body = "".join("<w:p><w:r><w:t>%s</w:t></w:r></w:p>" % p for p in paragraphs)
+        with zipfile.ZipFile(document, "w") as docx:
+            docx.writestr(
+                "word/document.xml",
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+                'wordprocessingml/2006/main"><w:body>%s</w:body></w:document>' % body,
+            )
+        return document.getvalue()
+
+    def test_contact_details(self):
+        self.assertEqual(
+            get_email_resume("Mobile 9876543210, mail me at a.b@mp.com or 1234567890"),
+            ("a.b@mp.com", "9876543210"),
+        )
+
+    def test_resume_text_extracted_in_background(self):
+        with self.settings(MEDIA_ROOT=self.media_root):
+            self.user.resume.save(
+                "resume.docx",
+                ContentFile(self.get_docx("Python Developer", "Call 9876543210")),
+            )
+            process_resume(self.user.id, self.user.resume.name)
+
+        self.user.refresh_from_db()
+        self.assertIn("Python Developer", self.user.resume_text)
+        self.assertEqual(self.user.mobile, "9876543210")
+        self.assertEqual(get_resume_status(self.user), "completed")
+
+    def test_replaced_resume_is_skipped(self):
+        process_resume(self.user.id, "resume/old.docx")
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.resume_text)
+
+    def test_status_is_read_from_the_profile(self):
+        self.user.resume = "resume/cv.docx"
+        self.user.resume_status = "pending"
+        self.user.save()
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get("/api/v1/profile/upload/")
+        self.assertEqual(response.json(), {"status": "pending"})
+
+
+class related_jobs_test(TestCase):
+    def setUp(self):
+        cache.clear()
+        country = Country.objects.create(name="India", slug="india")
+        state = State.objects.create(name="Telangana", slug="telangana", country=country)
+        self.city = City.objects.create(name="Hyderabad", slug="hyderabad", state=state)
+        self.python = Skill.objects.create(name="Python", slug="python")
+        self.recruiter = User.objects.create(
+            email="recruiter@mp.com", username="recruiter", user_type="EM"
+        )
+        self.user = User.objects.create(
+            email="applicant@mp.com",
+            username="applicant",
+            user_type="JS",
+            current_city=self.city,
+            year="3",
+        )
+        self.user.skills.add(TechnicalSkill.objects.create(skill=self.python))
+
+    def test_jobs_are_ranked_by_match(self):
+        unrelated = create_job(self.recruiter, "Accountant")
+        city_job = create_job(self.recruiter, "Support", locations=[self.city])
+        best = create_job(
+            self.recruiter,
+            "Python Developer",
+            [self.python],
+            [self.city],
+            min_year=2,
+            max_year=5,
+        )
+
+        self.assertEqual(self.user.related_jobs(), [best, city_job, unrelated])
+
+    def test_applied_jobs_are_excluded(self):
+        applied = create_job(self.recruiter, "Python Developer", [self.python])
+        other = create_job(self.recruiter, "Django Developer", [self.python])
+        AppliedJobs.objects.create(job_post=applied, user=self.user, status="Pending")
+
+        self.assertEqual(self.user.related_jobs(), [other])
+
+    def test_cached_matches_skip_new_applications(self):
+        applied = create_job(self.recruiter, "Python Developer", [self.python])
+        other = create_job(self.recruiter, "Django Developer", [self.python])
+        self.assertEqual(set(self.user.related_jobs()), {applied, other})
+
+        AppliedJobs.objects.create(job_post=applied, user=self.user, status="Pending")
+
+        self.assertEqual(self.user.related_jobs(), [other])
+
+    def test_walkin_jobs(self):
+        walkin = create_job(
+            self.recruiter, "Python Walk-in", [self.python], job_type="walk-in"
+        )
+        create_job(self.recruiter, "Python Developer", [self.python])
+
+        self.assertEqual(self.user.related_walkin_jobs(), [walkin])
+
+
+class profile_completeness_test(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            email="applicant@mp.com", username="applicant", user_type="JS"
+        )
+        self.python = Skill.objects.create(name="Python", slug="python")
+
+    def test_profile_edits_update_completeness(self):
+        self.assertEqual(self.user.profile_completion_percentage, 0)
+
+        self.user.mobile = "9999999999"
+        self.user.year = "2"
+        self.user.save()
+        self.assertEqual(self.user.profile_completion_percentage, 30)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_completeness, 30)
+
+    def test_related_changes_update_completeness(self):
+        skill = TechnicalSkill.objects.create(skill=self.python)
+        self.user.skills.add(skill)
+        self.assertEqual(self.user.profile_completeness, 15)
+
+        project = Project.objects.create(name="Job portal")
+        project.user_set.add(self.user)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_completeness, 25)
+
+        skill.delete()
+        project.delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_completeness, 0)
+
+    def test_dashboard_does_not_save_profile(self):
+        self.user.is_active = True
+        self.user.email_verified = True
+        self.user.set_password("secret")
+        self.user.save()
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/my/home/")
+        self.assertFalse(
+            [q for q in queries if q["sql"].startswith('UPDATE "peeldb_user"')]
+        )
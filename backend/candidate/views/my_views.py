@@ -8,8 +8,8 @@ from django.utils import timezone
 from datetime import datetime
 
 from mpcomp.views import jobseeker_login_required
-from mpcomp.views import get_resume_data, handle_uploaded_file
 from peeldb.models import City, Country, FunctionalArea, Industry, Language, Skill, UserMessage, Project, UserLanguage, EmploymentHistory, EducationDetails, EducationInstitue, Degree, Qualification, TechnicalSkill, Certification
+from dashboard.tasks import process_resume
 
 from candidate.forms import (
     YEARS,
@@ -23,8 +23,6 @@ def my_home(request):
     """need to check user login or not"""
     messages = UserMessage.objects.filter(message_to=request.user.id, is_read=False)
     user = request.user
-    user.profile_completeness = user.profile_completion_percentage
-    user.save()
 
     nationality = ""
     functional_areas = FunctionalArea.objects.filter(status="Active").order_by(
@@ -1813,22 +1811,11 @@ def upload_resume_modal(request):
             # Save new resume using FileField - django-storages handles S3 automatically
             request.user.resume = resume_file
             request.user.profile_updated = timezone.now()
-            
-            # Extract resume data (optional - keep existing functionality)
-            try:
-                handle_uploaded_file(resume_file, resume_file.name)
-                email, mobile, text = get_resume_data(resume_file)
-                request.user.resume_text = text
-                
-                # Update mobile if not set
-                if not request.user.mobile and mobile:
-                    request.user.mobile = mobile
-                    
-            except Exception:
-                # Continue even if text extraction fails
-                pass
-            
+            # Resume text, email and mobile are extracted in the background
+            request.user.resume_status = "pending"
             request.user.save()
+
+            process_resume.delay(request.user.id, request.user.resume.name)
             
             # Get resume URL directly from FileField
             resume_url = request.user.resume.url if request.user.resume else None
@@ -1994,22 +1981,11 @@ def update_resume_modal(request):
             # Save new resume using FileField - django-storages handles S3 automatically
             request.user.resume = resume_file
             request.user.profile_updated = timezone.now()
-            
-            # Extract resume data
-            try:
-                handle_uploaded_file(resume_file, resume_file.name)
-                email, mobile, text = get_resume_data(resume_file)
-                request.user.resume_text = text
-                
-                # Update mobile if not set
-                if not request.user.mobile and mobile:
-                    request.user.mobile = mobile
-                    
-            except Exception:
-                # Continue even if text extraction fails
-                pass
-            
+            # Resume text, email and mobile are extracted in the background
+            request.user.resume_status = "pending"
             request.user.save()
+
+            process_resume.delay(request.user.id, request.user.resume.name)
             
             # Get resume URL directly from FileField
             resume_url = request.user.resume.url if request.user.resume else None
@@ -2073,8 +2049,6 @@ def edit_basic_profile(request):
             user.year = year if year else ''
             user.month = month if month else ''
             
-            # Update profile completeness
-            user.profile_completeness = user.profile_completion_percentage
             user.profile_updated = timezone.now()
             
             user.save()
@@ -6,10 +6,7 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 
 from mpcomp.s3_utils import S3Connection
-from mpcomp.views import (
-    get_resume_data,
-    handle_uploaded_file,
-)
+from dashboard.tasks import process_resume
 
 
 @login_required
@@ -56,20 +53,17 @@ def upload_resume(request):
                 )
                 request.user.resume = path
                 request.user.profile_updated = timezone.now()
-                handle_uploaded_file(
-                    request.FILES["resume"], request.FILES["resume"].name
-                )
-                email, mobile, text = get_resume_data(request.FILES["resume"])
-                request.user.resume_text = text
-                if not request.user.mobile:
-                    request.user.mobile = mobile
+                request.user.resume_status = "pending"
                 request.user.save()
+                process_resume.delay(request.user.id, path)
                 data = {
                     "error": False,
                     "data": "Resume Uploaded Successfully",
                     "profile_percantage": request.user.profile_completion_percentage,
                     "upload_resume": True,
-                    "email": email,
+                    # parsed in the background, kept for clients reading the key
+                    "email": None,
+                    "resume_status": "pending",
                     "resume_name": request.FILES["resume"].name,
                     "resume_path": "https://"
                     + settings.AWS_STORAGE_BUCKET_NAME
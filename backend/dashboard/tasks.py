@@ -1,26 +1,61 @@
 import math
+import mimetypes
+import os
 from datetime import datetime, timedelta
 from itertools import chain
 
 from django.conf import settings
-from django.core.mail import EmailMessage
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
 
 # from pytz import timezone
-from django.db.models import Case, Q, When
+from django.db.models import Case, Count, F, Q, When, Window
+from django.db.models.functions import RowNumber
 from django.template import loader
 
 # from jobsp.celery import app
 from jobsp.celery import app
-from mpcomp.views import get_absolute_url
+from jobsp.thumbnailname import SEOThumbnailBackend
+from mpcomp.views import (
+    extract_resume_text,
+    get_email_resume,
+    set_resume_status,
+)
+from mpcomp.aws import create_cloudfront_invalidation, pop_cloudfront_invalidations
+from mpcomp.db_router import read_replica
+from mpcomp.fanout import (
+    FanOut,
+    fan_out_summary,
+    register_fan_out,
+    resume_fan_outs,
+    run_chunk,
+    start_fan_out,
+)
+from mpcomp.job_publishing import expire_jobs, move_due_jobs_live
+from mpcomp.job_similarity import update_job_neighbours
+from mpcomp.job_slugs import update_job_slugs
+from mpcomp.resume_search import (
+    SEARCH_VECTOR_UPDATERS,
+    update_agency_resume_search_vectors,
+    update_user_search_vectors,
+)
+from mpcomp.search_log import (
+    flush_search_log,
+    get_search_event,
+    save_search_events,
+)
+from psite.sitemaps import build_sitemap_snapshot
 from peeldb.models import (
+    AgencyResume,
     AppliedJobs,
     City,
     Company,
     Industry,
     JobAlert,
     JobPost,
+    JobPostChange,
+    MailTemplate,
     Qualification,
-    SearchResult,
     SentMail,
     Skill,
     State,
@@ -83,6 +118,125 @@ def send_email(mto, msubject, mbody, reply_to=None):
         raise
 
 
+def send_each(emails):
+    """
+    Send emails one at a time over one connection.
+    Returns the indexes of the emails that failed and the last error.
+    """
+    import logging
+
+    logger = logging.getLogger(__name__)
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.error(f"Failed to open the email connection: {str(e)}")
+        return list(range(len(emails))), e
+    failed, error = [], None
+    try:
+        for index, msg in enumerate(emails):
+            try:
+                connection.send_messages([msg])
+            except Exception as e:
+                logger.error(f"Failed to send email to {msg.to}: {str(e)}")
+                failed.append(index)
+                error = e
+    finally:
+        connection.close()
+    return failed, error
+
+
+@app.task(bind=True, max_retries=5, default_retry_delay=60)
+def send_bulk_email(self, recipients, msubject, mbody):
+    """
+    Send the same email to each recipient separately, over one connection.
+    Only the recipients that failed are retried.
+    """
+    messages = []
+    for mto in recipients:
+        msg = EmailMessage(msubject, mbody, settings.DEFAULT_FROM_EMAIL, [mto])
+        msg.content_subtype = "html"
+        messages.append(msg)
+    failed, error = send_each(messages)
+    if failed:
+        raise self.retry(
+            args=([recipients[index] for index in failed], msubject, mbody), exc=error
+        )
+    return len(messages)
+
+
+@app.task(bind=True, max_retries=5, default_retry_delay=60)
+def send_emails(self, messages):
+    """
+    Send a batch of emails, each [mto, msubject, mbody], over one connection.
+    Only the emails that failed are retried.
+    """
+    emails = []
+    for mto, msubject, mbody in messages:
+        if not isinstance(mto, list):
+            mto = [mto]
+        msg = EmailMessage(msubject, mbody, settings.DEFAULT_FROM_EMAIL, mto)
+        msg.content_subtype = "html"
+        emails.append(msg)
+    failed, error = send_each(emails)
+    if failed:
+        raise self.retry(args=([messages[index] for index in failed],), exc=error)
+    return len(emails)
+
+
+@app.task(acks_late=True)
+def fan_out_chunk(chunk_id):
+    """Send the emails of a chunk of a fan-out run, see mpcomp.fanout"""
+    chunk = run_chunk(chunk_id)
+    return {"chunk": chunk.id, "sent": chunk.sent, "skipped": chunk.skipped}
+
+
+@app.task()
+def resume_stalled_fan_outs():
+    return resume_fan_outs()
+
+
+@app.task(bind=True, max_retries=5, default_retry_delay=60)
+def application_submitted(self, application_id):
+    """Email the recruiter about a new application, with the resume attached"""
+    # claim the notification first, a retried or duplicated event sends it once
+    claimed = AppliedJobs.objects.filter(
+        id=application_id, recruiter_notified_on__isnull=True
+    ).update(recruiter_notified_on=datetime.now())
+    if not claimed:
+        return
+    application = AppliedJobs.objects.select_related("user", "job_post__user").get(
+        id=application_id
+    )
+    job_post = application.job_post
+    try:
+        rendered = loader.get_template("email/applicant_apply_job.html").render(
+            {"user": application.user, "recruiter": job_post.user, "job_post": job_post}
+        )
+        msg = EmailMessage(
+            "Resume Alert - " + job_post.title,
+            rendered,
+            settings.DEFAULT_FROM_EMAIL,
+            [job_post.user.email],
+        )
+        msg.content_subtype = "html"
+        resume = application.user.resume
+        if resume:
+            try:
+                with resume.open("rb") as resume_file:
+                    content = resume_file.read()
+            except Exception:
+                # the application still reaches the recruiter without it
+                content = None
+            if content:
+                file_name = os.path.basename(resume.name)
+                msg.attach(file_name, content, mimetypes.guess_type(file_name)[0])
+        msg.send()
+    except Exception as exc:
+        AppliedJobs.objects.filter(id=application_id).update(recruiter_notified_on=None)
+        raise self.retry(exc=exc)
+
+
 @app.task
 def rebuilding_index():
     from haystack.management.commands import rebuild_index
@@ -91,46 +245,65 @@ def rebuilding_index():
 
 
 @app.task
-def updating_jobposts():
-    jobposts = JobPost.objects.filter(status="Live")
-    for job in jobposts:
-        job.slug = get_absolute_url(job)
-        job.save()
+def updating_jobposts(workers=1):
+    """Regenerate the slugs of the live jobs, see mpcomp.job_slugs"""
+    return update_job_slugs(workers)
 
 
-@app.task
-def job_alerts_to_users():
-    from_date = datetime.now() - timedelta(days=1)
-    job_posts = JobPost.objects.filter(
-        published_on__range=(from_date, datetime.now()), status="Live"
-    )
-    users = User.objects.filter(
-        email_notifications=True,
-        user_type="JS",
-        is_bounce=False,
-        is_unsubscribe=False,
-        skills__skill__id__in=job_posts.values_list("skills", flat=True),
-    ).distinct()
-    for user in users:
+@register_fan_out
+class JobAlertsToUsers(FanOut):
+    name = "job_alerts_to_users"
+    chunk_size = 200
+
+    def get_job_posts(self):
+        if not hasattr(self, "job_posts"):
+            self.job_posts = JobPost.objects.filter(
+                published_on__range=(self.params["from_date"], self.params["to_date"]),
+                status="Live",
+            )
+        return self.job_posts
+
+    def get_queryset(self):
+        return User.objects.filter(
+            email_notifications=True,
+            user_type="JS",
+            is_bounce=False,
+            is_unsubscribe=False,
+            skills__skill__id__in=self.get_job_posts().values_list("skills", flat=True),
+        ).distinct()
+
+    def render(self, user):
+        job_posts = self.get_job_posts()
         user_skills = user.skills.values_list("skill", flat=True)
         user_posts = job_posts.filter(
             skills__id__in=user_skills, location__in=[user.current_city]
         )
-        if user_posts:
-            if user_posts.count() < 10:
-                job_order = Case(
-                    *[When(pk=pk.id, then=pos) for pos, pk in enumerate(user_posts)]
-                )
-                user_posts = user_posts | JobPost.objects.filter(
-                    skills__in=user_skills, status="Live"
-                )
-                user_posts = user_posts.order_by(job_order)
-            c = {"jobposts": user_posts.distinct()[:10], "user": user}
-            t = loader.get_template("email/job_alert.html")
-            subject = "Top Matching Jobs for your Profile - InaWorks"
-            rendered = t.render(c)
-            mto = [user.email]
-            send_email.delay(mto, subject, rendered)
+        if not user_posts:
+            return None
+        if user_posts.count() < 10:
+            job_order = Case(
+                *[When(pk=pk.id, then=pos) for pos, pk in enumerate(user_posts)]
+            )
+            user_posts = user_posts | JobPost.objects.filter(
+                skills__in=user_skills, status="Live"
+            )
+            user_posts = user_posts.order_by(job_order)
+        c = {"jobposts": user_posts.distinct()[:10], "user": user}
+        t = loader.get_template("email/job_alert.html")
+        subject = "Top Matching Jobs for your Profile - InaWorks"
+        return [user.email], subject, t.render(c)
+
+
+@app.task
+def job_alerts_to_users():
+    to_date = datetime.now()
+    run = start_fan_out(
+        JobAlertsToUsers.name,
+        to_date.date().isoformat(),
+        from_date=(to_date - timedelta(days=1)).isoformat(),
+        to_date=to_date.isoformat(),
+    )
+    return fan_out_summary(run)
 
 
 @app.task
@@ -209,41 +382,54 @@ def job_alerts_to_alerts():
 
 @app.task()
 def jobpost_published():
-    return
-    jobposts = JobPost.objects.filter(status="Published")
-    for job in jobposts:
-
-        job.status = "Live"
-        job.published_on = datetime.now()
-        job_url = get_absolute_url(job)
-        job.slug = job_url
-        job.save()
-       
-        c = {"job_post": job, "user": job.user}
-        t = loader.get_template("email/jobpost.html")
-        subject = "InaWorks JobPost Status"
-        mto = [settings.DEFAULT_FROM_EMAIL, job.user.email]
-        rendered = t.render(c)
-        send_email.delay(mto, subject, rendered)
+    """Sweep for Published jobs whose scheduled go-live task was lost"""
+    return move_due_jobs_live()
 
 
+@app.task()
+def publish_due_jobs():
+    """Move the Published jobs that are due to Live, see mpcomp.job_publishing"""
+    return move_due_jobs_live()
 
 
+@register_fan_out
+class SendingMail(FanOut):
+    name = "sending_mail"
+    shared_body = True
+
+    def get_queryset(self):
+        return User.objects.filter(id__in=self.params["recruiters"]).only("id", "email")
+
+    def render_batch(self, recruiters):
+        if not hasattr(self, "rendered"):
+            template = MailTemplate.objects.get(id=self.params["template"])
+            t = loader.get_template("email/email_template.html")
+            self.rendered = t.render({"text": template.message})
+            self.subject = template.subject
+        return [
+            (recruiter.pk, (recruiter.email, self.subject, self.rendered))
+            for recruiter in recruiters
+        ]
+
 
 @app.task()
-def sending_mail(emailtemplate, recruiters):
-    t = loader.get_template("email/email_template.html")
-    c = {"text": emailtemplate.message}
-    subject = emailtemplate.subject
-    rendered = t.render(c)
-    sent_mail = SentMail.objects.create(template=emailtemplate)
-    recruiters = User.objects.filter(id__in=recruiters)
-    for recruiter in recruiters:
-        recruiter = User.objects.get(id=recruiter)
-        sent_mail.recruiter.add(recruiter)
-        mto = recruiter.email
-        send_email.delay(mto, subject, rendered)
-    return ""
+def sending_mail(template_id, recruiters):
+    """Send a mail template to the recruiters, see SendingMail"""
+    recruiter_ids = list(
+        User.objects.filter(id__in=recruiters).values_list("id", flat=True)
+    )
+    sent_mail = SentMail.objects.create(template_id=template_id)
+    SentMail.recruiter.through.objects.bulk_create(
+        SentMail.recruiter.through(sentmail_id=sent_mail.id, user_id=recruiter_id)
+        for recruiter_id in recruiter_ids
+    )
+    run = start_fan_out(
+        SendingMail.name,
+        "sent-mail-%s" % sent_mail.id,
+        template=template_id,
+        recruiters=recruiter_ids,
+    )
+    return fan_out_summary(run)
 
 
 def get_conditions(user):
@@ -317,34 +503,95 @@ def get_conditions(user):
 #         send_email.delay(mto, subject, rendered)
 
 
+DIGEST_MIN_APPLICANTS = 10
+DIGEST_APPLICANTS = 10
+
+
+@register_fan_out
+class RecruiterApplicantsDigest(FanOut):
+    """Daily digest of the jobs of a recruiter that got applicants that day"""
+
+    name = "recruiter_jobpost_applicants"
+
+    def get_applications(self):
+        return AppliedJobs.objects.filter(
+            applied_on__date=self.params["day"],
+            job_post__status="Live",
+            job_post__send_email_notifications=True,
+        )
+
+    def get_queryset(self):
+        busy_jobs = (
+            self.get_applications()
+            .values("job_post")
+            .annotate(applicants_count=Count("id"))
+            .filter(applicants_count__gte=DIGEST_MIN_APPLICANTS)
+        )
+        return (
+            User.objects.filter(
+                user_type="RR",
+                is_bounce=False,
+                is_unsubscribe=False,
+                email_notifications=True,
+                id__in=busy_jobs.values("job_post__user"),
+            )
+            .annotate(jobposts_count=Count("jobposts"))
+            .filter(jobposts_count__gt=1)
+        )
+
+    def render_batch(self, recruiters):
+        # the first applicants of every busy job of the batch, with the count
+        applicants = (
+            self.get_applications()
+            .filter(job_post__user__in=recruiters)
+            .annotate(
+                position=Window(
+                    RowNumber(), partition_by=[F("job_post_id")], order_by=F("id").asc()
+                ),
+                applicants_count=Window(Count("id"), partition_by=[F("job_post_id")]),
+            )
+            .filter(
+                position__lte=DIGEST_APPLICANTS,
+                applicants_count__gte=DIGEST_MIN_APPLICANTS,
+            )
+            .select_related("job_post", "user", "resume_applicant")
+            .order_by("job_post__user_id", "job_post_id", "position")
+        )
+        digests = {}
+        for applicant in applicants:
+            jobs = digests.setdefault(applicant.job_post.user_id, {})
+            job = jobs.setdefault(
+                applicant.job_post_id,
+                {
+                    "job": applicant.job_post,
+                    "applicants_count": applicant.applicants_count,
+                    "applicants": [],
+                },
+            )
+            job["applicants"].append(applicant)
+        t = loader.get_template("email/job_applicants.html")
+        subject = "No. Of Applicants Applied For Your Job"
+        messages = []
+        for recruiter in recruiters:
+            jobs = digests.get(recruiter.pk)
+            if not jobs:
+                messages.append((recruiter.pk, None))
+                continue
+            rendered = t.render({"user": recruiter, "jobs": list(jobs.values())})
+            messages.append((recruiter.pk, ([recruiter.email], subject, rendered)))
+        return messages
+
+
 # sending mail to recruiters about applicants
 @app.task()
 def recruiter_jobpost_applicants():
-    recruiters = User.objects.filter(
-        user_type="RR", is_bounce=False, is_unsubscribe=False, email_notifications=True
-    )
-    current_date = datetime.strptime(str(datetime.now().date()), "%Y-%m-%d").strftime(
-        "%Y-%m-%d"
-    )
-    for each in recruiters:
-        if each.get_jobposts_count() > 1:
-            job_posts = JobPost.objects.filter(
-                user=each, status="Live", send_email_notifications=True
-            )
-            for job in job_posts:
-                applicants = AppliedJobs.objects.filter(
-                    job_post=job, applied_on__date=current_date
-                )
-                if len(applicants) >= 10:
-                    c = {"jobposts": job, "user": each, "applicants": applicants[:10]}
-                    t = loader.get_template("email/job_applicants.html")
-                    subject = "No. Of Applicants Applied For Your Job"
-                    rendered = t.render(c)
-                    mto = [each.email]
-                    send_email.delay(mto, subject, rendered)
+    day = datetime.now().date().isoformat()
+    run = start_fan_out(RecruiterApplicantsDigest.name, day, day=day)
+    return fan_out_summary(run)
 
 
 @app.task()
+@read_replica()
 def daily_report():
     current_date = datetime.strptime(
         str(datetime.now().date() - timedelta(days=1)), "%Y-%m-%d"
@@ -680,90 +927,36 @@ def daily_report():
 
 @app.task()
 def applicants_profile_update_notifications():
+    # disabled, its beat schedule is commented out in settings
     return
-    today_applicants = User.objects.filter(
-        user_type="JS",
-        profile_completeness__lt=50,
-        is_unsubscribe=False,
-        is_bounce=False,
-        email_notifications=True,
-    ).exclude(email__icontains="micropyramid.com")
-    for each in today_applicants:
-        days = (datetime.today() - each.date_joined).days
-        if days == 4 or days == 6 or days % 7 == 0:
-            skills = Skill.objects.filter(
-                id__in=each.skills.all().values_list("skill_id", flat=True)
+
+
+@register_fan_out
+class RecruiterProfileUpdate(FanOut):
+    name = "recruiter_profile_update_notifications"
+
+    def get_queryset(self):
+        return User.objects.filter(
+            Q(Q(user_type="RR") | Q(user_type="AA"))
+            & Q(
+                email_notifications=True,
+                is_unsubscribe=False,
+                is_bounce=False,
+                profile_completeness__lt=50,
             )
-            if skills:
-                job_posts = JobPost.objects.filter(status="Live", skills__in=skills)[
-                    :15
-                ]
-            else:
-                job_posts = JobPost.objects.filter(status="Live")[:15]
-            temp = loader.get_template("email/user_profile_alert.html")
-            if days == 4:
-                subject = "Recruiters are unable to contact you - Inaworks"
-            if days == 6:
-                subject = (
-                    "Your Inaworks account is missing Critical Information - Inaworks"
-                )
-            else:
-                subject = "Update Your Profile To Get Top Matching Jobs - Inaworks"
-            rendered = temp.render({"user": each, "job_posts": job_posts})
-            mto = [each.email]
-            send_email.delay(mto, subject, rendered)
-    User.objects.filter(
-        Q(Q(user_type="RR") | Q(user_type="AA"))
-        & Q(
-            email_notifications=True,
-            is_unsubscribe=False,
-            is_bounce=False,
-            is_active=False,
         )
-    )
-    # for user in recruiters:
-    #     days = (datetime.today() - user.date_joined).days
-    #     if days == 2 or days % 10 == 0:
-    #         temp = loader.get_template("email/account_inactive.html")
-    #         subject = "Update Your Profile - Inaworks"
-    #         rendered = temp.render({"user": user})
-    #         mto = [user.email]
-    #         send_email.delay(mto, subject, rendered)
 
-    day = datetime.today() - timedelta(days=2)
-    users = User.objects.filter(
-        user_type="JS",
-        resume="",
-        email_notifications=True,
-        date_joined__contains=day.date(),
-        is_unsubscribe=False,
-        is_bounce=False,
-    )
-    for user in users:
+    def render(self, recruiter):
         temp = loader.get_template("email/user_profile_alert.html")
-        subject = "Upload your Resume/cv - Inaworks"
-        rendered = temp.render({"user": user, "resume_update": True})
-        mto = [user.email]
-        send_email.delay(mto, subject, rendered)
+        subject = "Update Your Profile To Get More Applicants - Inaworks"
+        rendered = temp.render({"user": recruiter, "recruiter": True})
+        return [recruiter.email], subject, rendered
 
 
 @app.task()
 def recruiter_profile_update_notifications():
-    recruiters = User.objects.filter(
-        Q(Q(user_type="RR") | Q(user_type="AA"))
-        & Q(
-            email_notifications=True,
-            is_unsubscribe=False,
-            is_bounce=False,
-            profile_completeness__lt=50,
-        )
-    )
-    for recruiter in recruiters:
-        temp = loader.get_template("email/user_profile_alert.html")
-        subject = "Update Your Profile To Get More Applicants - Inaworks"
-        mto = [recruiter.email]
-        rendered = temp.render({"user": recruiter, "recruiter": True})
-        send_email.delay(mto, subject, rendered)
+    run = start_fan_out(RecruiterProfileUpdate.name, datetime.now().date().isoformat())
+    return fan_out_summary(run)
 
 
 @app.task()
@@ -862,6 +1055,7 @@ def applicants_job_notifications():
 
 
 @app.task()
+@read_replica()
 def sitemap_generation():
     print("Sitemap Generation started")
     import os
@@ -1523,42 +1717,74 @@ def sitemap_generation():
 
 @app.task()
 def save_search_results(ip_address, data, results, user):
-    user = User.objects.filter(id=user).first()
-    search_result = SearchResult.objects.create(ip_address=ip_address)
-    skills = data.get("q", "").strip(", ")
-    locations = data.get("location", "").strip(", ")
-    search_result.search_text = {"skills": skills, "locations": locations}
-    if skills:
-        search_skills = skills.split(", ")
-        for skill in search_skills:
-            skills = Skill.objects.filter(Q(slug__iexact=skill) | Q(name__iexact=skill))
-            if skills:
-                search_result.skills.add(skills[0].id)
-            else:
-                search_result.other_skill += (
-                    "," + skill if search_result.other_skill else skill
-                )
-    if locations:
-        serch_locations = locations.split(", ")
-        for loc in serch_locations:
-            location = City.objects.filter(Q(slug__iexact=loc) | Q(name__iexact=loc))
-            if location:
-                search_result.locations.add(location[0].id)
+    """Save a search that log_search could not buffer"""
+    save_search_events([get_search_event(ip_address, data, results, user)])
+
+
+@app.task()
+def save_search_log():
+    """Save the buffered searches of the finished time windows in bulk"""
+    return flush_search_log()
+
+
+@register_fan_out
+class ExpiringJobs(FanOut):
+    name = "check_expiring_jobs"
+    batch_send = True
+
+    def get_dates(self):
+        today = datetime.fromisoformat(self.params["today"]).date()
+        max_age_days = self.params["max_age_days"]
+        warning_days = self.params["warning_days"]
+        # published exactly 23 days ago expire in 7 days, 30 days ago expired today
+        return (
+            today - timedelta(days=(max_age_days - warning_days)),
+            today - timedelta(days=max_age_days),
+        )
+
+    def get_queryset(self):
+        expiring_soon_date, expired_today_date = self.get_dates()
+        return (
+            JobPost.objects.filter(
+                Q(status="Live", published_on__date=expiring_soon_date)
+                | Q(status="Expired", published_on__date=expired_today_date)
+            )
+            .exclude(user__email="")
+            .exclude(user__email__isnull=True)
+            .select_related("user")
+            .annotate(applicants_count=Count("appliedjobs"))
+        )
+
+    def render_batch(self, jobs):
+        today = datetime.fromisoformat(self.params["today"]).date()
+        expiring_soon = loader.get_template('email/job_expiring_soon.html')
+        expired = loader.get_template('email/job_expired.html')
+        messages = []
+        for job in jobs:
+            expiry_date = job.published_on + timedelta(days=self.params["max_age_days"])
+            context = {
+                'user': job.user,
+                'job': job,
+                'expiry_date': expiry_date,
+                'applicants_count': job.applicants_count,
+            }
+            if job.status == 'Live':
+                days_remaining = (expiry_date.date() - today).days
+                context['days_remaining'] = days_remaining
+                rendered = expiring_soon.render(context)
+                subject = f'Job Posting Expires in {days_remaining} Days - {job.title}'
             else:
-                search_result.other_location += (
-                    "," + loc if search_result.other_location else loc
-                )
-    if user:
-        search_result.user = user
-    search_result.job_post = results
-    search_result.save()
+                rendered = expired.render(context)
+                subject = f'Job Posting No Longer Accepting Applications - {job.title}'
+            messages.append((job.pk, ([job.user.email], subject, rendered)))
+        return messages
 
 
 @app.task()
 def check_expiring_jobs():
     """
-    Check for jobs approaching expiry (7 days remaining) and jobs that just expired.
-    Send email notifications to job owners.
+    Expire the jobs past JOB_APPLICATION_MAX_AGE_DAYS and notify the owners of
+    jobs approaching expiry (7 days remaining) and of the jobs that just expired.
 
     This task should be run daily via Celery Beat.
     """
@@ -1568,80 +1794,124 @@ def check_expiring_jobs():
     warning_days = 7  # Send warning when 7 days remaining
 
     today = timezone.now().date()
+    expired = expire_jobs(max_age_days, today)
+    run = start_fan_out(
+        ExpiringJobs.name,
+        today.isoformat(),
+        today=today.isoformat(),
+        max_age_days=max_age_days,
+        warning_days=warning_days,
+    )
 
-    # Calculate dates
-    expiring_soon_date = today - timedelta(days=(max_age_days - warning_days))
-    expired_today_date = today - timedelta(days=max_age_days)
-
-    # Find jobs expiring in 7 days (published exactly 23 days ago)
-    jobs_expiring_soon = JobPost.objects.filter(
-        status='Live',
-        published_on__date=expiring_soon_date
-    ).select_related('user')
-
-    # Find jobs that expired today (published exactly 30 days ago)
-    jobs_expired_today = JobPost.objects.filter(
-        status='Live',
-        published_on__date=expired_today_date
-    ).select_related('user')
-
-    # Send expiring soon warnings
-    for job in jobs_expiring_soon:
-        if job.user and job.user.email:
-            # Calculate expiry date and days remaining
-            expiry_date = job.published_on + timedelta(days=max_age_days)
-            days_remaining = (expiry_date.date() - today).days
-
-            # Get applicant count
-            applicants_count = job.get_all_applied_users_count()
-
-            # Render email template
-            context = {
-                'user': job.user,
-                'job': job,
-                'days_remaining': days_remaining,
-                'expiry_date': expiry_date,
-                'applicants_count': applicants_count,
-            }
-            template = loader.get_template('email/job_expiring_soon.html')
-            rendered = template.render(context)
+    import logging
+    logger = logging.getLogger(__name__)
+    summary = fan_out_summary(run)
+    summary['expired'] = expired
+    logger.info(
+        f'Job expiry check: {expired} jobs expired, '
+        f'{summary["chunks"]} chunks of notifications queued'
+    )
+    return summary
 
-            # Send email
-            subject = f'Job Posting Expires in {days_remaining} Days - {job.title}'
-            send_email.delay([job.user.email], subject, rendered)
 
-    # Send expired notifications
-    for job in jobs_expired_today:
-        if job.user and job.user.email:
-            # Calculate expiry date
-            expiry_date = job.published_on + timedelta(days=max_age_days)
+@app.task()
+def process_resume(user_id, resume_name):
+    """Extract text, email and mobile of an uploaded resume into the user profile"""
+    user = User.objects.filter(id=user_id).only("id", "mobile", "resume").first()
+    # a newer upload replaced this resume, its own task takes over
+    if not user or user.resume.name != resume_name:
+        return
+    set_resume_status(user_id, "processing", resume_name)
+    try:
+        with user.resume.open("rb") as resume:
+            text = extract_resume_text(resume_name, resume.read())
+    except Exception:
+        set_resume_status(user_id, "failed", resume_name)
+        return
+    _, mobile = get_email_resume(text)
+    fields = {"resume_text": text, "resume_status": "completed"}
+    if mobile and not user.mobile:
+        fields["mobile"] = mobile
+    User.objects.filter(id=user_id, resume=resume_name).update(**fields)
+    update_user_search_vectors([user_id])
 
-            # Get applicant count
-            applicants_count = job.get_all_applied_users_count()
 
-            # Render email template
-            context = {
-                'user': job.user,
-                'job': job,
-                'expiry_date': expiry_date,
-                'applicants_count': applicants_count,
-            }
-            template = loader.get_template('email/job_expired.html')
-            rendered = template.render(context)
+@app.task()
+def refresh_search_vectors(kind, ids):
+    """Refresh the search vectors queued by mpcomp.resume_search"""
+    SEARCH_VECTOR_UPDATERS[kind](ids)
 
-            # Send email
-            subject = f'Job Posting No Longer Accepting Applications - {job.title}'
-            send_email.delay([job.user.email], subject, rendered)
 
-    # Log results
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.info(
-        f'Job expiry check completed: {jobs_expiring_soon.count()} warnings sent, '
-        f'{jobs_expired_today.count()} expiry notifications sent'
+@app.task()
+def update_resume_search_index():
+    """
+    Fill the search vectors of the profiles and agency resumes the signals did
+    not reach, e.g. rows created in bulk
+    """
+    user_ids = User.objects.filter(
+        search_vector__isnull=True, user_type="JS"
+    ).values_list("id", flat=True)
+    update_user_search_vectors(list(user_ids[:5000]))
+    resume_ids = AgencyResume.objects.filter(search_vector__isnull=True).values_list(
+        "id", flat=True
     )
+    update_agency_resume_search_vectors(list(resume_ids[:5000]))
 
-    return {
-        'warnings_sent': jobs_expiring_soon.count(),
-        'expiry_notifications_sent': jobs_expired_today.count(),
-    }
+
+@app.task()
+def update_similar_jobs():
+    """
+    Recompute job neighbours of the catalogue changes since the last run, at
+    most JOB_NEIGHBOURS_MAX_CHANGES changes per run. Every list is rebuilt
+    once a day.
+    """
+    watermark = cache.get("job_neighbours_watermark")
+    rebuild = cache.add("job_neighbours_rebuilt", 1, timeout=60 * 60 * 24)
+    if rebuild or watermark is None:
+        latest = (
+            JobPostChange.objects.order_by("-id").values_list("id", flat=True).first()
+        )
+        update_job_neighbours()
+    else:
+        batch = list(
+            JobPostChange.objects.filter(id__gt=watermark)
+            .order_by("id")
+            .values_list("id", "job_post_id")[
+                : getattr(settings, "JOB_NEIGHBOURS_MAX_CHANGES", 1000)
+            ]
+        )
+        if not batch:
+            return
+        latest = batch[-1][0]
+        update_job_neighbours({job_post_id for _, job_post_id in batch})
+    cache.set("job_neighbours_watermark", latest or 0, timeout=None)
+
+
+@app.task()
+def update_sitemap_snapshot(force=False):
+    """Rebuild the sitemap snapshot when the job catalogue changed since the last run"""
+    watermark = cache.get("sitemap_snapshot_watermark")
+    latest = JobPostChange.objects.order_by("-id").values_list("id", flat=True).first()
+    if force or watermark is None or (latest or 0) > watermark:
+        build_sitemap_snapshot()
+    cache.set("sitemap_snapshot_watermark", latest or 0, timeout=None)
+
+
+@app.task()
+def flush_cloudfront_invalidations(window):
+    """Send the CloudFront paths queued during a time window as one invalidation"""
+    create_cloudfront_invalidation(pop_cloudfront_invalidations(window))
+
+
+@app.task()
+def generate_thumbnails(file_, variants):
+    """Pre-generate thumbnail variants of an uploaded logo or profile picture"""
+    import logging
+
+    try:
+        SEOThumbnailBackend().create_thumbnails(file_, variants)
+    except Exception:
+        # eager runs happen inside the request that saved the picture
+        logging.getLogger(__name__).exception(
+            "Failed to generate the thumbnails of %s", file_
+        )
@@ -5,10 +5,37 @@ when you run "manage.py test".
 Replace this with more appropriate tests for your application.
 """
 
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from botocore.stub import ANY, Stubber
+import fakeredis
+from django.core import mail
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
 
 # from django.test import Client
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
+from .tasks import (
+    RecruiterProfileUpdate,
+    check_expiring_jobs,
+    generate_thumbnails,
+    recruiter_jobpost_applicants,
+    recruiter_profile_update_notifications,
+    send_bulk_email,
+    sending_mail,
+    update_resume_search_index,
+)
 from .forms import (
     ChangePasswordForm,
     CountryForm,
@@ -21,7 +48,38 @@ from .forms import (
     FunctionalAreaForm,
     UserForm,
 )
-from peeldb.models import Country, State
+from peeldb.models import (
+    AgencyResume,
+    AppliedJobs,
+    City,
+    Company,
+    Country,
+    FanOutChunk,
+    FanOutRun,
+    JobPost,
+    JobPostChange,
+    MailTemplate,
+    SearchResult,
+    SentMail,
+    Skill,
+    State,
+    TechnicalSkill,
+    User,
+)
+from jobsp.celery import app
+from jobsp.thumbnailname import SEOThumbnailBackend
+from mpcomp import aws
+from mpcomp.cache import cached, get_cache_stats, invalidate_namespace, namespaced_key
+from mpcomp import fanout
+from mpcomp.db_router import PIN_COOKIE, ReplicaRouter, read_replica
+from mpcomp.job_publishing import move_due_jobs_live, schedule_go_live
+from mpcomp.job_slugs import update_job_slugs
+from mpcomp.resume_search import rank_resumes
+from mpcomp.search_log import flush_search_log, log_search
+from mpcomp.task_routing import BULK_EMAIL_PRIORITY, INTERACTIVE_EMAIL_PRIORITY
+from peeldb.testing import create_job
+from jobsp.middlewares import PinPrimary
+from PIL import Image
 
 
 class ChangePasswordForm_form_test(TestCase):
@@ -164,3 +222,801 @@ class user_form_test(TestCase):
             }
         )
         self.assertFalse(form.is_valid())
+
+
+@override_settings(
+    AWS_ACCESS_KEY_ID="testing",
+    AWS_SECRET_ACCESS_KEY="testing",
+    AWS_S3_REGION_NAME="us-east-1",
+    S3_MULTIPART_THRESHOLD=1024,
+    S3_MULTIPART_CHUNKSIZE=1024,
+    S3_MULTIPART_CONCURRENCY=1,
+    CLOUDFRONT_DISTRIBUTION_ID="EDFDVBD6EXAMPLE",
+)
+class aws_storage_test(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.s3 = Stubber(aws.get_client("s3"))
+        self.s3.activate()
+
+    def tearDown(self):
+        self.s3.deactivate()
+
+    def test_client_is_shared_between_threads(self):
+        clients = []
+        threads = [
+            threading.Thread(target=lambda: clients.append(aws.get_client("s3")))
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(client is self.s3.client for client in clients))
+
+    def test_small_file_is_put(self):
+        self.s3.add_response(
+            "put_object",
+            {},
+            {
+                "Bucket": "bucket",
+                "Key": "company/logo/peel.png",
+                "Body": ANY,
+                "ContentType": "image/png",
+                "ACL": "public-read",
+                "ChecksumAlgorithm": ANY,
+            },
+        )
+        key, bucket = aws.AWS().push_to_s3(
+            io.BytesIO(b"x" * 100), "bucket", "company/logo/", "peel.png"
+        )
+        self.assertEqual(key, "company/logo/peel.png")
+        self.s3.assert_no_pending_responses()
+
+    def test_large_file_is_multipart(self):
+        # parts are never smaller than the 5MB S3 minimum
+        self.s3.add_response("create_multipart_upload", {"UploadId": "upload"})
+        self.s3.add_response("upload_part", {"ETag": "etag-1"})
+        self.s3.add_response("complete_multipart_upload", {})
+        aws.upload_many([("resume/cv.pdf", io.BytesIO(b"x" * 3000))], "bucket")
+        self.s3.assert_no_pending_responses()
+
+    def test_uploads_need_dashboard_permission(self):
+        user = User.objects.create(email="applicant@mp.com", username="applicant")
+        self.client.force_login(user)
+        response = self.client.post(
+            "/dashboard/aws-push-to-s3/",
+            {"upload_file": SimpleUploadedFile("a.png", b"x", "image/png")},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(AWS_STORAGE_BUCKET_NAME="bucket")
+    def test_uploads_are_private_and_validated(self):
+        user = User.objects.create(
+            email="staff@mp.com", username="staff", is_staff=True
+        )
+        self.client.force_login(user)
+        response = self.client.post(
+            "/dashboard/aws-push-to-s3/",
+            {"upload_file": SimpleUploadedFile("a.html", b"x", "text/html")},
+        )
+        self.assertTrue(json.loads(response.content)["error"])
+        self.s3.add_response(
+            "put_object",
+            {},
+            {
+                "Bucket": "bucket",
+                "Key": ANY,
+                "Body": ANY,
+                "ContentType": "image/png",
+                "ChecksumAlgorithm": ANY,
+            },
+        )
+        response = self.client.post(
+            "/dashboard/aws-push-to-s3/",
+            {"upload_file": SimpleUploadedFile("my logo.png", b"x", "image/png")},
+        )
+        self.s3.assert_no_pending_responses()
+        (uploaded,) = json.loads(response.content)["files"]
+        self.assertTrue(uploaded["name"].startswith("uploads/%s/" % user.id))
+        self.assertNotIn("logo", uploaded["name"])
+        self.assertIn("Signature", uploaded["url"])
+
+    def test_invalidations_are_batched(self):
+        with self.settings(CACHES=TIERED_CACHES), mock.patch(
+            "dashboard.tasks.flush_cloudfront_invalidations.apply_async"
+        ) as flush:
+            cache.clear()
+            aws.AWS().cloudfront_invalidate(["/company/logo/a.png"])
+            aws.AWS().cloudfront_invalidate(["/company/logo/b.png"])
+            self.assertEqual(flush.call_count, 1)
+            window = flush.call_args[0][0][0]
+            paths = aws.pop_cloudfront_invalidations(window)
+
+        cloudfront = Stubber(aws.get_client("cloudfront"))
+        cloudfront.add_response(
+            "create_invalidation",
+            {},
+            {
+                "DistributionId": "EDFDVBD6EXAMPLE",
+                "InvalidationBatch": {
+                    "Paths": {
+                        "Quantity": 2,
+                        "Items": ["/company/logo/a.png", "/company/logo/b.png"],
+                    },
+                    "CallerReference": ANY,
+                },
+            },
+        )
+        with cloudfront:
+            aws.create_cloudfront_invalidation(paths)
+        cloudfront.assert_no_pending_responses()
+
+    def test_invalidations_are_sent_without_a_shared_cache(self):
+        cloudfront = Stubber(aws.get_client("cloudfront"))
+        cloudfront.add_response("create_invalidation", {})
+        with cloudfront, mock.patch(
+            "dashboard.tasks.flush_cloudfront_invalidations.apply_async"
+        ) as flush:
+            aws.AWS().cloudfront_invalidate(["/company/logo/a.png"])
+        flush.assert_not_called()
+        cloudfront.assert_no_pending_responses()
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class thumbnail_pipeline_test(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings.enable()
+        self.backend = SEOThumbnailBackend()
+        image = io.BytesIO()
+        Image.new("RGBA", (300, 200), "red").save(image, "PNG")
+        self.logo = "company/logo/peel.png"
+        default_storage.save(self.logo, ContentFile(image.getvalue()))
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_logo_upload_generates_variants(self):
+        Company.objects.create(
+            name="Peel", address="hyd", profile="peel", profile_pic=self.logo
+        )
+        with mock.patch("dashboard.tasks.generate_thumbnails.delay") as generate:
+            thumbnail = self.backend.get_thumbnail(self.logo, "40x40")
+            large = self.backend.get_thumbnail(self.logo, "80x80")
+        generate.assert_not_called()
+        self.assertNotEqual(thumbnail.name, self.logo)
+        self.assertEqual(thumbnail.width, 40)
+        self.assertEqual(large.width, 80)
+
+    def test_only_new_uploads_are_queued(self):
+        with mock.patch("dashboard.tasks.generate_thumbnails.delay") as generate:
+            user = User.objects.create(
+                email="user@mp.com",
+                username="user",
+                profile_pic="https://lh3.googleusercontent.com/avatar.jpg",
+            )
+            user.profile_pic = self.logo
+            user.save()
+            user = User.objects.get(id=user.id)
+            user.first_name = "Peel"
+            user.save()
+        generate.assert_called_once()
+
+    def test_failed_generation_is_logged(self):
+        with self.assertLogs("dashboard.tasks", "ERROR"):
+            generate_thumbnails("company/logo/missing.png", [("40x40", {})])
+
+    def test_missing_thumbnail_does_not_block(self):
+        with mock.patch("dashboard.tasks.generate_thumbnails.delay") as generate:
+            image = self.backend.get_thumbnail(self.logo, "120x120")
+            self.backend.get_thumbnail(self.logo, "120x120")
+        self.assertEqual(image.name, self.logo)
+        generate.assert_called_once_with(self.logo, [("120x120", {})])
+
+        self.backend.create_thumbnails(self.logo, [("120x120", {})])
+        self.assertEqual(self.backend.get_thumbnail(self.logo, "120x120").width, 120)
+
+
+# the tiered cache in front of an in-memory redis server
+TIERED_CACHES = {
+    "default": {
+        "BACKEND": "mpcomp.cache.TieredCache",
+        "LOCATION": "tiered-test",
+        "OPTIONS": {"SHARED": "shared", "LOCAL_MAX_ENTRIES": 2, "STATS_INTERVAL": 0},
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379/1",
+        "OPTIONS": {"connection_class": fakeredis.FakeConnection},
+    },
+}
+
+
+@override_settings(CACHES=TIERED_CACHES)
+class tiered_cache_test(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_namespaced_keys_are_served_from_the_process(self):
+        self.assertEqual(cached("lookups", "skills", lambda: ["python"]), ["python"])
+        caches["shared"].delete(namespaced_key("lookups", "skills"))
+        self.assertEqual(cache.get(namespaced_key("lookups", "skills")), ["python"])
+
+        # another process only sees the shared tier
+        cache._local.clear()
+        self.assertIsNone(cache.get(namespaced_key("lookups", "skills")))
+
+    def test_other_keys_go_to_the_shared_tier(self):
+        cache.set("resume-status", "parsed")
+        caches["shared"].delete("resume-status")
+        self.assertIsNone(cache.get("resume-status"))
+
+        self.assertTrue(cache.add("counter", 0))
+        self.assertFalse(cache.add("counter", 5))
+        self.assertEqual(cache.incr("counter"), 1)
+        self.assertEqual(caches["shared"].get("counter"), 1)
+
+    def test_invalidate_namespace(self):
+        cached("lookups", "skills", ["python"])
+        cached("facets", "skills", ["python"])
+        invalidate_namespace("lookups")
+        self.assertEqual(cached("lookups", "skills", ["django"]), ["django"])
+        self.assertEqual(cached("facets", "skills", ["django"]), ["python"])
+
+    def test_local_tier_is_bounded(self):
+        for name in ("a", "b", "c"):
+            cache.set("ns:test:" + name, name)
+        caches["shared"].delete_many(["ns:test:a", "ns:test:c"])
+        self.assertIsNone(cache.get("ns:test:a"))
+        self.assertEqual(cache.get("ns:test:c"), "c")
+
+    def test_cached_values_can_not_be_mutated(self):
+        cached("facets", "skills", ["python"]).append("django")
+        self.assertEqual(cached("facets", "skills", []), ["python"])
+
+    def test_hit_and_miss_counters(self):
+        cache.get("missing")
+        cache.set("ns:test:a", "a")
+        cache.get("ns:test:a")
+        cache.get_many(["ns:test:a", "missing"])
+        stats = get_cache_stats()
+        self.assertEqual(stats["local_hits"], 2)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["hit_rate"], 50.0)
+
+
+@override_settings(REPLICA_DATABASES=["replica"])
+class read_replica_test(TransactionTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def read_db(self):
+        return self.router.db_for_read(Country)
+
+    def test_reads_use_the_replica_only_when_asked(self):
+        self.assertIsNone(self.read_db())
+        with read_replica():
+            self.assertEqual(self.read_db(), "replica")
+        self.assertIsNone(self.read_db())
+
+        with override_settings(REPLICA_DATABASES=[]), read_replica():
+            self.assertIsNone(self.read_db())
+
+    @override_settings(REPLICA_DATABASES=["replica", "replica2"])
+    def test_reads_of_a_block_use_one_replica(self):
+        with read_replica():
+            replica = self.read_db()
+            with read_replica():
+                self.assertEqual({self.read_db() for _ in range(20)}, {replica})
+
+    def test_reads_follow_own_writes(self):
+        with read_replica():
+            self.router.db_for_write(Country)
+            self.assertEqual(self.read_db(), "default")
+        with read_replica():
+            self.assertEqual(self.read_db(), "replica")
+
+    def test_reads_in_a_transaction_use_the_primary(self):
+        with read_replica(), transaction.atomic():
+            self.assertEqual(self.read_db(), "default")
+
+    def test_decorated_function(self):
+        @read_replica()
+        def listing():
+            return self.read_db()
+
+        self.assertEqual(listing(), "replica")
+        self.assertIsNone(self.read_db())
+
+    def test_client_is_pinned_after_a_write(self):
+        def write(request):
+            self.router.db_for_write(Country)
+            return HttpResponse()
+
+        def read(request):
+            with read_replica():
+                return HttpResponse(self.read_db())
+
+        factory = RequestFactory()
+        response = PinPrimary(write)(factory.post("/"))
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 10)
+
+        response = PinPrimary(read)(factory.get("/"))
+        self.assertEqual(response.content, b"replica")
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+        request = factory.get("/")
+        request.COOKIES[PIN_COOKIE] = "1"
+        self.assertEqual(PinPrimary(read)(request).content, b"default")
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class scheduled_publishing_test(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email="recruiter@mp.com", username="recruiter")
+        self.jobs = [
+            create_job(
+                self.user,
+                title,
+                status="Published",
+                published_on=None,
+                min_year=1,
+                max_year=3,
+            )
+            for title in ("Python Developer", "Tester")
+        ]
+
+    def test_one_task_per_window(self):
+        go_live_at = datetime.now() + timedelta(hours=1)
+        with mock.patch("dashboard.tasks.publish_due_jobs.apply_async") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule_go_live([self.jobs[0].id], go_live_at)
+                schedule_go_live([self.jobs[1].id], go_live_at)
+        publish.assert_called_once()
+        self.assertGreater(publish.call_args.kwargs["countdown"], 60 * 59)
+        self.assertEqual(
+            JobPost.objects.filter(go_live_at=go_live_at).count(), len(self.jobs)
+        )
+
+    def test_due_jobs_go_live_together(self):
+        now = datetime.now()
+        JobPost.objects.filter(id=self.jobs[0].id).update(go_live_at=now)
+        JobPost.objects.filter(id=self.jobs[1].id).update(
+            go_live_at=now + timedelta(minutes=5)
+        )
+        self.assertEqual(move_due_jobs_live(now), 1)
+
+        job = JobPost.objects.get(id=self.jobs[0].id)
+        self.assertEqual(job.status, "Live")
+        self.assertEqual(job.published_on, now)
+        self.assertIsNone(job.go_live_at)
+        self.assertEqual(job.slug, "/python-developer-1-to-3-years-%s/" % job.id)
+        self.assertEqual(JobPostChange.objects.get().job_post_id, job.id)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(JobPost.objects.get(id=self.jobs[1].id).status, "Published")
+
+        self.assertEqual(move_due_jobs_live(now + timedelta(minutes=5)), 1)
+        self.assertEqual(move_due_jobs_live(now + timedelta(minutes=5)), 0)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_unscheduled_jobs_are_left_published(self):
+        # Published before go-live was scheduled, never promoted by the sweep
+        self.assertEqual(move_due_jobs_live(), 0)
+        self.assertEqual(JobPost.objects.filter(status="Published").count(), 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class task_routing_test(TestCase):
+    def route(self, name, **options):
+        return app.amqp.router.route(options, name, (), {})
+
+    def test_tasks_are_routed_by_workload(self):
+        self.assertEqual(
+            self.route("dashboard.tasks.send_email")["queue"].name, "email"
+        )
+        self.assertEqual(
+            self.route("dashboard.tasks.save_search_results")["queue"].name,
+            "analytics",
+        )
+        self.assertEqual(
+            self.route("dashboard.tasks.application_submitted")["queue"].name,
+            "celery",
+        )
+        self.assertEqual(
+            self.route("dashboard.tasks.send_email", queue="celery")["queue"].name,
+            "celery",
+        )
+
+    def test_emails_of_tasks_are_bulk(self):
+        route = self.route("dashboard.tasks.send_email")
+        self.assertEqual(route["priority"], INTERACTIVE_EMAIL_PRIORITY)
+
+        running = mock.Mock(request=mock.Mock(called_directly=False))
+        with mock.patch("mpcomp.task_routing.current_task", running):
+            route = self.route("dashboard.tasks.send_email")
+        self.assertEqual(route["priority"], BULK_EMAIL_PRIORITY)
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class fan_out_test(TestCase):
+    def setUp(self):
+        self.recruiters = [
+            User.objects.create(
+                email="recruiter%s@mp.com" % index,
+                username="recruiter%s" % index,
+                user_type="RR",
+                email_notifications=True,
+            )
+            for index in range(5)
+        ]
+
+    @mock.patch.object(fanout, "BATCH_SIZE", 1)
+    @mock.patch.object(RecruiterProfileUpdate, "chunk_size", 2)
+    def test_run_is_chunked_and_sent_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = recruiter_profile_update_notifications()
+        self.assertEqual(summary["chunks"], 3)
+
+        run = FanOutRun.objects.get()
+        self.assertEqual(run.chunks_done, 3)
+        self.assertEqual(run.sent, 5)
+        self.assertIsNotNone(run.finished_on)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(recruiter.email for recruiter in self.recruiters),
+        )
+
+        # the same run again sends nothing
+        with self.captureOnCommitCallbacks(execute=True):
+            recruiter_profile_update_notifications()
+        self.assertEqual(len(mail.outbox), 5)
+
+    @mock.patch.object(RecruiterProfileUpdate, "chunk_size", 2)
+    def test_restarted_chunk_resumes(self):
+        with mock.patch("dashboard.tasks.fan_out_chunk.delay"):
+            with self.captureOnCommitCallbacks(execute=True):
+                recruiter_profile_update_notifications()
+        chunk = FanOutChunk.objects.order_by("id").first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            fanout.run_chunk(chunk.id)
+        self.assertEqual(len(mail.outbox), 2)
+
+        # a redelivered task starting over from the beginning of the chunk
+        FanOutChunk.objects.filter(id=chunk.id).update(done_on=None, last_id=None)
+        with self.captureOnCommitCallbacks(execute=True):
+            chunk = fanout.run_chunk(chunk.id)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(chunk.sent, 2)
+
+        FanOutChunk.objects.update(updated_on=datetime.now() - timedelta(hours=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(fanout.resume_fan_outs(), 2)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_sending_mail(self):
+        template = MailTemplate.objects.create(
+            message="Post your jobs",
+            subject="Hiring season",
+            created_on=datetime.now(),
+            modified_on=datetime.now(),
+            title="Campaign",
+            created_by=self.recruiters[0],
+            applicant_status="Posted",
+        )
+        recruiter_ids = [str(recruiter.id) for recruiter in self.recruiters]
+        # the same queries however many recruiters, the sends run after commit
+        with mock.patch.object(fanout, "BULK_EMAIL_SIZE", 2):
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertNumQueries(13):
+                    sending_mail(template.id, recruiter_ids)
+
+        sent_mail = SentMail.objects.get()
+        self.assertEqual(sent_mail.recruiter.count(), 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].subject, "Hiring season")
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(recruiter.email for recruiter in self.recruiters),
+        )
+
+
+    def test_failed_recipients_are_retried(self):
+        send_messages = mail.get_connection().__class__.send_messages
+
+        def fail_once(connection, messages):
+            if messages[0].to == ["recruiter1@mp.com"]:
+                raise OSError("connection reset")
+            return send_messages(connection, messages)
+
+        recipients = [recruiter.email for recruiter in self.recruiters]
+        with mock.patch.object(
+            mail.get_connection().__class__, "send_messages", fail_once
+        ), mock.patch.object(
+            send_bulk_email, "retry", side_effect=RuntimeError
+        ) as retry:
+            with self.assertRaises(RuntimeError):
+                send_bulk_email(recipients, "Hiring season", "Post your jobs")
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(
+            retry.call_args.kwargs["args"],
+            (["recruiter1@mp.com"], "Hiring season", "Post your jobs"),
+        )
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class recruiter_digest_test(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(
+            email="recruiter@mp.com",
+            username="recruiter",
+            user_type="RR",
+            email_notifications=True,
+        )
+        self.busy_job = create_job(
+            self.recruiter, "Python Developer", send_email_notifications=True
+        )
+        self.quiet_job = create_job(
+            self.recruiter, "Tester", send_email_notifications=True
+        )
+        applicants = [
+            User.objects.create(
+                email="applicant%s@mp.com" % index, username="applicant%s" % index
+            )
+            for index in range(12)
+        ]
+        for applicant in applicants:
+            AppliedJobs.objects.create(
+                job_post=self.busy_job, user=applicant, status="Pending"
+            )
+        for applicant in applicants[:3]:
+            AppliedJobs.objects.create(
+                job_post=self.quiet_job, user=applicant, status="Pending"
+            )
+
+    def test_digest_of_busy_jobs(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = recruiter_jobpost_applicants()
+        self.assertEqual(summary["chunks"], 1)
+        self.assertEqual(len(mail.outbox), 1)
+        body = mail.outbox[0].body
+        self.assertEqual(mail.outbox[0].to, ["recruiter@mp.com"])
+        self.assertIn("Python Developer", body)
+        self.assertIn("Applicants today : 12", body)
+        self.assertNotIn("Tester", body)
+        self.assertIn("applicant9@mp.com", body)
+        self.assertNotIn("applicant10@mp.com", body)
+
+    def test_no_digest_for_a_single_job(self):
+        self.quiet_job.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = recruiter_jobpost_applicants()
+        self.assertEqual(summary["chunks"], 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class expiring_jobs_test(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(
+            email="recruiter@mp.com", username="recruiter", user_type="RR"
+        )
+        self.applicant = User.objects.create(
+            email="applicant@mp.com", username="applicant"
+        )
+        self.jobs = {
+            age: create_job(
+                self.recruiter,
+                "Job published %s days ago" % age,
+                published_on=datetime.now() - timedelta(days=age),
+            )
+            for age in (10, 23, 30, 40)
+        }
+        AppliedJobs.objects.create(
+            job_post=self.jobs[30], user=self.applicant, status="Pending"
+        )
+
+    def test_jobs_past_the_cutoff_are_closed_before_the_run(self):
+        self.assertEqual(self.jobs[40].status, "Live")
+        self.assertFalse(self.jobs[40].can_accept_applications())
+        self.assertFalse(self.jobs[30].can_accept_applications())
+        self.assertTrue(self.jobs[23].can_accept_applications())
+
+    def test_expiry_pass(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = check_expiring_jobs()
+        self.assertEqual(summary["expired"], 2)
+
+        statuses = dict(JobPost.objects.values_list("id", "status"))
+        self.assertEqual(statuses[self.jobs[10].id], "Live")
+        self.assertEqual(statuses[self.jobs[23].id], "Live")
+        self.assertEqual(statuses[self.jobs[30].id], "Expired")
+        self.assertEqual(statuses[self.jobs[40].id], "Expired")
+        expired = JobPost.objects.get(id=self.jobs[30].id)
+        self.assertFalse(expired.can_accept_applications())
+        live = JobPost.objects.get(id=self.jobs[23].id)
+        self.assertTrue(live.can_accept_applications())
+        self.assertEqual(
+            set(JobPostChange.objects.values_list("job_post_id", flat=True)),
+            {self.jobs[30].id, self.jobs[40].id},
+        )
+
+        subjects = sorted(message.subject for message in mail.outbox)
+        self.assertEqual(
+            subjects,
+            [
+                "Job Posting Expires in 7 Days - Job published 23 days ago",
+                "Job Posting No Longer Accepting Applications - "
+                "Job published 30 days ago",
+            ],
+        )
+
+        # a second run the same day changes and sends nothing
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(check_expiring_jobs()["expired"], 0)
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class job_slugs_test(TestCase):
+    def setUp(self):
+        user = User.objects.create(email="recruiter@mp.com", username="recruiter")
+        self.jobs = [
+            JobPost.objects.create(
+                user=user,
+                title=title,
+                vacancies="1",
+                description="job post description",
+                job_type="full-time",
+                status="Live",
+                min_year=1,
+                max_year=3,
+                slug="/old-slug/",
+            )
+            for title in ("Python Developer", "Tester", "Designer")
+        ]
+        self.current = self.jobs[2]
+        JobPost.objects.filter(id=self.current.id).update(
+            slug="/designer-1-to-3-years-%s/" % self.current.id
+        )
+
+    def test_only_changed_slugs_are_written(self):
+        with mock.patch("mpcomp.job_slugs.update_search_index") as reindex:
+            self.assertEqual(update_job_slugs(chunk_size=2), 2)
+        reindex.assert_called_once()
+        self.assertEqual(
+            sorted(job.id for job in reindex.call_args.args[0]),
+            [self.jobs[0].id, self.jobs[1].id],
+        )
+        self.assertEqual(
+            JobPost.objects.get(id=self.jobs[0].id).slug,
+            "/python-developer-1-to-3-years-%s/" % self.jobs[0].id,
+        )
+        self.assertEqual(
+            set(JobPostChange.objects.values_list("job_post_id", flat=True)),
+            {self.jobs[0].id, self.jobs[1].id},
+        )
+        self.assertEqual(update_job_slugs(), 0)
+
+
+@override_settings(CACHES=TIERED_CACHES, CELERY_TASK_ALWAYS_EAGER=True)
+class search_log_test(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.skill = Skill.objects.create(name="Python", slug="python", status="Active")
+        country = Country.objects.create(name="India")
+        state = State.objects.create(name="Telangana", country_id=country.id)
+        self.city = City.objects.create(
+            name="Hyderabad", slug="hyderabad", state_id=state.id
+        )
+        self.user = User.objects.create(email="applicant@mp.com", username="applicant")
+
+    def test_searches_are_saved_in_bulk(self):
+        now = time.time()
+        with self.assertNumQueries(0):
+            log_search(
+                "127.0.0.1",
+                {"q": "python, Cobol", "location": "Hyderabad"},
+                4,
+                self.user.id,
+            )
+            log_search("127.0.0.2", {"q": "Python, python"}, 2, None)
+        # the window is still open
+        self.assertEqual(flush_search_log(now=now), 0)
+        # id maps, users, search results and the two link tables in a savepoint
+        with self.assertNumQueries(8):
+            self.assertEqual(flush_search_log(now=now + 120), 2)
+        self.assertEqual(flush_search_log(now=now + 120), 0)
+        first, second = SearchResult.objects.order_by("ip_address")
+        self.assertEqual(list(first.skills.all()), [self.skill])
+        self.assertEqual(list(first.locations.all()), [self.city])
+        self.assertEqual(first.other_skill, "Cobol")
+        self.assertEqual(first.user, self.user)
+        self.assertEqual(first.job_post, "4")
+        self.assertEqual(
+            first.search_text, {"skills": "python, Cobol", "locations": "Hyderabad"}
+        )
+        self.assertEqual(list(second.skills.all()), [self.skill])
+        self.assertIsNone(second.user)
+
+    def test_failed_save_keeps_the_window(self):
+        now = time.time()
+        log_search("127.0.0.1", {"q": "python"}, 1, None)
+        with mock.patch(
+            "mpcomp.search_log.save_search_events", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                flush_search_log(now=now + 120)
+        self.assertEqual(flush_search_log(now=now + 120), 1)
+        self.assertEqual(SearchResult.objects.count(), 1)
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+    )
+    def test_searches_are_saved_by_a_task_without_a_shared_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            log_search("127.0.0.1", {"q": "python", "location": "Delhi"}, 1, None)
+        self.assertEqual(flush_search_log(now=time.time() + 120), 0)
+        search_result = SearchResult.objects.get()
+        self.assertEqual(list(search_result.skills.all()), [self.skill])
+        self.assertEqual(search_result.other_location, "Delhi")
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class resume_search_index_test(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = Skill.objects.create(name="Python", slug="python")
+
+    def search(self, text):
+        return list(rank_resumes(AgencyResume.objects.all(), text))
+
+    def test_agency_resumes_are_indexed_on_save(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resume = AgencyResume.objects.create(
+                candidate_name="Ravi Kumar", email="ravi@mp.com"
+            )
+        self.assertEqual(self.search("ravi"), [resume])
+
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            resume.skill.add(self.python)
+        self.assertEqual(self.search("python"), [resume])
+
+    def test_profile_changes_refresh_the_user_vector(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.create(
+                email="seeker@mp.com", username="seeker", user_type="JS"
+            )
+        users = User.objects.filter(user_type="JS")
+
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            user.skills.add(TechnicalSkill.objects.create(skill=self.python))
+        self.assertEqual(list(rank_resumes(users, "python")), [user])
+
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            user.job_title = "Data engineer"
+            user.save(update_fields=["job_title"])
+        self.assertEqual(list(rank_resumes(users, "engineer")), [user])
+
+        # saves of other columns queue nothing
+        cache.clear()
+        with self.captureOnCommitCallbacks() as callbacks:
+            user.save(update_fields=["last_login"])
+        self.assertEqual(callbacks, [])
+
+    def test_beat_task_fills_missing_vectors(self):
+        resume = AgencyResume.objects.create(
+            candidate_name="Ravi Kumar", email="ravi@mp.com"
+        )
+        AgencyResume.objects.update(search_vector=None)
+        update_resume_search_index()
+        self.assertEqual(self.search("ravi"), [resume])
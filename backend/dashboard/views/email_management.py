@@ -3,7 +3,6 @@ from datetime import datetime
 
 from django.http.response import HttpResponse
 from django.shortcuts import render
-from django.template import loader
 
 from mpcomp.views import permission_required
 from peeldb.models import (
@@ -13,7 +12,7 @@ from peeldb.models import (
 )
 
 from ..forms import MailTemplateForm
-from ..tasks import sending_mail, send_email
+from ..tasks import sending_mail
 
 
 # Functions to move here from main views.py:
@@ -131,22 +130,7 @@ def send_mail(request, template_id):
                 request.POST, instance=mailtemplate
             )
             if validate_mailtemplate.is_valid():
-                emailtemplate = mailtemplate
-                t = loader.get_template("email/email_template.html")
-                c = {"text": emailtemplate.message}
-                subject = emailtemplate.subject
-                rendered = t.render(c)
-                mto = []
-                for recruiter in request.POST.getlist("recruiters"):
-                    recruiter = User.objects.get(id=recruiter)
-                    mto.append(recruiter.email)
-                sent_mail = SentMail.objects.create(template=emailtemplate)
-
-                for recruiter in request.POST.getlist("recruiters"):
-                    recruiter = User.objects.get(id=recruiter)
-                    sent_mail.recruiter.add(recruiter)
-                send_email.delay(mto, subject, rendered)
-                sending_mail.delay(mailtemplate, request.POST.getlist("recruiters"))
+                sending_mail.delay(mailtemplate.id, request.POST.getlist("recruiters"))
                 return HttpResponse(
                     json.dumps({"error": False, "response": "Email Sent Successfully"})
                 )
@@ -10,6 +10,7 @@ from django.http.response import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, render
 from django.template import loader
 
+from mpcomp.job_publishing import schedule_go_live
 from mpcomp.views import (
     get_absolute_url,
     get_prev_after_pages_count,
@@ -133,9 +134,11 @@ def status_change(request, post_id):
     if post.status == "Live":
         post.status = "Expired"
         post.save()
+        post.log_change("Expired")
     else:
         post.status = "Live"
         post.save()
+        post.log_change("Live")
     c = {"job_post": post, "user": post.user}
     t = loader.get_template("email/jobpost.html")
     subject = "InaWorks JobPost Status"
@@ -154,6 +157,7 @@ def deactivate_job(request, job_post_id):
     job_post.previous_status = job_post.status
     job_post.status = "Disabled"
     job_post.save()
+    job_post.log_change("Disabled")
 
     return HttpResponseRedirect(
         reverse("dashboard:job_posts", args=(job_post.job_type,))
@@ -181,13 +185,11 @@ def publish_job(request, job_post_id):
     if job_post.status == "Pending":
         job_post.status = "Published"
         job_post.save()
-        
+        schedule_go_live([job_post.id])
     else:
         job_post.status = "Pending"
         job_post.save()
-     
-    job_post.save()
-    
+
     return HttpResponseRedirect(
         reverse("dashboard:job_posts", args=(job_post.job_type,))
     )
@@ -198,6 +200,7 @@ def enable_job(request, job_post_id):
     job_post = get_object_or_404(JobPost, id=job_post_id)
     job_post.status = job_post.previous_status
     job_post.save()
+    job_post.log_change("Live" if job_post.status == "Live" else "Updated")
         
     return HttpResponseRedirect(
         reverse("dashboard:job_posts", args=(job_post.job_type,))
@@ -761,6 +764,9 @@ def edit_job_title(request, post_id):
             job_url = get_absolute_url(job_post)
             job_post.slug = job_url
             job_post.save()
+            job_post.log_change(
+                "Live" if send_mail and job_post.status == "Live" else "Updated"
+            )
             if (
                 job_post.major_skill
                 and job_post.major_skill not in job_post.skills.all()
@@ -1,9 +1,12 @@
 import json
-from django.contrib.auth.decorators import login_required
+import uuid
+
+from django.conf import settings
 from django.db.models import Count
 from django.http.response import HttpResponse
 from django.shortcuts import get_object_or_404, render
 
+from mpcomp.aws import delete_object, get_object_url, upload_many
 from mpcomp.views import permission_required
 from peeldb.models import (
     AgencyCompanyBranch,
@@ -28,70 +31,116 @@ from ..forms import MetaForm
 
 # Functions to move here from main views.py:
 
-@login_required
+# uploads of the dashboard editors, stored private under uploads/<user id>/
+UPLOAD_CONTENT_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+UPLOAD_MAX_SIZE = 2 * 1024 * 1024
+UPLOAD_MAX_FILES = 10
+
+
+def get_upload_folder(user):
+    return "uploads/" + str(user.id) + "/"
+
+
+@permission_required("activity_edit")
 def aws_push_to_s3(request):
     if request.method == "POST":
-        if request.FILES.get("upload_file"):
-            blog_post = Post.objects.filter(id=request.POST.get("post_id"))
-            if blog_post:
-                attachment = BlogAttachment.objects.create(
-                    post=blog_post[0],
-                    uploaded_by=request.user,
-                    attached_file=request.FILES.get("upload_file"),
+        files = request.FILES.getlist("upload_file")
+        if not files:
+            return HttpResponse(
+                json.dumps({"error": True, "response": "Please Upload An Image"})
+            )
+        if len(files) > UPLOAD_MAX_FILES:
+            return HttpResponse(
+                json.dumps(
+                    {
+                        "error": True,
+                        "response": "Upload at most %s files at a time"
+                        % UPLOAD_MAX_FILES,
+                    }
                 )
+            )
+        for each in files:
+            if each.content_type not in UPLOAD_CONTENT_TYPES:
                 return HttpResponse(
                     json.dumps(
                         {
-                            "error": False,
-                            "response": "Please Upload An Image",
-                            "url": str(settings.STATIC_URL)
-                            + str(attachment.attached_file.name),
-                            "name": attachment.attached_file.name,
-                            "id": attachment.id,
+                            "error": True,
+                            "response": "Only JPG, PNG, GIF and WEBP images are "
+                            "allowed",
                         }
                     )
                 )
-            return HttpResponse(
-                json.dumps(
-                    {
-                        "error": True,
-                        "response": "Blog post is not exist, please try again",
-                    }
+            if each.size > UPLOAD_MAX_SIZE:
+                return HttpResponse(
+                    json.dumps(
+                        {"error": True, "response": "Image size must not exceed 2MB"}
+                    )
                 )
-            )
+        folder = get_upload_folder(request.user)
+        # the client file name is never part of the key
+        keys = upload_many(
+            [
+                (
+                    folder + uuid.uuid4().hex + UPLOAD_CONTENT_TYPES[each.content_type],
+                    each,
+                )
+                for each in files
+            ],
+            settings.AWS_STORAGE_BUCKET_NAME,
+            public_read=False,
+        )
         return HttpResponse(
-            json.dumps({"error": True, "response": "Please Upload An Image"})
+            json.dumps(
+                {
+                    "error": False,
+                    "response": "Files Uploaded Successfully",
+                    "files": [
+                        {
+                            "url": get_object_url(
+                                settings.AWS_STORAGE_BUCKET_NAME, key
+                            ),
+                            "name": key,
+                        }
+                        for key in keys
+                    ],
+                }
+            )
         )
+    return HttpResponse(
+        json.dumps({"error": True, "response": "Please Upload An Image"})
+    )
 
 
-@login_required
+@permission_required("activity_edit")
 def aws_del_from_s3(request):
     if request.method == "POST":
-        if request.POST.get("attachment_id"):
-            blog_attachment = BlogAttachment.objects.filter(
-                id=request.POST.get("attachment_id")
-            )
-            if blog_attachment:
-                blog_attachment.delete()
-                return HttpResponse(
-                    json.dumps(
-                        {"error": False, "response": "Attachment Deleted Successfully"}
-                    )
-                )
+        key = request.POST.get("name", "")
+        # only the uploads of the requesting user can be deleted
+        if key.startswith(get_upload_folder(request.user)):
+            delete_object(settings.AWS_STORAGE_BUCKET_NAME, key)
             return HttpResponse(
                 json.dumps(
-                    {
-                        "error": True,
-                        "response": "Blog post is not exist, please try again",
-                    }
+                    {"error": False, "response": "Attachment Deleted Successfully"}
                 )
             )
+        return HttpResponse(
+            json.dumps(
+                {
+                    "error": True,
+                    "response": "Attachment does not exist, please try again",
+                }
+            )
+        )
     return HttpResponse(
         json.dumps({"error": True, "response": "Please Upload An Image"})
     )
 
 
-
 def updating_meta_data():
     skills = Skill.objects.filter(status="Active", slug="java")
     for skill in skills:
@@ -1,4 +1,5 @@
 import re
+from django.conf import settings
 from django.shortcuts import redirect
 
 try:
@@ -7,6 +8,8 @@ except ImportError:
     resource = None
 from django.utils.deprecation import MiddlewareMixin
 
+from mpcomp.db_router import PIN_COOKIE, pin_primary
+
 
 # class StatsMiddleware(MiddlewareMixin):
 
@@ -240,3 +243,26 @@ class LowerCased(MiddlewareMixin):
                 return redirect("/social/user/update/", permanent=False)
         # if request.path == "/recruiter/":
         #     return redirect("/post-job/", permanent=False)
+
+
+class PinPrimary:
+    """
+    Read-your-writes for read replica routing: reads of a client stay on the
+    primary database for REPLICA_PIN_SECONDS after one of its requests wrote.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with pin_primary(PIN_COOKIE in request.COOKIES) as pin:
+            response = self.get_response(request)
+        if pin.wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=getattr(settings, "REPLICA_PIN_SECONDS", 10),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
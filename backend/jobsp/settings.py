@@ -22,6 +22,21 @@ RECRUITER_FRONTEND_URL = os.getenv("RECRUITER_FRONTEND_URL", "http://localhost:5
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/1")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND")
 CELERY_IMPORTS = ("dashboard.tasks")
+# one queue per workload, see mpcomp/task_routing.py
+CELERY_TASK_ROUTES = ("mpcomp.task_routing.route_task",)
+# per email worker process, keep the total under the provider's send rate
+CELERY_TASK_ANNOTATIONS = {
+    "dashboard.tasks.send_email": {
+        "rate_limit": os.getenv("CELERY_EMAIL_RATE_LIMIT", "5/s")
+    },
+    # 50 emails per task, see mpcomp/fanout.py
+    "dashboard.tasks.send_bulk_email": {
+        "rate_limit": os.getenv("CELERY_BULK_EMAIL_RATE_LIMIT", "6/m")
+    },
+    "dashboard.tasks.send_emails": {
+        "rate_limit": os.getenv("CELERY_BULK_EMAIL_RATE_LIMIT", "6/m")
+    },
+}
 
 
 # Enable debug logging
@@ -91,6 +106,20 @@ DATABASES = {
     }
 }
 
+# Read replicas of the default database, comma separated hosts. The first one
+# is the "replica" alias, see mpcomp/db_router.py
+REPLICA_DATABASES = []
+for index, host in enumerate(
+    host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host
+):
+    alias = "replica" if index == 0 else "replica_%d" % (index + 1)
+    DATABASES[alias] = dict(DATABASES["default"], HOST=host, TEST={"MIRROR": "default"})
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["mpcomp.db_router.ReplicaRouter"]
+# seconds the reads of a client stay on the primary after it wrote
+REPLICA_PIN_SECONDS = 10
+
 
 TIME_ZONE = "Asia/Kolkata"
 
@@ -148,6 +177,7 @@ INSTALLED_APPS = (
     "drf_spectacular",  # API documentation
     "api",  # New API app for job seekers
     "course",
+    "mp_celery_monitor",
 )
 
 MIDDLEWARE = [
@@ -161,6 +191,7 @@ MIDDLEWARE = [
     # "hmin.middleware.MarkMiddleware",
     # "jobsp.middlewares.DetectMobileBrowser",
     "jobsp.middlewares.LowerCased",
+    "jobsp.middlewares.PinPrimary",
 ]
 
 
@@ -273,10 +304,11 @@ HAYSTACK_SEARCH_RESULTS_PER_PAGE = 1
 CELERY_TIMEZONE = "Asia/Calcutta"
 
 CELERY_BEAT_SCHEDULE = {
-    # Executes every day evening at 5:00 PM GMT +5.30
+    # Published jobs go live from their own scheduled task, this only catches
+    # the ones whose task was lost
     "moving-published-jobs-to-live": {
         "task": "dashboard.tasks.jobpost_published",
-        "schedule": crontab(minute="*", day_of_week="mon,tue,wed,thu,fri,sat"),
+        "schedule": crontab(minute="0"),
     },
     "sending-today-applied-users-info-to-recruiters": {
         "task": "dashboard.tasks.recruiter_jobpost_applicants",
@@ -296,6 +328,23 @@ CELERY_BEAT_SCHEDULE = {
             hour="08", minute="00", day_of_week="mon,tue,wed,thu,fri,sat,sun"
         ),
     },
+    "updating-resume-search-index": {
+        "task": "dashboard.tasks.update_resume_search_index",
+        "schedule": crontab(minute="*/15"),
+    },
+    "updating-similar-jobs": {
+        "task": "dashboard.tasks.update_similar_jobs",
+        "schedule": crontab(minute="*/5"),
+    },
+    "updating-sitemap-snapshot": {
+        "task": "dashboard.tasks.update_sitemap_snapshot",
+        "schedule": crontab(minute="*/10"),
+    },
+    "rebuilding-sitemap-snapshot": {
+        "task": "dashboard.tasks.update_sitemap_snapshot",
+        "schedule": crontab(hour="00", minute="10"),
+        "kwargs": {"force": True},
+    },
     "sending-weekly-jobs-notifications-to-applicants": {
         "task": "dashboard.tasks.applicants_job_notifications",
         "schedule": crontab(hour="09", minute="00", day_of_week="mon"),
@@ -357,6 +406,14 @@ CELERY_BEAT_SCHEDULE = {
             hour="00", minute="20", day_of_week="mon,tue,wed,thu,fri,sat,sun"
         ),
     },
+    "saving-buffered-search-logs": {
+        "task": "dashboard.tasks.save_search_log",
+        "schedule": crontab(minute="*"),
+    },
+    "resuming-stalled-notification-fan-outs": {
+        "task": "dashboard.tasks.resume_stalled_fan_outs",
+        "schedule": crontab(minute="30"),
+    },
     "check-expiring-jobs-and-send-notifications": {
         "task": "dashboard.tasks.check_expiring_jobs",
         "schedule": crontab(
@@ -383,6 +440,25 @@ THUMBNAIL_DEBUG = True
 
 THUMBNAIL_FORCE_OVERWRITE = True
 
+# Thumbnails are generated by the generate_thumbnails task, templates never
+# resize images. Logos and profile pictures are pre-generated on upload in
+# the sizes the templates ask for.
+THUMBNAIL_BACKGROUND = True
+THUMBNAIL_WORKERS = 4
+THUMBNAIL_PREGENERATE = {
+    "company_logo": [
+        ("40x40", {}),
+        ("50x50", {}),
+        ("64x64", {}),
+        ("80x80", {}),
+    ],
+    "profile_pic": [
+        ("40x40", {"upscale": True, "padding": True}),
+        ("100x100", {"upscale": True, "padding": True}),
+        ("45x45", {"crop": "80% top"}),
+    ],
+}
+
 
 
 # AWS_ENABLED = os.getenv("AWSENABLED")
@@ -406,6 +482,27 @@ THUMBNAIL_FORCE_OVERWRITE = True
 #     }
 # }
 
+# Two tier cache, a bounded LRU in each process in front of a shared Redis,
+# see mpcomp/cache.py
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "mpcomp.cache.TieredCache",
+            "TIMEOUT": 48 * 60 * 60,
+            "OPTIONS": {
+                "SHARED": "shared",
+                "LOCAL_MAX_ENTRIES": int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", 1000)),
+                "LOCAL_TIMEOUT": int(os.getenv("CACHE_LOCAL_TIMEOUT", 5)),
+            },
+        },
+        "shared": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+            "TIMEOUT": 48 * 60 * 60,
+        },
+    }
+
 FB_ACCESS_TOKEN = os.getenv("FBACCESSTOKEN")
 FB_PAGE_ACCESS_TOKEN = os.getenv("FBPAGEACCESSTOKEN")
 FB_GROUP_ACCESS_TOKEN = os.getenv("FBGROUPACCESSTOKEN")
@@ -517,8 +614,20 @@ DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 EMAIL_BACKEND = "django_ses.SESBackend"
 
 MP_CELERY_MONITOR_KEY = os.getenv("MP_CELERY_MONITOR_KEY")
+# task metrics, see mp_celery_monitor/metrics.py
+CELERY_MONITOR_FLUSH_INTERVAL = 30
+CELERY_MONITOR_RETENTION_DAYS = 14
+CELERY_MONITOR_EMAIL_TASKS = [
+    "dashboard.tasks.send_email",
+    "dashboard.tasks.send_bulk_email",
+    "dashboard.tasks.send_emails",
+]
 CELERY_MONITOR_URL = os.getenv("CELERY_MONITOR_URL")
 
+# searches are buffered per window of seconds, see mpcomp/search_log.py
+SEARCH_LOG_WINDOW = 60
+SEARCH_LOG_TIMEOUT = 60 * 60
+
 # Tailwind CSS Configuration
 TAILWIND_CSS_FILE = "css/tailwind-output.css"
 
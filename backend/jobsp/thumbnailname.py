@@ -1,6 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+
+from django.conf import settings as django_settings
+from django.core.cache import cache
 from sorl.thumbnail.base import ThumbnailBackend, EXTENSIONS
+from sorl.thumbnail.conf import defaults as default_settings
 from sorl.thumbnail.conf import settings
 from sorl.thumbnail.helpers import tokey, serialize
+from sorl.thumbnail.images import ImageFile
 import os.path
 import logging
 import os
@@ -10,6 +17,35 @@ from sorl.thumbnail.parsers import parse_geometry
 logger = logging.getLogger(__name__)
 
 
+def get_source_name(file_):
+    """Serializable form of a thumbnail source, a url or storage file name"""
+    return getattr(file_, "name", file_)
+
+
+def get_thumbnail_variants(kind):
+    """
+    Geometries and options to pre-generate for a kind of image, see
+    THUMBNAIL_PREGENERATE.
+    """
+    pregenerate = getattr(django_settings, "THUMBNAIL_PREGENERATE", {})
+    return list(pregenerate.get(kind, []))
+
+
+def queue_thumbnails(file_, variants):
+    """Generate the thumbnail variants of an image on a worker, once per image"""
+    from dashboard.tasks import generate_thumbnails
+
+    if not file_ or not variants:
+        return
+    name = get_source_name(file_)
+    key = "thumbnails-queued:%s" % hashlib.md5(
+        serialize([name, variants]).encode("utf-8")
+    ).hexdigest()
+    timeout = getattr(django_settings, "THUMBNAIL_QUEUE_TIMEOUT", 60 * 5)
+    if cache.add(key, 1, timeout=timeout):
+        generate_thumbnails.delay(name, variants)
+
+
 class SEOThumbnailBackend(ThumbnailBackend):
     def _get_thumbnail_filename(self, source, geometry_string, options):
         """
@@ -25,6 +61,83 @@ class SEOThumbnailBackend(ThumbnailBackend):
             EXTENSIONS[options["format"]],
         )
 
+    def _get_options(self, source, options):
+        """Options completed with the defaults, as ThumbnailBackend.get_thumbnail"""
+        options = dict(options)
+        if settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault("format", self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        return options
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        """
+        With THUMBNAIL_BACKGROUND a missing thumbnail is queued for a worker and
+        the source image is returned meanwhile, rendering never resizes images.
+        """
+        if not file_ or not getattr(django_settings, "THUMBNAIL_BACKGROUND", False):
+            return super().get_thumbnail(file_, geometry_string, **options)
+        source = ImageFile(file_)
+        name = self._get_thumbnail_filename(
+            source, geometry_string, self._get_options(source, options)
+        )
+        cached = default.kvstore.get(ImageFile(name, default.storage))
+        if cached:
+            return cached
+        queue_thumbnails(file_, [(geometry_string, options)])
+        return source
+
+    def create_thumbnails(self, file_, variants):
+        """
+        Create the missing variants of an image from a single read of the
+        source, resizing on a thread pool, and record them in the KV store.
+        Returns the number of thumbnails created.
+        """
+        source = ImageFile(file_)
+        missing = []
+        for geometry_string, options in variants:
+            options = self._get_options(source, options)
+            thumbnail = ImageFile(
+                self._get_thumbnail_filename(source, geometry_string, options),
+                default.storage,
+            )
+            if not default.kvstore.get(thumbnail):
+                missing.append((geometry_string, options, thumbnail))
+        if not missing:
+            return 0
+
+        source_image = default.engine.get_image(source)
+        try:
+            # decode once up front, the workers only read the pixels
+            source_image.load()
+            image_info = default.engine.get_image_info(source_image)
+            source.set_size(default.engine.get_image_size(source_image))
+            workers = getattr(django_settings, "THUMBNAIL_WORKERS", 4)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        self._create_thumbnail,
+                        source_image,
+                        geometry_string,
+                        dict(options, image_info=image_info),
+                        thumbnail,
+                    )
+                    for geometry_string, options, thumbnail in missing
+                ]
+                for future in futures:
+                    future.result()
+        finally:
+            default.engine.cleanup(source_image)
+
+        default.kvstore.get_or_set(source)
+        for geometry_string, options, thumbnail in missing:
+            default.kvstore.set(thumbnail, source)
+        return len(missing)
+
     def _create_thumbnail(self, source_image, geometry_string, options, thumbnail):
         """
         Creates the thumbnail by using default.engine
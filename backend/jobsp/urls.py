@@ -327,6 +327,8 @@ urlpatterns += [
 
 # Add Django Sitemap URLs (Modern replacement for old sitemap generation)
 from django.contrib.sitemaps.views import sitemap as sitemap_view, index as sitemap_index
+from django.views.decorators.gzip import gzip_page
+from mpcomp.db_router import read_replica
 from psite.sitemaps import (
     JobPostSitemap,
     SkillLocationSitemap,
@@ -350,9 +352,10 @@ sitemaps = {
 urlpatterns += [
     # Sitemap index - automatically splits into multiple files if needed
     # Domain (inaworks.id) configured via Django Site framework (SITE_ID=1)
-    path('sitemap.xml', sitemap_index, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.index'),
-    # Individual sitemap sections
-    path('sitemap-<section>.xml', sitemap_view, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    # Served from the precomputed snapshot (psite.sitemaps), gzip encoded
+    path('sitemap.xml', gzip_page(read_replica()(sitemap_index)), {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.index'),
+    # Individual sitemap sections, paged with ?p= beyond 50000 urls
+    path('sitemap-<section>.xml', gzip_page(read_replica()(sitemap_view)), {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
 ]
 
 handler404 = custom_404
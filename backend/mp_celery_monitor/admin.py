@@ -1,2 +1,9 @@
+from django.contrib import admin
 
-# Register your models here.
+from .models import TaskMetric
+
+
+@admin.register(TaskMetric)
+class TaskMetricAdmin(admin.ModelAdmin):
+    list_display = ("task_name", "period", "runs", "failures", "retries")
+    list_filter = ("task_name",)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MpCeleryMonitorConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "mp_celery_monitor"
+
+    def ready(self):
+        from mp_celery_monitor import signals  # noqa: F401
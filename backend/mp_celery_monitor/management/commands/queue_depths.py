@@ -0,0 +1,62 @@
+"""
+Management command to show the messages waiting in every Celery queue and
+the workers consuming it.
+
+Usage:
+    python manage.py queue_depths
+    python manage.py queue_depths --no-workers
+"""
+from django.core.management.base import BaseCommand
+from kombu.exceptions import ChannelError
+
+from jobsp.celery import app
+from mpcomp.task_routing import QUEUES
+
+
+def get_queue_depths(queues=QUEUES):
+    depths = {}
+    with app.connection_for_read() as connection:
+        channel = connection.default_channel
+        for queue in queues:
+            try:
+                depths[queue] = channel.queue_declare(
+                    queue=queue, passive=True
+                ).message_count
+            except ChannelError:
+                # redis drops the key of an empty queue
+                depths[queue] = 0
+    return depths
+
+
+def get_queue_workers(timeout=1):
+    workers = {}
+    active_queues = app.control.inspect(timeout=timeout).active_queues() or {}
+    for worker, queues in active_queues.items():
+        for queue in queues:
+            workers.setdefault(queue["name"], []).append(worker)
+    return workers
+
+
+class Command(BaseCommand):
+    help = "Show the depth of every Celery queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-workers",
+            action="store_true",
+            help="Skip asking the workers which queues they consume",
+        )
+
+    def handle(self, *args, **options):
+        workers = {} if options["no_workers"] else get_queue_workers()
+        for queue, depth in get_queue_depths().items():
+            line = f"{queue}: {depth}"
+            if options["no_workers"]:
+                self.stdout.write(line)
+                continue
+            consumers = workers.get(queue)
+            line += " (workers: %s)" % (", ".join(consumers) if consumers else "none")
+            if depth and not consumers:
+                # nothing will ever drain this queue
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
@@ -0,0 +1,141 @@
+"""
+Celery task instrumentation.
+
+Celery signals (see signals.py) time every run of a task in the worker, how
+long its message waited in the broker, from the published_at header set when
+it was queued (or its ETA) to the start of the run, its retries and failures,
+and the tasks the run queued. The counts are kept in the process and added to
+the hourly TaskMetric row of each task every CELERY_MONITOR_FLUSH_INTERVAL
+seconds, rows older than CELERY_MONITOR_RETENTION_DAYS are dropped.
+"""
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import HISTOGRAM_BOUNDS, TaskMetric, empty_histogram
+
+COUNTERS = ("runs", "failures", "retries", "waits", "children", "emails")
+FIELDS = COUNTERS + (
+    "runtime_total",
+    "runtime_max",
+    "runtime_histogram",
+    "wait_total",
+    "wait_max",
+    "wait_histogram",
+)
+
+_lock = threading.Lock()
+_pending = {}
+_state = {"flushed_at": time.monotonic(), "pruned_at": 0}
+
+
+def get_period():
+    return datetime.now().replace(minute=0, second=0, microsecond=0)
+
+
+def empty_counts():
+    counts = {field: 0 for field in FIELDS}
+    counts["runtime_histogram"] = empty_histogram()
+    counts["wait_histogram"] = empty_histogram()
+    return counts
+
+
+def merge_counts(target, counts):
+    """Add counts into target, both dicts of FIELDS"""
+    for field in FIELDS:
+        if field.endswith("_max"):
+            target[field] = max(target[field], counts[field])
+        elif field.endswith("_histogram"):
+            target[field] = [a + b for a, b in zip(target[field], counts[field])]
+        else:
+            target[field] += counts[field]
+    return target
+
+
+def _counts(task_name):
+    key = (task_name, get_period())
+    if key not in _pending:
+        _pending[key] = empty_counts()
+    return _pending[key]
+
+
+def record(task_name, counter):
+    with _lock:
+        _counts(task_name)[counter] += 1
+
+
+def record_timing(task_name, kind, seconds):
+    """Add a runtime or a queue wait of a task, kind is "runtime" or "wait" """
+    with _lock:
+        counts = _counts(task_name)
+        counts["runs" if kind == "runtime" else "waits"] += 1
+        counts[kind + "_total"] += seconds
+        counts[kind + "_max"] = max(counts[kind + "_max"], seconds)
+        counts[kind + "_histogram"][bisect_left(HISTOGRAM_BOUNDS, seconds)] += 1
+
+
+def maybe_flush():
+    interval = getattr(settings, "CELERY_MONITOR_FLUSH_INTERVAL", 30)
+    if time.monotonic() - _state["flushed_at"] >= interval:
+        flush_task_metrics()
+
+
+def flush_task_metrics():
+    """Add the counts of this process to the TaskMetric rows"""
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _state["flushed_at"] = time.monotonic()
+    for (task_name, period), counts in pending.items():
+        with transaction.atomic():
+            metric, _ = TaskMetric.objects.select_for_update().get_or_create(
+                task_name=task_name, period=period
+            )
+            stored = {field: getattr(metric, field) for field in FIELDS}
+            for field, value in merge_counts(stored, counts).items():
+                setattr(metric, field, value)
+            metric.save()
+    if time.monotonic() - _state["pruned_at"] >= 60 * 60:
+        _state["pruned_at"] = time.monotonic()
+        retention = getattr(settings, "CELERY_MONITOR_RETENTION_DAYS", 14)
+        TaskMetric.objects.filter(
+            period__lt=get_period() - timedelta(days=retention)
+        ).delete()
+
+
+def percentile(histogram, fraction):
+    """Upper bound of the bucket holding the given fraction of the samples"""
+    total = sum(histogram)
+    if not total:
+        return None
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= total * fraction:
+            break
+    return HISTOGRAM_BOUNDS[index] if index < len(HISTOGRAM_BOUNDS) else None
+
+
+def summarize_task_metrics(hours=24):
+    """Metrics per task over the last hours, the most time consuming first"""
+    since = get_period() - timedelta(hours=hours - 1)
+    tasks = {}
+    for metric in TaskMetric.objects.filter(period__gte=since):
+        task = tasks.setdefault(metric.task_name, empty_counts())
+        merge_counts(task, {field: getattr(metric, field) for field in FIELDS})
+    for task_name, task in tasks.items():
+        task["task"] = task_name
+        for kind, count in (("runtime", task["runs"]), ("wait", task["waits"])):
+            total = task[kind + "_total"]
+            task[kind + "_avg"] = round(total / count, 3) if count else None
+            task[kind + "_p50"] = percentile(task[kind + "_histogram"], 0.5)
+            task[kind + "_p95"] = percentile(task[kind + "_histogram"], 0.95)
+    return {
+        "since": since,
+        "histogram_bounds": HISTOGRAM_BOUNDS,
+        "tasks": sorted(tasks.values(), key=lambda task: -task["runtime_total"]),
+    }
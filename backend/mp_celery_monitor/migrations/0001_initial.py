@@ -0,0 +1,39 @@
+# Generated by Django 5.2.10 on 2026-10-19 20:12
+
+import django.contrib.postgres.fields
+import mp_celery_monitor.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_name', models.CharField(max_length=255)),
+                ('period', models.DateTimeField(db_index=True)),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('retries', models.PositiveIntegerField(default=0)),
+                ('runtime_total', models.FloatField(default=0)),
+                ('runtime_max', models.FloatField(default=0)),
+                ('runtime_histogram', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), default=mp_celery_monitor.models.empty_histogram, size=None)),
+                ('waits', models.PositiveIntegerField(default=0)),
+                ('wait_total', models.FloatField(default=0)),
+                ('wait_max', models.FloatField(default=0)),
+                ('wait_histogram', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), default=mp_celery_monitor.models.empty_histogram, size=None)),
+                ('children', models.PositiveIntegerField(default=0)),
+                ('emails', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('task_name', 'period')},
+            },
+        ),
+    ]
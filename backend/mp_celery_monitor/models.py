@@ -1,2 +1,40 @@
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
 
-# Create your models here.
+# upper bounds in seconds of the runtime and queue wait histogram buckets,
+# the last bucket counts everything slower
+HISTOGRAM_BOUNDS = (0.1, 0.5, 1, 5, 30, 60, 300, 1800)
+
+
+def empty_histogram():
+    return [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+
+class TaskMetric(models.Model):
+    """
+    Runs of a Celery task during one hour: counts, runtime and queue wait
+    (publish to start) totals, maxima and histograms. Rows older than
+    CELERY_MONITOR_RETENTION_DAYS are dropped.
+    """
+    task_name = models.CharField(max_length=255)
+    period = models.DateTimeField(db_index=True)
+    runs = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    retries = models.PositiveIntegerField(default=0)
+    runtime_total = models.FloatField(default=0)
+    runtime_max = models.FloatField(default=0)
+    runtime_histogram = ArrayField(
+        models.PositiveIntegerField(), default=empty_histogram
+    )
+    waits = models.PositiveIntegerField(default=0)
+    wait_total = models.FloatField(default=0)
+    wait_max = models.FloatField(default=0)
+    wait_histogram = ArrayField(
+        models.PositiveIntegerField(), default=empty_histogram
+    )
+    # tasks queued by the runs, and how many of them were emails
+    children = models.PositiveIntegerField(default=0)
+    emails = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("task_name", "period")
@@ -0,0 +1,70 @@
+"""
+Celery signal handlers feeding the task metrics, see metrics.py.
+"""
+import time
+from datetime import datetime
+
+from celery import current_task
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_postrun,
+    task_prerun,
+    task_retry,
+    worker_process_shutdown,
+)
+from django.conf import settings
+
+from .metrics import flush_task_metrics, maybe_flush, record, record_timing
+
+_started = {}
+
+
+@before_task_publish.connect
+def task_published(sender=None, headers=None, **kwargs):
+    if headers is not None:
+        headers["published_at"] = time.time()
+    parent = current_task
+    if parent and parent.request.id and not parent.request.called_directly:
+        record(parent.name, "children")
+        email_tasks = getattr(
+            settings, "CELERY_MONITOR_EMAIL_TASKS", ["dashboard.tasks.send_email"]
+        )
+        if sender in email_tasks:
+            record(parent.name, "emails")
+
+
+@task_prerun.connect
+def task_started(task_id=None, task=None, **kwargs):
+    _started[task_id] = time.perf_counter()
+    published_at = getattr(task.request, "published_at", None)
+    if published_at is None:
+        return
+    if task.request.eta:
+        # a delayed task only starts waiting at its ETA
+        eta = datetime.fromisoformat(str(task.request.eta)).timestamp()
+        published_at = max(published_at, eta)
+    record_timing(task.name, "wait", max(time.time() - published_at, 0))
+
+
+@task_postrun.connect
+def task_finished(task_id=None, task=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is not None:
+        record_timing(task.name, "runtime", time.perf_counter() - started)
+    maybe_flush()
+
+
+@task_retry.connect
+def task_retried(sender=None, **kwargs):
+    record(sender.name, "retries")
+
+
+@task_failure.connect
+def task_failed(sender=None, **kwargs):
+    record(sender.name, "failures")
+
+
+@worker_process_shutdown.connect
+def worker_stopping(**kwargs):
+    flush_task_metrics()
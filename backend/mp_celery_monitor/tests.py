@@ -1,2 +1,92 @@
+import io
+import time
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from kombu import Connection
+
+from dashboard.tasks import send_email
+from jobsp.celery import app
+from mpcomp.task_routing import QUEUES
+from peeldb.models import User
+
+from . import metrics, signals
+from .models import TaskMetric
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class task_metrics_test(TestCase):
+    def setUp(self):
+        metrics._pending.clear()
+
+    def test_task_runs_are_recorded(self):
+        send_email.delay("user@mp.com", "subject", "body")
+        send_email.delay("user@mp.com", "subject", "body")
+        metrics.flush_task_metrics()
+
+        metric = TaskMetric.objects.get(task_name=send_email.name)
+        self.assertEqual(metric.runs, 2)
+        self.assertEqual(sum(metric.runtime_histogram), 2)
+        self.assertEqual(metric.failures, 0)
+
+        # a second flush adds to the row of the hour
+        send_email.delay("user@mp.com", "subject", "body")
+        metrics.flush_task_metrics()
+        metric.refresh_from_db()
+        self.assertEqual(metric.runs, 3)
+
+    def test_queue_wait(self):
+        task = SimpleNamespace(
+            name="dashboard.tasks.daily_report",
+            request=SimpleNamespace(published_at=time.time() - 2, eta=None),
+        )
+        signals.task_started(task_id="1", task=task)
+        signals.task_finished(task_id="1", task=task)
+        metrics.record("dashboard.tasks.daily_report", "failures")
+        metrics.flush_task_metrics()
+
+        summary = metrics.summarize_task_metrics()
+        (task_summary,) = summary["tasks"]
+        self.assertEqual(task_summary["waits"], 1)
+        self.assertGreaterEqual(task_summary["wait_max"], 2)
+        self.assertEqual(task_summary["wait_p95"], 5)
+        self.assertEqual(task_summary["failures"], 1)
+
+    @override_settings(MP_CELERY_MONITOR_KEY="key")
+    def test_endpoints(self):
+        metrics.record_timing("dashboard.tasks.daily_report", "runtime", 0.2)
+        metrics.flush_task_metrics()
+
+        response = self.client.get("/celery-check/tasks.json?project_key=wrong")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/celery-check/tasks.json?project_key=key")
+        self.assertEqual(response.json()["tasks"][0]["runtime_p50"], 0.5)
+
+        response = self.client.get("/celery-check/tasks/")
+        self.assertEqual(response.status_code, 302)
+        staff = User.objects.create(
+            email="admin@mp.com", username="admin", is_staff=True
+        )
+        self.client.force_login(staff)
+        response = self.client.get("/celery-check/tasks/")
+        self.assertContains(response, "dashboard.tasks.daily_report")
+
+
+class queue_depths_test(TestCase):
+    def test_queue_depths(self):
+        connection = Connection("memory://")
+        # the in-memory transport also holds what other tests queued
+        for queue in QUEUES:
+            connection.default_channel.queue_declare(queue=queue)
+            connection.default_channel.queue_purge(queue)
+        producer = connection.Producer()
+        for _ in range(3):
+            producer.publish({}, routing_key="email")
+
+        out = io.StringIO()
+        with mock.patch.object(app, "connection_for_read", lambda: connection):
+            call_command("queue_depths", "--no-workers", stdout=out)
+        self.assertIn("email: 3", out.getvalue())
+        self.assertIn("housekeeping: 0", out.getvalue())
@@ -1,7 +1,11 @@
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
-from .views import celery_check
+from .views import celery_check, task_metrics, task_metrics_json
 
 app_name = "mp_celery_monitor"
 
-urlpatterns = [path("", csrf_exempt(celery_check), name="celery_check")]
+urlpatterns = [
+    path("", csrf_exempt(celery_check), name="celery_check"),
+    path("tasks/", task_metrics, name="task_metrics"),
+    path("tasks.json", csrf_exempt(task_metrics_json), name="task_metrics_json"),
+]
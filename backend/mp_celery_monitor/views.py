@@ -1,7 +1,12 @@
+from django.http import JsonResponse
 from django.http.response import HttpResponse
 from django.conf import settings
+from django.shortcuts import render
 
 from jobsp.celery import app
+from mpcomp.views import permission_required
+
+from .metrics import summarize_task_metrics
 
 
 def celery_check(request):
@@ -17,3 +22,27 @@ def celery_check(request):
         return HttpResponse(celery_status)
     else:
         return HttpResponse("Invalid key", status=400)
+
+
+def get_hours(request):
+    try:
+        return min(max(int(request.GET.get("hours", 24)), 1), 24 * 14)
+    except ValueError:
+        return 24
+
+
+@permission_required()
+def task_metrics(request):
+    return render(
+        request,
+        "dashboard/task_metrics.html",
+        summarize_task_metrics(get_hours(request)),
+    )
+
+
+def task_metrics_json(request):
+    project_key = settings.MP_CELERY_MONITOR_KEY
+    given_key = request.POST.get("project_key") or request.GET.get("project_key")
+    if not project_key or project_key != given_key:
+        return JsonResponse({"error": "Invalid key"}, status=400)
+    return JsonResponse(summarize_task_metrics(get_hours(request)))
@@ -1,58 +1,188 @@
+"""
+S3 uploads and CloudFront invalidations.
+
+boto3 clients are created once per process and credentials and shared by all
+threads, so connections are reused. Uploads are streamed from the file object,
+and files above S3_MULTIPART_THRESHOLD are sent as multipart uploads. Bulk
+pushes run with at most S3_UPLOAD_CONCURRENCY uploads at a time. CloudFront
+invalidations are queued in the cache and sent as one batch per time window
+(CLOUDFRONT_INVALIDATION_WINDOW seconds) when the cache is shared by the web
+and Celery workers, and sent right away otherwise. AWS_S3_ENDPOINT_URL points
+the S3 client at an S3 compatible server, e.g. a local stub in development.
+"""
+import mimetypes
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from django.conf import settings
-import mimetypes
+from django.core.cache import cache
+
+from mpcomp.cache import is_shared_cache
+
+MB = 1024 * 1024
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(service, access_key_id=None, secret_access_key=None):
+    """Process wide boto3 client of a service, boto3 clients are thread safe"""
+    access_key_id = access_key_id or settings.AWS_ACCESS_KEY_ID
+    secret_access_key = secret_access_key or settings.AWS_SECRET_ACCESS_KEY
+    key = (service, access_key_id, secret_access_key)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                options = {}
+                if service == "s3":
+                    options["endpoint_url"] = getattr(
+                        settings, "AWS_S3_ENDPOINT_URL", None
+                    )
+                    options["region_name"] = getattr(
+                        settings, "AWS_S3_REGION_NAME", None
+                    )
+                client = boto3.session.Session().client(
+                    service,
+                    aws_access_key_id=access_key_id,
+                    aws_secret_access_key=secret_access_key,
+                    config=Config(
+                        max_pool_connections=getattr(
+                            settings, "S3_MAX_POOL_CONNECTIONS", 20
+                        ),
+                        retries={"max_attempts": 5, "mode": "standard"},
+                    ),
+                    **options
+                )
+                _clients[key] = client
+    return client
+
+
+def get_transfer_config():
+    return TransferConfig(
+        multipart_threshold=getattr(settings, "S3_MULTIPART_THRESHOLD", 8 * MB),
+        multipart_chunksize=getattr(settings, "S3_MULTIPART_CHUNKSIZE", 8 * MB),
+        max_concurrency=getattr(settings, "S3_MULTIPART_CONCURRENCY", 4),
+    )
+
+
+def upload_fileobj(file_obj, bucket_name, key, public_read=True, client=None):
+    """Stream a file object to S3, in parts when it is above the threshold"""
+    extra_args = {}
+    content_type = mimetypes.guess_type(key)[0]
+    if content_type:
+        extra_args["ContentType"] = content_type
+    if public_read:
+        extra_args["ACL"] = "public-read"
+    if hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    (client or get_client("s3")).upload_fileobj(
+        file_obj,
+        bucket_name,
+        key,
+        ExtraArgs=extra_args,
+        Config=get_transfer_config(),
+    )
+    return key
+
+
+def upload_many(files, bucket_name, public_read=True):
+    """
+    Upload (key, file object) pairs with bounded concurrency.
+    Returns the uploaded keys in the given order, raises the first failure.
+    """
+    client = get_client("s3")
+    workers = getattr(settings, "S3_UPLOAD_CONCURRENCY", 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                upload_fileobj, file_obj, bucket_name, key, public_read, client
+            )
+            for key, file_obj in files
+        ]
+        return [future.result() for future in futures]
+
+
+def get_object_url(bucket_name, key, expires_in=60 * 60):
+    """Temporary download URL of a private object"""
+    return get_client("s3").generate_presigned_url(
+        "get_object",
+        Params={"Bucket": bucket_name, "Key": key},
+        ExpiresIn=expires_in,
+    )
+
+
+def delete_object(bucket_name, key):
+    get_client("s3").delete_object(Bucket=bucket_name, Key=key)
+
+
+def get_invalidation_window():
+    return getattr(settings, "CLOUDFRONT_INVALIDATION_WINDOW", 60)
+
+
+def invalidation_key(window, name):
+    return "cloudfront-invalidation:%s:%s" % (window, name)
+
+
+def queue_cloudfront_invalidation(paths):
+    """Add paths to the invalidation batch of the current time window"""
+    if not getattr(settings, "CLOUDFRONT_DISTRIBUTION_ID", None):
+        return
+    if not is_shared_cache():
+        # the worker could not see the buffer of this process
+        create_cloudfront_invalidation(paths)
+        return
+    from dashboard.tasks import flush_cloudfront_invalidations
+
+    window_size = get_invalidation_window()
+    window = int(time.time() // window_size)
+    timeout = window_size * 10
+    counter = invalidation_key(window, "count")
+    cache.add(counter, 0, timeout=timeout)
+    for path in paths:
+        cache.set(invalidation_key(window, cache.incr(counter)), path, timeout)
+    # the first path of a window schedules the flush shortly after its end
+    if cache.add(invalidation_key(window, "scheduled"), 1, timeout=timeout):
+        flush_cloudfront_invalidations.apply_async(
+            (window,), countdown=max((window + 1) * window_size - time.time(), 0) + 5
+        )
+
+
+def pop_cloudfront_invalidations(window):
+    count = cache.get(invalidation_key(window, "count")) or 0
+    keys = [invalidation_key(window, index) for index in range(1, count + 1)]
+    paths = cache.get_many(keys)
+    cache.delete_many(keys + [invalidation_key(window, "count")])
+    return sorted(set(paths.values()))
+
+
+def create_cloudfront_invalidation(paths):
+    """Invalidate the paths with a single CloudFront request"""
+    if not paths or not getattr(settings, "CLOUDFRONT_DISTRIBUTION_ID", None):
+        return None
+    paths = ["/" + path.lstrip("/") for path in paths]
+    return get_client("cloudfront").create_invalidation(
+        DistributionId=settings.CLOUDFRONT_DISTRIBUTION_ID,
+        InvalidationBatch={
+            "Paths": {"Quantity": len(paths), "Items": paths},
+            "CallerReference": uuid.uuid4().hex,
+        },
+    )
 
 
 class AWS:
     def push_to_s3(
         self, file_obj, bucket_name=None, folder="", new_name=None, public_read=True
     ):
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
-        
-        filename = new_name
-        content = file_obj.read()
-        key = folder + new_name if new_name else filename
-        
-        mime = mimetypes.guess_type(filename)[0]
-        
-        # Upload the file to S3
-        extra_args = {}
-        if mime:
-            extra_args['ContentType'] = mime
-        if public_read:
-            extra_args['ACL'] = 'public-read'
-            
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=key,
-            Body=content,
-            **extra_args
-        )
-
+        key = folder + new_name if new_name else file_obj.name
+        upload_fileobj(file_obj, bucket_name, key, public_read=public_read)
         key_buc = [key, bucket_name]
         return key_buc
 
     def cloudfront_invalidate(self, paths):
-        cloudfront_client = boto3.client(
-            'cloudfront',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
-        
-        # Note: You'll need to provide the distribution ID
-        # This is a placeholder implementation
-        if hasattr(settings, 'CLOUDFRONT_DISTRIBUTION_ID'):
-            cloudfront_client.create_invalidation(
-                DistributionId=settings.CLOUDFRONT_DISTRIBUTION_ID,
-                InvalidationBatch={
-                    'Paths': {
-                        'Quantity': len(paths),
-                        'Items': paths
-                    },
-                    'CallerReference': str(hash(tuple(paths)))
-                }
-            )
+        queue_cloudfront_invalidation(paths)
@@ -0,0 +1,301 @@
+"""
+Two tier cache and versioned cache namespaces.
+
+TieredCache is a cache backend that keeps a bounded LRU of small hot keys in
+each process in front of a shared cache, usually Redis, configured as another
+alias. Only keys starting with one of LOCAL_PREFIXES (by default the
+namespaced keys below) are kept in the process, for at most LOCAL_TIMEOUT
+seconds, every other operation goes straight to the shared tier so add and
+incr keep their atomic semantics.
+
+Lookups, meta data and facet lists are cached under a namespace. Every
+namespace has a version counter in the cache that is part of its keys,
+invalidate_namespace bumps the counter and all the keys of the namespace are
+orphaned at once and expire on their own.
+
+Hits of the local tier, hits of the shared tier and misses are counted per
+process and added to counters in the shared tier every STATS_INTERVAL
+seconds, get_cache_stats reads them back.
+
+    CACHES = {
+        "default": {
+            "BACKEND": "mpcomp.cache.TieredCache",
+            "OPTIONS": {"SHARED": "shared", "LOCAL_MAX_ENTRIES": 1000},
+        },
+        "shared": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://127.0.0.1:6379/1",
+        },
+    }
+"""
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+NAMESPACE_PREFIX = "ns:"
+STATS_PREFIX = "cache-stats:"
+STATS_COUNTERS = ("local_hits", "shared_hits", "misses")
+
+_local_caches = {}
+_local_stats = {}
+_locks = {}
+_missing = object()
+
+
+class LocalLRU:
+    """Bounded in-process LRU with per key expiry, shared by all threads"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _missing
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return _missing
+            self.entries.move_to_end(key)
+        # values are pickled so callers can not mutate the cached copy
+        return pickle.loads(value)
+
+    def set(self, key, value, timeout):
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._shared_alias = options.get("SHARED", "shared")
+        self._local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        self._local_prefixes = tuple(
+            options.get("LOCAL_PREFIXES", (NAMESPACE_PREFIX,))
+        )
+        self._stats_interval = options.get("STATS_INTERVAL", 60)
+        name = location or self._shared_alias
+        self._local = _local_caches.setdefault(
+            name, LocalLRU(options.get("LOCAL_MAX_ENTRIES", 1000))
+        )
+        self._stats = _local_stats.setdefault(name, {"counts": Counter(), "at": 0})
+        self._stats_lock = _locks.setdefault(name, threading.Lock())
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _local_key(self, key, version):
+        if not isinstance(key, str) or not key.startswith(self._local_prefixes):
+            return None
+        return self.make_and_validate_key(key, version=version)
+
+    def _local_set(self, local_key, value, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.shared.default_timeout
+        if timeout is None or timeout > self._local_timeout:
+            timeout = self._local_timeout
+        if timeout > 0:
+            self._local.set(local_key, value, timeout)
+
+    def _count(self, counter, value=1):
+        with self._stats_lock:
+            self._stats["counts"][counter] += value
+            now = time.monotonic()
+            if now - self._stats["at"] < self._stats_interval:
+                return
+            counts, self._stats["counts"] = self._stats["counts"], Counter()
+            self._stats["at"] = now
+        self.flush_stats(counts)
+
+    def flush_stats(self, counts):
+        for counter, value in counts.items():
+            key = STATS_PREFIX + counter
+            self.shared.add(key, 0, timeout=None)
+            try:
+                self.shared.incr(key, value)
+            except ValueError:
+                # evicted between add and incr, the counts are dropped
+                pass
+
+    def get(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            value = self._local.get(local_key)
+            if value is not _missing:
+                self._count("local_hits")
+                return value
+        value = self.shared.get(key, _missing, version=version)
+        if value is _missing:
+            self._count("misses")
+            return default
+        self._count("shared_hits")
+        if local_key is not None:
+            self._local_set(local_key, value, self._local_timeout)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remote = []
+        for key in keys:
+            local_key = self._local_key(key, version)
+            value = self._local.get(local_key) if local_key else _missing
+            if value is _missing:
+                remote.append(key)
+            else:
+                found[key] = value
+        if found:
+            self._count("local_hits", len(found))
+        if remote:
+            values = self.shared.get_many(remote, version=version)
+            for key, value in values.items():
+                local_key = self._local_key(key, version)
+                if local_key is not None:
+                    self._local_set(local_key, value, self._local_timeout)
+            found.update(values)
+            if values:
+                self._count("shared_hits", len(values))
+            if len(values) < len(remote):
+                self._count("misses", len(remote) - len(values))
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout=timeout, version=version)
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self._local_set(local_key, value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout=timeout, version=version)
+        for key, value in data.items():
+            local_key = self._local_key(key, version)
+            if local_key is not None and key not in failed:
+                self._local_set(local_key, value, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout=timeout, version=version)
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            if added:
+                self._local_set(local_key, value, timeout)
+            else:
+                self._local.delete(local_key)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self._local_set(local_key, value, self._local_timeout)
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self._local.delete(local_key)
+        return self.shared.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self._local.delete(local_key)
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            local_key = self._local_key(key, version)
+            if local_key is not None:
+                self._local.delete(local_key)
+        self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None and self._local.get(local_key) is not _missing:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def clear(self):
+        self._local.clear()
+        self.shared.clear()
+
+
+def is_shared_cache(alias="default"):
+    """
+    Whether the cache is seen by every process, web and Celery workers alike.
+    Buffers handed from requests to tasks need one.
+    """
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def get_cache_stats():
+    """Hit and miss counters of the local and shared tiers, across processes"""
+    shared = getattr(cache, "shared", cache)
+    counts = shared.get_many([STATS_PREFIX + counter for counter in STATS_COUNTERS])
+    stats = {
+        counter: counts.get(STATS_PREFIX + counter, 0) for counter in STATS_COUNTERS
+    }
+    total = sum(stats.values())
+    hits = stats["local_hits"] + stats["shared_hits"]
+    stats["hit_rate"] = round(hits * 100.0 / total, 2) if total else 0
+    return stats
+
+
+def version_key(namespace):
+    return "%sversion:%s" % (NAMESPACE_PREFIX, namespace)
+
+
+def namespace_version(namespace):
+    version = cache.get(version_key(namespace))
+    if version is None:
+        # start from the clock, a namespace whose counter was evicted must not
+        # come back to a version its stale keys were stored with
+        version = int(time.time() * 1000)
+        if not cache.add(version_key(namespace), version, timeout=None):
+            version = cache.get(version_key(namespace)) or version
+    return version
+
+
+def namespaced_key(namespace, key):
+    version = namespace_version(namespace)
+    return "%s%s:%s:%s" % (NAMESPACE_PREFIX, namespace, version, key)
+
+
+def cached(namespace, key, default, timeout=DEFAULT_TIMEOUT):
+    """
+    Value of a key of a namespace, default (a value or a callable) is stored
+    and returned on a miss.
+    """
+    return cache.get_or_set(namespaced_key(namespace, key), default, timeout)
+
+
+def invalidate_namespace(namespace):
+    """Orphan every key of the namespace at once"""
+    try:
+        cache.incr(version_key(namespace))
+    except ValueError:
+        # no key was ever stored under this namespace
+        pass
@@ -0,0 +1,124 @@
+"""
+Conditional GET (ETag / Last-Modified) support for public job pages.
+
+Validators are computed with cheap lookups and one aggregate query so that
+unchanged pages are answered with 304 before any search, template rendering or
+serialization happens. The version stamps of listings are cached in the "jobs"
+namespace, which every change of the catalogue invalidates, so a listing runs
+its aggregate once per change. Only anonymous GET/HEAD requests are handled,
+pages rendered for logged in users are user specific.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import condition
+
+from mpcomp.cache import cached
+from peeldb.models import JobPost
+
+
+def is_conditional_request(request):
+    return request.method in ("GET", "HEAD") and not request.user.is_authenticated
+
+
+def make_etag(*parts):
+    """Build a quoted ETag from the given parts and the page version"""
+    parts = (getattr(settings, "PAGE_CACHE_VERSION", 1),) + parts
+    value = ":".join(str(part) for part in parts)
+    return '"%s"' % hashlib.md5(value.encode("utf-8")).hexdigest()
+
+
+def get_job_updated_on(request, job_id):
+    if not hasattr(request, "_job_updated_on"):
+        request._job_updated_on = (
+            JobPost.objects.filter(id=job_id, status="Live")
+            .values_list("updated_on", flat=True)
+            .first()
+        )
+    return request._job_updated_on
+
+
+def job_detail_etag(request, job_title_slug, job_id):
+    if not is_conditional_request(request) or not job_id.isdigit():
+        return None
+    updated_on = get_job_updated_on(request, job_id)
+    if not updated_on:
+        return None
+    return make_etag("job", request.path, updated_on.isoformat())
+
+
+def job_detail_last_modified(request, job_title_slug, job_id):
+    if not is_conditional_request(request) or not job_id.isdigit():
+        return None
+    updated_on = get_job_updated_on(request, job_id)
+    if not updated_on:
+        return None
+    # updated_on is naive local time, condition() would read it as UTC
+    return timezone.make_aware(updated_on)
+
+
+job_detail_condition = condition(
+    etag_func=job_detail_etag, last_modified_func=job_detail_last_modified
+)
+
+
+def live_jobs_version(jobs):
+    """
+    Version stamp of a live job set. Any job going live, being disabled or
+    updated changes the count, the id sum or the latest updated_on.
+    """
+    jobs = JobPost.objects.filter(id__in=jobs.values("id")).order_by()
+    stamp = jobs.aggregate(
+        total=Count("id"), id_sum=Sum("id"), last_updated=Max("updated_on")
+    )
+    return "%(total)s:%(id_sum)s:%(last_updated)s" % stamp
+
+
+def listing_condition(facet_func):
+    """
+    Conditional GET decorator for SEO listing views. facet_func is called
+    with the url kwargs and returns the queryset of live jobs the page lists,
+    or None when the page has no job facet. Apply it inside read_replica().
+    """
+
+    def get_version(*args, **kwargs):
+        jobs = facet_func(*args, **kwargs)
+        return "" if jobs is None else live_jobs_version(jobs)
+
+    def etag_func(request, *args, **kwargs):
+        if not is_conditional_request(request) or request.GET:
+            return None
+        version = cached(
+            "jobs",
+            "listing-version:%s" % request.path,
+            lambda: get_version(*args, **kwargs),
+            getattr(settings, "PAGE_CACHE_TIMEOUT", 60 * 15),
+        )
+        if not version:
+            return None
+        return make_etag("listing", request.path, version)
+
+    return condition(etag_func=etag_func)
+
+
+def api_job_conditional_response(request, lookup):
+    """
+    Validators for the job detail API. Returns (response, etag), the
+    response is a 304/412 when the client copy is still valid.
+    """
+    if not is_conditional_request(request):
+        return None, None
+    validator = (
+        JobPost.objects.filter(status="Live", **lookup)
+        .order_by()
+        .annotate(applicants=Count("appliedjobs"))
+        .values_list("id", "updated_on", "applicants")
+        .first()
+    )
+    if not validator:
+        return None, None
+    etag = make_etag("api-job", *validator)
+    return get_conditional_response(request, etag=etag), etag
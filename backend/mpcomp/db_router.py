@@ -0,0 +1,106 @@
+"""
+Read replica routing.
+
+Writes always go to the default database. Reads made inside read_replica(),
+used as a decorator on read-only views and tasks or as a context manager, go
+to one of REPLICA_DATABASES. The replica is picked at random when the outermost
+block is entered, so reads scale with the number of replicas while every read
+of a view, e.g. the count and the page of a listing, sees the same replica.
+Without replicas configured everything reads from default.
+
+Reads stay on default when they could miss the caller's own writes:
+
+- inside a transaction on default,
+- after a write in the same request or read_replica block,
+- for REPLICA_PIN_SECONDS after a request that wrote, the
+  jobsp.middlewares.PinPrimary middleware marks the client with a cookie.
+
+Replicas are configured with DB_REPLICA_HOSTS, see settings. To try it
+locally point DB_REPLICA_HOSTS at a second postgres holding a copy of the
+database. Tests mirror the replicas to default.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = "db_pin"
+
+_replica = ContextVar("replica", default=None)
+_pin = ContextVar("replica_pin", default=None)
+
+
+class Pin:
+    """Read-your-writes state of a request or a read_replica block"""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+    @property
+    def active(self):
+        return self.pinned or self.wrote
+
+
+def get_replicas():
+    return getattr(settings, "REPLICA_DATABASES", [])
+
+
+@contextmanager
+def pin_primary(pinned=False):
+    """Track the writes of a request, pinned reads never use a replica"""
+    pin = Pin(pinned)
+    token = _pin.set(pin)
+    try:
+        yield pin
+    finally:
+        _pin.reset(token)
+
+
+@contextmanager
+def read_replica():
+    """Route the reads of the block, or decorated function, to a replica"""
+    replicas = get_replicas()
+    # nested blocks keep the replica of the outer one
+    replica = _replica.get() or (random.choice(replicas) if replicas else None)
+    token = _replica.set(replica)
+    try:
+        if _pin.get() is None:
+            with pin_primary():
+                yield
+        else:
+            yield
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = _replica.get()
+        if replica is None:
+            return None
+        pin = _pin.get()
+        if pin is not None and pin.active:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        pin = _pin.get()
+        if pin is not None:
+            pin.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
@@ -0,0 +1,204 @@
+"""
+Resumable chunked fan-out of bulk notifications.
+
+A fan-out is a FanOut subclass registered with register_fan_out: a queryset of
+recipients and how to render the email of one of them. start_fan_out creates a
+FanOutRun, splits the primary keys of the queryset into FanOutChunk ranges of
+chunk_size rows and queues a dashboard.tasks.fan_out_chunk task per chunk.
+
+A chunk task works through its range in batches of BATCH_SIZE rows. Each batch
+records a FanOutReceipt per handled row and moves the chunk checkpoint in one
+transaction, its emails are queued once that transaction commits. A chunk
+task that dies resumes from its checkpoint when redelivered, or when
+resume_fan_outs finds it stalled, and a row with a receipt is never sent to
+again, so a restart can lose at most the emails of one batch but never send
+one twice. The counts of the chunks add up to the summary of the run.
+"""
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import F
+
+from peeldb.models import FanOutChunk, FanOutReceipt, FanOutRun
+
+BATCH_SIZE = 100
+BULK_EMAIL_SIZE = 50
+
+FAN_OUTS = {}
+
+
+def register_fan_out(cls):
+    FAN_OUTS[cls.name] = cls
+    return cls
+
+
+class FanOut:
+    name = None
+    chunk_size = 500
+    # every row gets the same email, it is sent in bulk
+    shared_body = False
+    # the emails of a batch are sent together over one connection
+    batch_send = False
+
+    def __init__(self, run):
+        self.run = run
+        self.params = run.params
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def render(self, row):
+        """send_email arguments (mto, subject, body) for a row, None to skip it"""
+        raise NotImplementedError
+
+    def render_batch(self, rows):
+        """Emails of a batch as (row id, send_email arguments or None) pairs"""
+        return [(row.pk, self.render(row)) for row in rows]
+
+    def send(self, messages):
+        from dashboard.tasks import send_bulk_email, send_email, send_emails
+
+        if self.batch_send:
+            for start in range(0, len(messages), BULK_EMAIL_SIZE):
+                send_emails.delay(messages[start : start + BULK_EMAIL_SIZE])
+            return
+        if not self.shared_body:
+            for message in messages:
+                send_email.delay(*message)
+            return
+        # one task per BULK_EMAIL_SIZE recipients of the same email
+        recipients = {}
+        for mto, subject, body in messages:
+            recipients.setdefault((subject, body), []).append(mto)
+        for (subject, body), mtos in recipients.items():
+            for start in range(0, len(mtos), BULK_EMAIL_SIZE):
+                send_bulk_email.delay(
+                    mtos[start : start + BULK_EMAIL_SIZE], subject, body
+                )
+
+
+def get_fan_out(run):
+    return FAN_OUTS[run.name](run)
+
+
+def chunk_ranges(ids, size):
+    return [
+        (ids[start], ids[min(start + size, len(ids)) - 1])
+        for start in range(0, len(ids), size)
+    ]
+
+
+def start_fan_out(name, key, **params):
+    """
+    Start the run of a fan-out, or return the existing run with the same key
+    without sending anything again.
+    """
+    from dashboard.tasks import fan_out_chunk
+
+    with transaction.atomic():
+        run, created = FanOutRun.objects.get_or_create(
+            name=name, key=key, defaults={"params": params}
+        )
+        if not created:
+            return run
+        fan_out = get_fan_out(run)
+        ids = list(
+            fan_out.get_queryset()
+            .order_by("pk")
+            .values_list("pk", flat=True)
+            .distinct()
+        )
+        chunks = FanOutChunk.objects.bulk_create(
+            FanOutChunk(run=run, start_id=start_id, end_id=end_id)
+            for start_id, end_id in chunk_ranges(ids, fan_out.chunk_size)
+        )
+        run.chunks_total = len(chunks)
+        if not chunks:
+            run.finished_on = datetime.now()
+        run.save(update_fields=["chunks_total", "finished_on"])
+        chunk_ids = [chunk.id for chunk in chunks]
+        transaction.on_commit(
+            lambda: [fan_out_chunk.delay(chunk_id) for chunk_id in chunk_ids]
+        )
+    return run
+
+
+def send_batch(chunk, fan_out, rows):
+    """Record the receipts and checkpoint of a batch, then queue its emails"""
+    rendered = fan_out.render_batch(rows)
+    with transaction.atomic():
+        # serializes the workers of a chunk, a redelivered task waits here
+        chunk = FanOutChunk.objects.select_for_update().get(id=chunk.id)
+        done = set(
+            FanOutReceipt.objects.filter(
+                run_id=chunk.run_id, recipient_id__in=[row_id for row_id, _ in rendered]
+            ).values_list("recipient_id", flat=True)
+        )
+        new = [(row_id, message) for row_id, message in rendered if row_id not in done]
+        FanOutReceipt.objects.bulk_create(
+            FanOutReceipt(run_id=chunk.run_id, recipient_id=row_id) for row_id, _ in new
+        )
+        messages = [message for _, message in new if message]
+        chunk.sent += len(messages)
+        chunk.skipped += len(new) - len(messages)
+        chunk.last_id = max(chunk.last_id or 0, rows[-1].pk)
+        chunk.save(update_fields=["sent", "skipped", "last_id", "updated_on"])
+        transaction.on_commit(lambda: fan_out.send(messages))
+    return chunk
+
+
+def run_chunk(chunk_id):
+    """Send the emails of a chunk from its checkpoint on"""
+    chunk = FanOutChunk.objects.select_related("run").get(id=chunk_id)
+    if chunk.done_on:
+        return chunk
+    fan_out = get_fan_out(chunk.run)
+    queryset = fan_out.get_queryset().filter(pk__lte=chunk.end_id).order_by("pk")
+    while True:
+        start = chunk.start_id if chunk.last_id is None else chunk.last_id + 1
+        rows = list(queryset.filter(pk__gte=start)[:BATCH_SIZE])
+        if not rows:
+            break
+        chunk = send_batch(chunk, fan_out, rows)
+    with transaction.atomic():
+        updated = FanOutChunk.objects.filter(id=chunk.id, done_on__isnull=True).update(
+            done_on=datetime.now()
+        )
+        if updated:
+            chunk.refresh_from_db()
+            FanOutRun.objects.filter(id=chunk.run_id).update(
+                chunks_done=F("chunks_done") + 1,
+                sent=F("sent") + chunk.sent,
+                skipped=F("skipped") + chunk.skipped,
+            )
+            FanOutRun.objects.filter(
+                id=chunk.run_id, chunks_done=F("chunks_total")
+            ).update(finished_on=datetime.now())
+    return chunk
+
+
+def resume_fan_outs(stalled_after=timedelta(minutes=30)):
+    """Queue again the chunks that made no progress for stalled_after"""
+    from dashboard.tasks import fan_out_chunk
+
+    chunk_ids = list(
+        FanOutChunk.objects.filter(
+            done_on__isnull=True, updated_on__lt=datetime.now() - stalled_after
+        ).values_list("id", flat=True)
+    )
+    for chunk_id in chunk_ids:
+        fan_out_chunk.delay(chunk_id)
+    return len(chunk_ids)
+
+
+def fan_out_summary(run):
+    run.refresh_from_db()
+    return {
+        "name": run.name,
+        "key": run.key,
+        "chunks": run.chunks_total,
+        "chunks_done": run.chunks_done,
+        "sent": run.sent,
+        "skipped": run.skipped,
+        "finished_on": run.finished_on,
+    }
@@ -0,0 +1,146 @@
+"""
+Candidate to job match scoring.
+
+Live jobs are scored in a single query: skill overlap, current and preferred
+city, experience band, salary band and recency each add a weighted amount,
+the database orders by the score and only the top-K rows leave it. Jobs the
+candidate already applied to are excluded. Ranked ids are cached per user for
+a short time since dashboards and notifications ask for them repeatedly.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from peeldb.models import AppliedJobs, JobPost
+
+MATCH_WEIGHTS = {
+    "skill": 10,
+    "city": 6,
+    "preferred_city": 4,
+    "experience": 4,
+    "salary": 2,
+    "recency": 3,
+}
+
+
+def get_match_weights():
+    return dict(MATCH_WEIGHTS, **getattr(settings, "JOB_MATCH_WEIGHTS", {}))
+
+
+def to_number(value):
+    value = str(value or "").replace(",", "").strip()
+    return int(value) if value.isdigit() else None
+
+
+def score_jobs(user, jobs):
+    """Annotate jobs with the weighted match score of the user"""
+    weights = get_match_weights()
+    skill_ids = list(user.skills.values_list("skill_id", flat=True))
+    preferred_city_ids = list(user.preferred_city.values_list("id", flat=True))
+    job_skills = JobPost.skills.through.objects.filter(jobpost_id=OuterRef("pk"))
+    job_locations = JobPost.location.through.objects.filter(jobpost_id=OuterRef("pk"))
+
+    score = Value(0.0)
+    if skill_ids:
+        matched_skills = Subquery(
+            job_skills.filter(skill_id__in=skill_ids)
+            .values("jobpost_id")
+            .annotate(total=Count("id"))
+            .values("total"),
+            output_field=IntegerField(),
+        )
+        score = score + Coalesce(matched_skills, 0) * weights["skill"]
+    if user.current_city_id:
+        score = score + Case(
+            When(
+                Exists(job_locations.filter(city_id=user.current_city_id)),
+                then=weights["city"],
+            ),
+            default=0,
+        )
+    if preferred_city_ids:
+        score = score + Case(
+            When(
+                Exists(job_locations.filter(city_id__in=preferred_city_ids)),
+                then=weights["preferred_city"],
+            ),
+            default=0,
+        )
+    experience = to_number(user.year)
+    if experience is not None:
+        score = score + Case(
+            When(
+                min_year__lte=experience,
+                max_year__gte=experience,
+                then=weights["experience"],
+            ),
+            default=0,
+        )
+    expected_salary = to_number(user.expected_salary)
+    if expected_salary:
+        # job salaries are monthly or yearly, see JobPost.get_job_salary
+        yearly_max_salary = Case(
+            When(salary_type="Month", then=F("max_salary") * 12),
+            default=F("max_salary"),
+        )
+        jobs = jobs.annotate(yearly_max_salary=yearly_max_salary)
+        score = score + Case(
+            When(yearly_max_salary__gte=expected_salary, then=weights["salary"]),
+            default=0,
+        )
+    now = timezone.now()
+    score = score + Case(
+        When(published_on__gte=now - timedelta(days=7), then=weights["recency"]),
+        When(
+            published_on__gte=now - timedelta(days=30),
+            then=weights["recency"] / 2.0,
+        ),
+        default=0,
+        output_field=FloatField(),
+    )
+    return jobs.annotate(match_score=score)
+
+
+def applied_job_ids(user):
+    return AppliedJobs.objects.filter(user=user).values("job_post_id")
+
+
+def get_matching_job_ids(user, job_type=None, limit=15):
+    jobs = JobPost.objects.filter(status="Live").exclude(id__in=applied_job_ids(user))
+    if job_type:
+        jobs = jobs.filter(job_type=job_type)
+    jobs = score_jobs(user, jobs).order_by("-match_score", "-published_on", "-id")
+    return list(jobs.values_list("id", flat=True)[:limit])
+
+
+def get_matching_jobs(user, job_type=None, limit=15):
+    """Top `limit` live jobs for the user, best match first"""
+    key = "matching_jobs:%s:%s:%s" % (user.id, job_type or "all", limit)
+    job_ids = cache.get(key)
+    if job_ids is None:
+        job_ids = get_matching_job_ids(user, job_type, limit)
+        cache.set(key, job_ids, getattr(settings, "JOB_MATCH_CACHE_TIMEOUT", 60 * 5))
+    # the cached ids may include jobs applied to since they were ranked
+    jobs = (
+        JobPost.objects.filter(id__in=job_ids, status="Live")
+        .exclude(id__in=applied_job_ids(user))
+        .select_related("company", "user")
+        .prefetch_related("location", "skills")
+        .in_bulk()
+    )
+    return [jobs[job_id] for job_id in job_ids if job_id in jobs]
@@ -0,0 +1,125 @@
+"""
+Scheduled go-live of published job posts.
+
+Publishing a job sets its go_live_at and queues dashboard.tasks.publish_due_jobs
+with a countdown to it, one task per GO_LIVE_BUCKET seconds however many jobs
+fall in that window, so nothing runs while no job is due. The task moves every
+due job to Live at once: one bulk_update, one insert in the change feed, one
+search index update and the recruiter emails queued in batches.
+dashboard.tasks.jobpost_published sweeps hourly for jobs whose task was lost,
+Published jobs that were never scheduled are left alone.
+
+expire_jobs moves Live jobs past JOB_APPLICATION_MAX_AGE_DAYS to Expired the
+same way, dashboard.tasks.check_expiring_jobs runs it daily. get_expiry_cutoff
+is the date the task, JobPost.can_accept_applications and the expiry flags of
+the API and templates all compare published_on with, so a job the daily run
+has not reached yet is still closed on time.
+"""
+import math
+import time
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template import loader
+from haystack import connections as haystack_connections
+
+from mpcomp.fanout import BULK_EMAIL_SIZE
+from mpcomp.views import get_absolute_url
+from peeldb.models import JobPost, JobPostChange
+
+GO_LIVE_BUCKET = 60
+
+
+def schedule_go_live(job_ids, go_live_at=None):
+    """Make the given Published jobs go live at go_live_at, now by default"""
+    from dashboard.tasks import publish_due_jobs
+
+    go_live_at = go_live_at or datetime.now()
+    JobPost.objects.filter(id__in=job_ids).update(go_live_at=go_live_at)
+    bucket = math.ceil(go_live_at.timestamp() / GO_LIVE_BUCKET) * GO_LIVE_BUCKET
+    if cache.add("jobs-go-live:%s" % bucket, 1, timeout=GO_LIVE_BUCKET * 2):
+        transaction.on_commit(
+            lambda: publish_due_jobs.apply_async(
+                countdown=max(bucket - time.time(), 0)
+            )
+        )
+
+
+def update_search_index(jobs):
+    """Index the jobs with a single request, bulk_update sends no save signals"""
+    if not jobs:
+        return
+    backend = haystack_connections["default"]
+    index = backend.get_unified_index().get_index(JobPost)
+    backend.get_backend().update(index, jobs)
+
+
+def notify_recruiters(jobs):
+    """Queue the emails telling the recruiters their jobs are live, in batches"""
+    from dashboard.tasks import send_emails
+
+    template = loader.get_template("email/jobpost.html")
+    messages = [
+        [
+            [settings.DEFAULT_FROM_EMAIL, job.user.email],
+            "InaWorks JobPost Status",
+            template.render({"job_post": job, "user": job.user}),
+        ]
+        for job in jobs
+    ]
+    for start in range(0, len(messages), BULK_EMAIL_SIZE):
+        send_emails.delay(messages[start : start + BULK_EMAIL_SIZE])
+
+
+def move_due_jobs_live(now=None):
+    """Move the Published jobs due by now to Live. Returns how many went live."""
+    now = now or datetime.now()
+    with transaction.atomic():
+        jobs = list(
+            JobPost.objects.select_for_update(skip_locked=True, of=("self",))
+            # Published jobs without a go_live_at predate scheduled publishing
+            .filter(status="Published", go_live_at__isnull=False, go_live_at__lte=now)
+            .select_related("user", "company")
+        )
+        if not jobs:
+            return 0
+        for job in jobs:
+            job.status = "Live"
+            job.published_on = now
+            job.updated_on = now
+            job.go_live_at = None
+            job.slug = get_absolute_url(job)
+        JobPost.objects.bulk_update(
+            jobs, ["status", "published_on", "updated_on", "go_live_at", "slug"]
+        )
+        JobPostChange.log_bulk([job.id for job in jobs], "Live", "Live")
+    update_search_index(jobs)
+    notify_recruiters(jobs)
+    return len(jobs)
+
+
+def get_expiry_cutoff(today=None, max_age_days=None):
+    """Jobs published on or before this date are past the maximum age"""
+    if max_age_days is None:
+        max_age_days = getattr(settings, "JOB_APPLICATION_MAX_AGE_DAYS", 30)
+    return (today or date.today()) - timedelta(days=max_age_days)
+
+
+def expire_jobs(max_age_days, today=None):
+    """Move the Live jobs published max_age_days ago or earlier to Expired"""
+    now = datetime.now()
+    published_by = get_expiry_cutoff(today or now.date(), max_age_days)
+    with transaction.atomic():
+        job_ids = list(
+            JobPost.objects.select_for_update(skip_locked=True)
+            .filter(status="Live", published_on__date__lte=published_by)
+            .values_list("id", flat=True)
+        )
+        if not job_ids:
+            return 0
+        JobPost.objects.filter(id__in=job_ids).update(status="Expired", updated_on=now)
+        JobPostChange.log_bulk(job_ids, "Expired", "Expired")
+    update_search_index(list(JobPost.objects.filter(id__in=job_ids)))
+    return len(job_ids)
@@ -0,0 +1,290 @@
+"""
+Precomputed similar and recommended jobs.
+
+For every live job the nearest live jobs are scored by weighted Jaccard
+similarity over skills, cities and industries plus the overlap of the
+experience ranges, and the top ids are stored in the JobPostNeighbours table.
+Similar jobs must share a skill, recommended jobs a skill or a city. The job
+detail page reads the ids with a primary key lookup. Neighbours are kept fresh
+from the JobPostChange feed without loading the catalogue: only the most recent
+JOB_NEIGHBOURS_MAX_CANDIDATES jobs of each skill and city of the changed jobs
+are read, the changed jobs are recomputed from them and merged into the lists
+of the JOB_NEIGHBOURS_MAX_TARGETS jobs most similar to each of them and of the
+jobs already listing them. dashboard.tasks.update_similar_jobs rebuilds every
+list once a day, which refills the lists that lost a job in between.
+"""
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from peeldb.models import JobPost, JobPostNeighbours
+
+NEIGHBOUR_WEIGHTS = {
+    "similar": {"skill": 6, "experience": 3, "industry": 2, "city": 1},
+    "recommended": {"skill": 4, "city": 3, "industry": 2, "experience": 1},
+}
+CANDIDATE_FEATURES = {
+    "similar": ("skill",),
+    "recommended": ("skill", "city"),
+}
+SET_FEATURES = ("skill", "city", "industry")
+
+
+def get_neighbours_size():
+    return getattr(settings, "JOB_NEIGHBOURS_SIZE", 20)
+
+
+def load_job_features(job_ids=None):
+    """Skills, cities, industries and experience range of the live jobs"""
+    features = {}
+    jobs = JobPost.objects.filter(status="Live")
+    if job_ids is not None:
+        jobs = jobs.filter(id__in=job_ids)
+    for job_id, min_year, max_year in jobs.order_by(
+        "-published_on", "-id"
+    ).values_list("id", "min_year", "max_year"):
+        features[job_id] = {
+            "experience": (min_year or 0, max(max_year or 0, min_year or 0)),
+            "skill": set(),
+            "city": set(),
+            "industry": set(),
+        }
+    relations = (
+        ("skill", JobPost.skills.through, "skill_id"),
+        ("city", JobPost.location.through, "city_id"),
+        ("industry", JobPost.industry.through, "industry_id"),
+    )
+    for feature, through, field in relations:
+        links = through.objects.filter(jobpost__status="Live")
+        if job_ids is not None:
+            links = links.filter(jobpost_id__in=job_ids)
+        for job_id, value in links.values_list("jobpost_id", field):
+            if job_id in features:
+                features[job_id][feature].add(value)
+    return features
+
+
+def build_postings(features):
+    """Map each skill and city to its live jobs, most recently published first"""
+    postings = {"skill": defaultdict(list), "city": defaultdict(list)}
+    for job_id, job in features.items():
+        for feature, index in postings.items():
+            for value in job[feature]:
+                index[value].append(job_id)
+    return postings
+
+
+def load_postings(features):
+    """
+    The most recent live jobs of each skill and city of the given jobs, at
+    most JOB_NEIGHBOURS_MAX_CANDIDATES per skill or city
+    """
+    limit = getattr(settings, "JOB_NEIGHBOURS_MAX_CANDIDATES", 2000)
+    postings = {"skill": defaultdict(list), "city": defaultdict(list)}
+    relations = (
+        ("skill", JobPost.skills.through, "skill_id"),
+        ("city", JobPost.location.through, "city_id"),
+    )
+    for feature, through, field in relations:
+        values = set().union(*(job[feature] for job in features.values()))
+        if not values:
+            continue
+        links = (
+            through.objects.filter(jobpost__status="Live", **{field + "__in": values})
+            .annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=F(field),
+                    order_by=[
+                        F("jobpost__published_on").desc(),
+                        F("jobpost_id").desc(),
+                    ],
+                )
+            )
+            .filter(rank__lte=limit)
+            .order_by(field, "rank")
+        )
+        for value, job_id in links.values_list(field, "jobpost_id"):
+            postings[feature][value].append(job_id)
+    return postings
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def experience_overlap(first, second):
+    overlap = min(first[1], second[1]) - max(first[0], second[0]) + 1
+    if overlap <= 0:
+        return 0.0
+    return overlap / (max(first[1], second[1]) - min(first[0], second[0]) + 1)
+
+
+def similarity(first, second, weights):
+    score = weights["experience"] * experience_overlap(
+        first["experience"], second["experience"]
+    )
+    for feature in SET_FEATURES:
+        score += weights[feature] * jaccard(first[feature], second[feature])
+    return score
+
+
+def get_candidates(job_id, features, postings, kind):
+    # very common skills and cities only contribute their most recent jobs
+    limit = getattr(settings, "JOB_NEIGHBOURS_MAX_CANDIDATES", 2000)
+    candidates = set()
+    for feature in CANDIDATE_FEATURES[kind]:
+        for value in features[job_id][feature]:
+            candidates.update(postings[feature][value][:limit])
+    candidates.discard(job_id)
+    return candidates
+
+
+def get_neighbour_ids(job_id, features, postings, kind, size):
+    weights = NEIGHBOUR_WEIGHTS[kind]
+    job = features[job_id]
+    scored = (
+        (similarity(job, features[other], weights), other)
+        for other in get_candidates(job_id, features, postings, kind)
+    )
+    return [other for score, other in heapq.nlargest(size, scored) if score > 0]
+
+
+def merge_neighbour_ids(job_id, current_ids, changed_ids, features, kind, size):
+    """Rescore the stored neighbours of a job together with the changed jobs"""
+    weights = NEIGHBOUR_WEIGHTS[kind]
+    job = features[job_id]
+    pool = {other for other in current_ids if other in features}
+    pool.update(
+        other
+        for other in changed_ids
+        if other in features
+        and any(
+            job[feature] & features[other][feature]
+            for feature in CANDIDATE_FEATURES[kind]
+        )
+    )
+    pool.discard(job_id)
+    scored = ((similarity(job, features[other], weights), other) for other in pool)
+    return [other for score, other in heapq.nlargest(size, scored) if score > 0]
+
+
+def save_neighbours(rows):
+    JobPostNeighbours.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["job_post"],
+        update_fields=["similar", "recommended", "updated_on"],
+    )
+    return len(rows)
+
+
+def rebuild_job_neighbours():
+    features = load_job_features()
+    postings = build_postings(features)
+    JobPostNeighbours.objects.exclude(job_post_id__in=set(features)).delete()
+    size = get_neighbours_size()
+    return save_neighbours(
+        [
+            JobPostNeighbours(
+                job_post_id=job_id,
+                similar=get_neighbour_ids(job_id, features, postings, "similar", size),
+                recommended=get_neighbour_ids(
+                    job_id, features, postings, "recommended", size
+                ),
+            )
+            for job_id in features
+        ]
+    )
+
+
+def update_job_neighbours(job_ids=None):
+    """
+    Recompute the neighbours of the given jobs and merge them into the lists
+    of the jobs they are most similar to or already listed by, or rebuild the
+    neighbours of all live jobs when job_ids is None.
+    Returns the number of rows written.
+    """
+    if job_ids is None:
+        return rebuild_job_neighbours()
+    job_ids = set(job_ids)
+    features = load_job_features(job_ids)
+    JobPostNeighbours.objects.filter(job_post_id__in=job_ids - set(features)).delete()
+    postings = load_postings(features)
+    posted = {
+        job_id
+        for index in postings.values()
+        for jobs in index.values()
+        for job_id in jobs
+    }
+    features.update(load_job_features(posted - set(features)))
+    size = get_neighbours_size()
+    max_targets = getattr(settings, "JOB_NEIGHBOURS_MAX_TARGETS", 200)
+    rows = {}
+    targets = set()
+    for job_id in job_ids & set(features):
+        rows[job_id] = {}
+        for kind in NEIGHBOUR_WEIGHTS:
+            ranked = get_neighbour_ids(
+                job_id, features, postings, kind, max(size, max_targets)
+            )
+            rows[job_id][kind] = ranked[:size]
+            # similarity is symmetric, the jobs closest to a changed job are
+            # the ones whose lists it can enter
+            targets.update(ranked[:max_targets])
+
+    current = {
+        job_post_id: {"similar": similar, "recommended": recommended}
+        for job_post_id, similar, recommended in JobPostNeighbours.objects.filter(
+            Q(job_post_id__in=targets - job_ids)
+            | Q(similar__overlap=list(job_ids))
+            | Q(recommended__overlap=list(job_ids))
+        )
+        .exclude(job_post_id__in=job_ids)
+        .values_list("job_post_id", "similar", "recommended")
+    }
+    targets = (targets | set(current)) - job_ids
+    listed = {
+        job_id for lists in current.values() for ids in lists.values() for job_id in ids
+    }
+    features.update(load_job_features((targets | listed) - set(features)))
+    for job_id in targets & set(features):
+        lists = current.get(job_id, {})
+        rows[job_id] = {
+            kind: merge_neighbour_ids(
+                job_id, lists.get(kind, []), job_ids, features, kind, size
+            )
+            for kind in NEIGHBOUR_WEIGHTS
+        }
+    return save_neighbours(
+        [
+            JobPostNeighbours(
+                job_post_id=job_id,
+                similar=neighbours["similar"],
+                recommended=neighbours["recommended"],
+            )
+            for job_id, neighbours in rows.items()
+        ]
+    )
+
+
+def get_neighbour_jobs(job_id, kind):
+    """Stored similar or recommended live jobs of a job, best match first"""
+    job_ids = (
+        JobPostNeighbours.objects.filter(job_post_id=job_id)
+        .values_list(kind, flat=True)
+        .first()
+    ) or []
+    jobs = (
+        JobPost.objects.filter(id__in=job_ids, status="Live")
+        .select_related("company")
+        .prefetch_related("location")
+        .in_bulk()
+    )
+    return [jobs[job_id] for job_id in job_ids if job_id in jobs]
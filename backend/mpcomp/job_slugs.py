@@ -0,0 +1,82 @@
+"""
+Bulk regeneration of job post slugs.
+
+Slugs are computed by mpcomp.views.get_absolute_url. When its rules change
+every live job gets its new slug from update_job_slugs: live jobs are walked in
+id ordered chunks of CHUNK_SIZE, loading only the fields a slug is made of, the
+jobs whose slug changed are written with bulk_update, and chunks can run on
+several threads. The changed jobs are then reindexed with one bulk update of
+the search index and recorded in the JobPostChange feed, which purges their
+cached pages and refreshes the sitemaps.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+
+from mpcomp.job_publishing import update_search_index
+from mpcomp.views import get_absolute_url
+from peeldb.models import JobPost, JobPostChange
+
+CHUNK_SIZE = 2000
+SLUG_FIELDS = (
+    "id",
+    "slug",
+    "title",
+    "job_type",
+    "min_year",
+    "max_year",
+    "company_name",
+    "company__slug",
+)
+
+
+def id_ranges(queryset, size):
+    """(first id, last id) of every size rows of the queryset, in id order"""
+    ids = queryset.order_by("id").values_list("id", flat=True)
+    last_id = 0
+    while True:
+        chunk = list(ids.filter(id__gt=last_id)[:size])
+        if not chunk:
+            return
+        yield chunk[0], chunk[-1]
+        last_id = chunk[-1]
+
+
+def update_chunk_slugs(start_id, end_id):
+    """Write the new slugs of the live jobs in the id range, returns their ids"""
+    jobs = (
+        JobPost.objects.filter(status="Live", id__gte=start_id, id__lte=end_id)
+        .select_related("company")
+        .only(*SLUG_FIELDS)
+    )
+    changed = []
+    for job in jobs:
+        slug = get_absolute_url(job)
+        if slug != job.slug:
+            job.slug = slug
+            changed.append(job)
+    JobPost.objects.bulk_update(changed, ["slug"], batch_size=500)
+    return [job.id for job in changed]
+
+
+def update_chunk_slugs_in_thread(id_range):
+    try:
+        return update_chunk_slugs(*id_range)
+    finally:
+        # every worker thread opened a connection of its own
+        connection.close()
+
+
+def update_job_slugs(workers=1, chunk_size=CHUNK_SIZE):
+    """Regenerate the slugs of the live jobs, returns how many changed"""
+    ranges = list(id_ranges(JobPost.objects.filter(status="Live"), chunk_size))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(update_chunk_slugs_in_thread, ranges))
+    else:
+        results = [update_chunk_slugs(*id_range) for id_range in ranges]
+    job_ids = [job_id for chunk_ids in results for job_id in chunk_ids]
+    if job_ids:
+        JobPostChange.log_bulk(job_ids, "Updated", "Live")
+        update_search_index(list(JobPost.objects.filter(id__in=job_ids)))
+    return len(job_ids)
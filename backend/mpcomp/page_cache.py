@@ -0,0 +1,216 @@
+"""
+Full-page cache for anonymous SEO landing pages.
+
+Rendered pages are stored zlib compressed together with the surrogate keys
+(tags) of what they show: the jobs on the page and the skills, cities,
+industries, companies or job types of the listing. Every tag has a version
+counter, purging a tag bumps its version and every page stored with an older
+version is treated as a miss. Concurrent misses on the same page are coalesced
+with a short lock, requests that lose the race wait for the page instead of
+rendering it again.
+
+A page is stored with the tag versions read when the view tagged it, and is
+not stored at all when any purge ran while it was rendered, so a purge racing
+a render never leaves the stale page cached. Purges are applied when the
+transaction of the change commits.
+"""
+import hashlib
+import re
+import time
+import zlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from peeldb.models import JobPost
+
+CACHE_PREFIX = "page-cache"
+CSRF_TOKEN_RE = re.compile(rb'name="csrfmiddlewaretoken" value="[^"]*"')
+CSRF_PLACEHOLDER = b'name="csrfmiddlewaretoken" value="__csrf_token__"'
+
+
+def page_key(request):
+    path = "%s:%s" % (getattr(settings, "PAGE_CACHE_VERSION", 1), request.path)
+    path_hash = hashlib.md5(path.encode("utf-8")).hexdigest()
+    return "%s:page:%s" % (CACHE_PREFIX, path_hash)
+
+
+def tag_key(tag):
+    return "%s:tag:%s" % (CACHE_PREFIX, tag)
+
+
+# bumped by every purge
+EPOCH_KEY = "%s:epoch" % CACHE_PREFIX
+
+
+def is_cacheable_request(request):
+    return (
+        request.method in ("GET", "HEAD")
+        and not request.GET
+        and not request.user.is_authenticated
+    )
+
+
+def tag_page(request, jobs=(), **facets):
+    """
+    Attach surrogate keys to the page being rendered. facets maps a tag
+    prefix to a value, an id or model instance, or an iterable of them.
+    Does nothing when the view is not page cached.
+    """
+    tag_versions = getattr(request, "page_cache_tags", None)
+    if tag_versions is None:
+        return
+    tags = {"job:%s" % job.id for job in jobs}
+    for prefix, values in facets.items():
+        if not values:
+            continue
+        if isinstance(values, (str, int)) or hasattr(values, "pk"):
+            values = [values]
+        for value in values:
+            tags.add("%s:%s" % (prefix, getattr(value, "pk", value)))
+    # the versions the page is rendered against, a later purge makes it stale
+    tag_versions.update(get_tag_versions(tags - set(tag_versions), create=True))
+
+
+def get_tag_versions(tags, create=False):
+    keys = {tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(list(keys))
+    if create:
+        missing = [key for key in keys if key not in versions]
+        for key in missing:
+            # add() never overwrites a version bumped by a concurrent purge
+            cache.add(key, 1, timeout=None)
+        if missing:
+            versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def get_cached_page(key):
+    entry = cache.get(key)
+    if not entry:
+        return None
+    if get_tag_versions(entry["tags"]) != entry["tags"]:
+        return None
+    return entry
+
+
+def store_page(key, tag_versions, response):
+    content = CSRF_TOKEN_RE.sub(CSRF_PLACEHOLDER, response.content)
+    entry = {
+        "tags": tag_versions,
+        "status": response.status_code,
+        "content_type": response["Content-Type"],
+        "content": zlib.compress(content),
+    }
+    cache.set(key, entry, getattr(settings, "PAGE_CACHE_TIMEOUT", 60 * 15))
+
+
+def cached_response(request, entry):
+    content = zlib.decompress(entry["content"])
+    if CSRF_PLACEHOLDER in content:
+        content = content.replace(
+            CSRF_PLACEHOLDER,
+            b'name="csrfmiddlewaretoken" value="%s"' % get_token(request).encode(),
+        )
+    response = HttpResponse(
+        content, content_type=entry["content_type"], status=entry["status"]
+    )
+    response["X-Page-Cache"] = "HIT"
+    return response
+
+
+def page_cache(view_func):
+    """
+    Cache the rendered page of an SEO listing view for anonymous users.
+    Only 200 responses of views that tagged the page with tag_page are stored.
+    """
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+        key = page_key(request)
+        entry = get_cached_page(key)
+        if entry:
+            return cached_response(request, entry)
+
+        lock_key = key + ":lock"
+        lock_timeout = getattr(settings, "PAGE_CACHE_LOCK_TIMEOUT", 10)
+        if not cache.add(lock_key, 1, timeout=lock_timeout):
+            lock_wait = getattr(settings, "PAGE_CACHE_LOCK_WAIT", 3)
+            deadline = time.monotonic() + lock_wait
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                entry = get_cached_page(key)
+                if entry:
+                    return cached_response(request, entry)
+                if cache.get(lock_key) is None:
+                    break
+            return view_func(request, *args, **kwargs)
+
+        try:
+            epoch = cache.get(EPOCH_KEY)
+            request.page_cache_tags = {}
+            response = view_func(request, *args, **kwargs)
+            if (
+                response.status_code == 200
+                and request.page_cache_tags
+                and not response.streaming
+                # a purge during rendering may not be reflected in the page
+                and cache.get(EPOCH_KEY) == epoch
+            ):
+                store_page(key, request.page_cache_tags, response)
+                response["X-Page-Cache"] = "MISS"
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    return wrapper
+
+
+def get_job_tags(jobs):
+    tags = set()
+    for job in jobs:
+        tags.add("job:%s" % job.id)
+        tags.add("job_type:%s" % job.job_type)
+        if job.company_id:
+            tags.add("company:%s" % job.company_id)
+        if job.min_year is not None and job.min_year <= 0:
+            tags.add("job_type:Fresher")
+        tags.update("skill:%s" % skill.id for skill in job.skills.all())
+        tags.update("industry:%s" % industry.id for industry in job.industry.all())
+        tags.update("education:%s" % edu.id for edu in job.edu_qualification.all())
+        for city in job.location.all():
+            tags.add("city:%s" % city.id)
+            tags.add("state:%s" % city.state_id)
+    return tags
+
+
+def purge_tags(tags):
+    if not cache.add(EPOCH_KEY, 1, timeout=None):
+        cache.incr(EPOCH_KEY)
+    for tag in tags:
+        try:
+            cache.incr(tag_key(tag))
+        except ValueError:
+            # no page was ever stored with this tag
+            pass
+
+
+def purge_job_pages(job_ids):
+    """
+    Invalidate every cached page that shows or lists one of the given jobs,
+    once the current transaction commits.
+    """
+    jobs = (
+        JobPost.objects.filter(id__in=job_ids)
+        .only("id", "job_type", "company_id", "min_year")
+        .prefetch_related("skills", "industry", "location", "edu_qualification")
+    )
+    tags = get_job_tags(jobs)
+    # purged before the commit, a concurrent request would cache the old page
+    transaction.on_commit(lambda: purge_tags(tags))
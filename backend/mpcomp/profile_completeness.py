@@ -0,0 +1,98 @@
+"""
+Stored profile completeness.
+
+The completeness score of a profile is computed by the database from the
+profile columns and the existence of education, projects, skills, languages,
+industries or technical skills, and stored in User.profile_completeness.
+peeldb.signals refreshes it when a profile is saved or one of those relations
+changes, the update_profile_completeness command backfills it in bulk.
+"""
+from django.db.models import Case, Exists, IntegerField, OuterRef, Q, Value, When
+
+from peeldb.models import User
+
+# profile columns the score depends on, saves touching none of them are skipped
+PROFILE_FIELDS = {
+    "year",
+    "mobile",
+    "is_active",
+    "user_type",
+    "resume",
+    "profile_description",
+    "job_role",
+}
+PROFILE_RELATIONS = (
+    "education",
+    "project",
+    "skills",
+    "language",
+    "industry",
+    "technical_skills",
+)
+
+
+def filled(field):
+    return ~Q(**{field + "__isnull": True}) & ~Q(**{field: ""})
+
+
+def has_related(relation):
+    through = getattr(User, relation).through
+    return Exists(through.objects.filter(user_id=OuterRef("pk")))
+
+
+def points(condition, value):
+    return Case(
+        When(condition, then=Value(value)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def profile_completeness_expression():
+    """SQL expression of the profile completeness percentage of a user"""
+    common = (
+        points(filled("year"), 10)
+        + points(filled("mobile"), 20)
+        + points(Q(is_active=True), 10)
+    )
+    job_seeker = (
+        points(filled("resume"), 15)
+        + points(filled("profile_description"), 5)
+        + points(has_related("education"), 10)
+        + points(has_related("project"), 10)
+        + points(has_related("skills"), 15)
+        + points(has_related("language"), 5)
+    )
+    recruiter = (
+        points(filled("job_role"), 10)
+        + points(has_related("industry"), 10)
+        + points(filled("profile_description"), 15)
+        + points(has_related("technical_skills"), 15)
+    )
+    return common + Case(
+        When(user_type="JS", then=job_seeker),
+        default=recruiter,
+        output_field=IntegerField(),
+    )
+
+
+def update_profile_completeness(user_ids):
+    """Recompute the stored completeness of the given users in one UPDATE"""
+    return User.objects.filter(id__in=user_ids).update(
+        profile_completeness=profile_completeness_expression()
+    )
+
+
+def refresh_profile_completeness(user):
+    """Recompute the completeness of a saved user and keep the instance in sync"""
+    completeness = (
+        User.objects.filter(pk=user.pk)
+        .annotate(completeness=profile_completeness_expression())
+        .values_list("completeness", flat=True)
+        .first()
+    )
+    if completeness is None:
+        return
+    if completeness != user.profile_completeness:
+        User.objects.filter(pk=user.pk).update(profile_completeness=completeness)
+    user.profile_completeness = completeness
@@ -0,0 +1,157 @@
+"""
+Full text search over job seeker profiles and agency resumes.
+
+Each profile keeps a weighted tsvector (skills and role first, then city,
+then the resume text) in a GIN indexed search_vector column. Searches are
+ranked with ts_rank, paginated with a (rank, id) keyset cursor so deep pages
+cost the same as the first one, and come with facet counts for the filters.
+
+peeldb.signals queues a refresh of the vectors of the rows whose searchable
+fields or skills change, dashboard.tasks.update_resume_search_index fills the
+vectors of rows created without signals.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Value
+from django.db.models.functions import Cast
+
+from peeldb.models import AgencyResume, User
+
+SEARCH_CONFIG = "english"
+# the user columns and relations the search vector is built from
+SEARCH_FIELDS = {
+    "job_title",
+    "job_role",
+    "resume_title",
+    "current_city",
+    "profile_description",
+    "resume_text",
+}
+SEARCH_RELATIONS = ("skills", "technical_skills")
+
+
+def weighted_vector(text, weight):
+    return SearchVector(Value(text or ""), weight=weight, config=SEARCH_CONFIG)
+
+
+def update_user_search_vectors(user_ids):
+    users = (
+        User.objects.filter(id__in=user_ids, user_type="JS")
+        .select_related("current_city")
+        .prefetch_related("skills__skill", "technical_skills")
+    )
+    for user in users:
+        skills = {each.skill.name for each in user.skills.all()}
+        skills.update(skill.name for skill in user.technical_skills.all())
+        role = " ".join(
+            filter(None, [user.job_title, user.job_role, user.resume_title])
+        )
+        city = user.current_city.name if user.current_city else ""
+        User.objects.filter(id=user.id).update(
+            search_vector=weighted_vector(" ".join(skills), "A")
+            + weighted_vector(role, "A")
+            + weighted_vector(city, "B")
+            + weighted_vector(user.profile_description, "C")
+            + weighted_vector(user.resume_text, "D")
+        )
+
+
+def update_agency_resume_search_vectors(resume_ids):
+    resumes = AgencyResume.objects.filter(id__in=resume_ids).prefetch_related("skill")
+    for resume in resumes:
+        skills = " ".join(skill.name for skill in resume.skill.all())
+        AgencyResume.objects.filter(id=resume.id).update(
+            search_vector=weighted_vector(skills, "A")
+            + weighted_vector(resume.candidate_name, "B")
+        )
+
+
+SEARCH_VECTOR_UPDATERS = {
+    "user": update_user_search_vectors,
+    "agency_resume": update_agency_resume_search_vectors,
+}
+
+
+def queue_search_vectors(kind, ids):
+    """
+    Refresh the search vectors of users or agency resumes after the commit,
+    rows already waiting for a refresh are not queued again.
+    """
+    from dashboard.tasks import refresh_search_vectors
+
+    delay = getattr(settings, "SEARCH_VECTOR_DELAY", 30)
+    ids = [
+        pk
+        for pk in ids
+        if cache.add("search-vector-queued:%s:%s" % (kind, pk), 1, timeout=delay)
+    ]
+    if ids:
+        # runs once the window is closed, so it reads every change made in it
+        transaction.on_commit(
+            lambda: refresh_search_vectors.apply_async(
+                (kind, ids), countdown=delay + 5
+            )
+        )
+
+
+def search_query(text):
+    return SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+
+
+def rank_resumes(queryset, text, vector="search_vector"):
+    """Filter by the search text and order by relevance, newest first on ties"""
+    if text:
+        query = search_query(text)
+        queryset = queryset.filter(**{vector: query}).annotate(
+            # ts_rank is a real, casting keeps the cursor value exact
+            rank=Cast(SearchRank(F(vector), query), FloatField())
+        )
+    else:
+        queryset = queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+    return queryset.order_by("-rank", "-id")
+
+
+def get_keyset_page(queryset, cursor=None, limit=20):
+    """
+    One page of a rank_resumes queryset after the given cursor. Returns the
+    rows and the cursor of the next page, None on the last page.
+    Raises ValueError for a malformed cursor.
+    """
+    if cursor:
+        rank, last_id = cursor.split(":")
+        rank, last_id = float(rank), int(last_id)
+        queryset = queryset.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=last_id))
+    rows = list(queryset[: limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = "%r:%s" % (rows[-1].rank, rows[-1].id)
+    return rows, next_cursor
+
+
+def get_facet_counts(queryset, field, size=10):
+    return list(
+        queryset.order_by()
+        .exclude(**{field + "__isnull": True})
+        .values(value=F(field))
+        .annotate(count=Count("id", distinct=True))
+        .order_by("-count")[:size]
+    )
+
+
+def get_user_facets(queryset):
+    return {
+        "cities": get_facet_counts(queryset, "current_city__name"),
+        "experience": get_facet_counts(queryset, "year"),
+        "skills": get_facet_counts(queryset, "skills__skill__name"),
+    }
+
+
+def get_agency_resume_facets(queryset, prefix=""):
+    """Facets of agency resumes, prefix is the lookup path to AgencyResume"""
+    return {
+        "experience": get_facet_counts(queryset, prefix + "experience"),
+        "skills": get_facet_counts(queryset, prefix + "skill__name"),
+    }
@@ -0,0 +1,179 @@
+"""
+Buffered search logging.
+
+log_search only appends a search to the buffer of the current time window
+(SEARCH_LOG_WINDOW seconds) in the cache, the request never touches the
+database for it. dashboard.tasks.save_search_log, run every minute, takes the
+events of the finished windows and writes them in bulk: skills and locations
+are resolved by name or slug from id maps cached in the "lookups" namespace,
+SearchResult rows are created in batches of SEARCH_LOG_BATCH_SIZE and their
+skills and locations with one bulk insert per batch. The events of a window
+are removed from the buffer once they are committed, events of a window that
+is not saved within SEARCH_LOG_TIMEOUT seconds expire with it.
+
+The buffer needs a cache shared by the web and Celery workers, without one
+every search is saved by its own dashboard.tasks.save_search_results task.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from mpcomp.cache import cached, is_shared_cache
+from peeldb.models import City, SearchResult, Skill, User
+
+SEARCH_LOG_BATCH_SIZE = 2000
+# a window is saved once it ended this many seconds ago, so late appends land
+SETTLE_SECONDS = 5
+
+
+def get_window_size():
+    return getattr(settings, "SEARCH_LOG_WINDOW", 60)
+
+
+def get_timeout():
+    return getattr(settings, "SEARCH_LOG_TIMEOUT", 60 * 60)
+
+
+def search_log_key(window, name):
+    return "search-log:%s:%s" % (window, name)
+
+
+def get_search_event(ip_address, data, results, user_id):
+    return {
+        "ip_address": ip_address,
+        "skills": data.get("q", "").strip(", "),
+        "locations": data.get("location", "").strip(", "),
+        "results": results,
+        "user_id": user_id,
+    }
+
+
+def log_search(ip_address, data, results, user_id):
+    """Append a search to the buffer of the current time window"""
+    if not is_shared_cache():
+        from dashboard.tasks import save_search_results
+
+        # the worker could not see the buffer of this process
+        save_search_results.delay(
+            ip_address,
+            {"q": data.get("q", ""), "location": data.get("location", "")},
+            results,
+            user_id,
+        )
+        return
+    window = int(time.time() // get_window_size())
+    timeout = get_timeout()
+    counter = search_log_key(window, "count")
+    cache.add(counter, 0, timeout=timeout)
+    event = get_search_event(ip_address, data, results, user_id)
+    cache.set(search_log_key(window, cache.incr(counter)), event, timeout)
+
+
+def get_search_events(window):
+    """Buffered events of a window and the keys to delete once they are saved"""
+    count = cache.get(search_log_key(window, "count")) or 0
+    keys = [search_log_key(window, index) for index in range(1, count + 1)]
+    events = cache.get_many(keys)
+    return (
+        [events[key] for key in keys if key in events],
+        keys + [search_log_key(window, "count")],
+    )
+
+
+def get_id_map(model):
+    """Lower cased names and slugs of the rows of a model to their ids"""
+    ids = {}
+    for row_id, slug, name in model.objects.order_by("id").values_list(
+        "id", "slug", "name"
+    ):
+        ids.setdefault((slug or "").lower(), row_id)
+        ids.setdefault((name or "").lower(), row_id)
+    return ids
+
+
+def resolve(names, ids):
+    """(matched ids, unmatched names) of the comma separated names"""
+    matched, other = [], []
+    for name in names.split(", ") if names else []:
+        row_id = ids.get(name.lower())
+        if row_id is None:
+            other.append(name)
+        elif row_id not in matched:
+            matched.append(row_id)
+    return matched, ",".join(other)
+
+
+def save_search_events(events):
+    """Write searches with bulk inserts, returns how many were saved"""
+    skill_ids = cached(
+        "lookups", "search_log_skills", lambda: get_id_map(Skill), 60 * 60
+    )
+    city_ids = cached("lookups", "search_log_cities", lambda: get_id_map(City), 60 * 60)
+    user_ids = set(
+        User.objects.filter(
+            id__in={event["user_id"] for event in events if event["user_id"]}
+        ).values_list("id", flat=True)
+    )
+    SkillLink = SearchResult.skills.through
+    CityLink = SearchResult.locations.through
+    for start in range(0, len(events), SEARCH_LOG_BATCH_SIZE):
+        batch = events[start : start + SEARCH_LOG_BATCH_SIZE]
+        search_results, links = [], []
+        for event in batch:
+            skills, other_skill = resolve(event["skills"], skill_ids)
+            locations, other_location = resolve(event["locations"], city_ids)
+            search_results.append(
+                SearchResult(
+                    ip_address=event["ip_address"],
+                    search_text={
+                        "skills": event["skills"],
+                        "locations": event["locations"],
+                    },
+                    other_skill=other_skill,
+                    other_location=other_location,
+                    user_id=event["user_id"] if event["user_id"] in user_ids else None,
+                    job_post=event["results"],
+                )
+            )
+            links.append((skills, locations))
+        SearchResult.objects.bulk_create(search_results)
+        SkillLink.objects.bulk_create(
+            SkillLink(searchresult_id=search_result.id, skill_id=skill_id)
+            for search_result, (skills, _) in zip(search_results, links)
+            for skill_id in skills
+        )
+        CityLink.objects.bulk_create(
+            CityLink(searchresult_id=search_result.id, city_id=city_id)
+            for search_result, (_, locations) in zip(search_results, links)
+            for city_id in locations
+        )
+    return len(events)
+
+
+def flush_search_log(now=None):
+    """Save the searches of every finished window, returns how many were saved"""
+    window_size = get_window_size()
+    now = time.time() if now is None else now
+    # windows ending after now - SETTLE_SECONDS may still get appends
+    last = int((now - SETTLE_SECONDS) // window_size)
+    first = int((now - get_timeout()) // window_size)
+    saved = 0
+    for window in range(first, last):
+        if not cache.get(search_log_key(window, "count")):
+            continue
+        # a window is claimed by one consumer, its events are saved once
+        claim = search_log_key(window, "saving")
+        if not cache.add(claim, 1, get_timeout()):
+            continue
+        events, keys = get_search_events(window)
+        try:
+            with transaction.atomic():
+                saved += save_search_events(events)
+        except Exception:
+            # the events stay buffered for the next run
+            cache.delete(claim)
+            raise
+        cache.delete_many(keys)
+    return saved
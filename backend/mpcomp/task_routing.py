@@ -0,0 +1,86 @@
+"""
+Celery queues.
+
+Tasks are routed by name to a queue per workload so that each gets its own
+worker pool and a burst of one kind never delays the others:
+
+- celery (the default queue): short tasks behind user visible updates,
+  applications, go-live of jobs, resumes and thumbnails,
+- email: send_email and recruiter mailings, rate limited,
+- alerts: the long running matching of job alerts, digests and notifications,
+  which fan out into the email queue,
+- index: search index and similar jobs updates,
+- analytics: search logging and reports,
+- housekeeping: expiry checks, sitemaps, CloudFront invalidations and the
+  go-live sweep.
+
+Emails queued from inside another task, alerts and digests, are sent with
+BULK_EMAIL_PRIORITY so that the emails of a request, e.g. a password reset,
+overtake a nightly fan-out waiting in the email queue. Worker pools are
+described in SETUP.md, `python manage.py queue_depths` shows the backlog of
+every queue.
+"""
+from celery import current_task
+
+DEFAULT_QUEUE = "celery"
+
+# redis serves priority 0 first
+INTERACTIVE_EMAIL_PRIORITY = 0
+BULK_EMAIL_PRIORITY = 9
+
+TASK_QUEUES = {
+    "email": (
+        "dashboard.tasks.send_email",
+        "dashboard.tasks.send_bulk_email",
+        "dashboard.tasks.send_emails",
+        "dashboard.tasks.sending_mail",
+    ),
+    "alerts": (
+        "dashboard.tasks.job_alerts_to_users",
+        "dashboard.tasks.job_alerts_to_subscribers",
+        "dashboard.tasks.job_alerts_to_alerts",
+        "dashboard.tasks.recruiter_jobpost_applicants",
+        "dashboard.tasks.applicants_profile_update_notifications",
+        "dashboard.tasks.recruiter_profile_update_notifications",
+        "dashboard.tasks.applicants_all_job_notifications",
+        "dashboard.tasks.applicants_job_notifications",
+        "dashboard.tasks.fan_out_chunk",
+    ),
+    "index": (
+        "dashboard.tasks.rebuilding_index",
+        "dashboard.tasks.updating_jobposts",
+        "dashboard.tasks.update_resume_search_index",
+        "dashboard.tasks.refresh_search_vectors",
+        "dashboard.tasks.update_similar_jobs",
+    ),
+    "analytics": (
+        "dashboard.tasks.save_search_results",
+        "dashboard.tasks.save_search_log",
+        "dashboard.tasks.daily_report",
+    ),
+    "housekeeping": (
+        "dashboard.tasks.jobpost_published",
+        "dashboard.tasks.check_expiring_jobs",
+        "dashboard.tasks.sitemap_generation",
+        "dashboard.tasks.update_sitemap_snapshot",
+        "dashboard.tasks.flush_cloudfront_invalidations",
+        "dashboard.tasks.resume_stalled_fan_outs",
+    ),
+}
+QUEUE_BY_TASK = {
+    task_name: queue
+    for queue, task_names in TASK_QUEUES.items()
+    for task_name in task_names
+}
+QUEUES = (DEFAULT_QUEUE,) + tuple(TASK_QUEUES)
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """Celery router, see CELERY_TASK_ROUTES. Explicit options still win."""
+    route = {"queue": QUEUE_BY_TASK.get(name, DEFAULT_QUEUE)}
+    if route["queue"] == "email":
+        if current_task and not current_task.request.called_directly:
+            route["priority"] = BULK_EMAIL_PRIORITY
+        else:
+            route["priority"] = INTERACTIVE_EMAIL_PRIORITY
+    return route
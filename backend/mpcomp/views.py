@@ -7,16 +7,20 @@ import operator
 from dateutil.relativedelta import relativedelta
 from pytz import timezone
 import re
+from functools import lru_cache
 from PIL import Image
 import os
 from .aws import AWS
+from .cache import invalidate_namespace, namespace_version
 import zipfile
 from lxml import etree
-from subprocess import Popen, PIPE
+import io
+import tempfile
+from subprocess import run, DEVNULL, PIPE
 
 from django.contrib.auth.decorators import user_passes_test, login_required
 from django.template import Template, Context
-from peeldb.models import MetaData, Skill, City, Qualification
+from peeldb.models import MetaData, Skill, City, Qualification, User
 from django.core.mail import EmailMessage
 from django.conf import settings
 
@@ -171,95 +175,84 @@ def getdocumenttext(document):
     return paratextlist
 
 
-def document_to_text(filename, file_path):
-    if filename[-4:] == ".doc":
-        cmd = ["antiword", file_path]
-        p = Popen(cmd, stdout=PIPE)
-        stdout, stderr = p.communicate()
-        return stdout.decode("ascii", "ignore")
-    elif filename[-4:] == ".odt":
-        cmd = ["odt2txt", file_path]
-        p = Popen(cmd, stdout=PIPE)
-        stdout, stderr = p.communicate()
-        return stdout.decode("ascii", "ignore")
+RESUME_CONTACT_RE = re.compile(r"(?P<email>[\w\.-]+@[\w\.-]+)|(?P<mobile>[0-9]{10})")
 
 
-def remove_file(path):
-    if os.path.exists(path):
-        os.remove(path)
-
+def run_text_command(cmd):
+    result = run(
+        cmd,
+        stdout=PIPE,
+        stderr=DEVNULL,
+        timeout=getattr(settings, "RESUME_EXTRACTION_TIMEOUT", 30),
+    )
+    return result.stdout.decode("utf-8", "ignore")
 
-def handle_uploaded_file(file, filename):
-    if not os.path.exists("resume/"):
-        os.mkdir("resume/")
 
-    with open("resume/" + filename, "wb+") as destination:
-        for chunk in file.chunks():
-            destination.write(chunk)
+def document_to_text(filename, file_path):
+    if filename[-4:] == ".doc":
+        return run_text_command(["antiword", file_path])
+    elif filename[-4:] == ".odt":
+        return run_text_command(["odt2txt", file_path])
+    elif filename[-4:] == ".pdf":
+        return run_text_command(["pdftotext", file_path, "-"])
+    return ""
+
+
+def extract_resume_text(file_name, content):
+    """
+    Text of a resume from its raw bytes. docx is read in memory, the other
+    formats go through their command line converters in a private temporary
+    directory so concurrent uploads never share files.
+    """
+    file_format = file_name.split(".")[-1].lower()
+    if file_format == "docx":
+        return "\n\n".join(getdocumenttext(opendocx(io.BytesIO(content))))
+    if file_format not in ("pdf", "doc", "odt"):
+        return ""
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "resume." + file_format)
+        with open(file_path, "wb") as resume:
+            resume.write(content)
+        return document_to_text(file_path, file_path)
 
 
 def get_email_resume(text):
+    """First email and 10 digit mobile number of the text, in a single pass"""
     email = mobile = ""
-    if re.search(r"[0-9]{10}", text):
-        mobile = re.search(r"[0-9]{10}", text).group(0)
-    m = re.search(r"[\w\.-]+@[\w\.-]+", text)
-    if m:
-        email = m.group(0)
+    for match in RESUME_CONTACT_RE.finditer(text):
+        if match.lastgroup == "email":
+            email = email or match.group("email")
+        else:
+            mobile = mobile or match.group("mobile")
+        if email and mobile:
+            break
     return email, mobile
 
 
 def get_resume_data(file):
-    file_name = file.name
-    file_format = file.name.split(".")[-1]
-    f_name = file.name.split(".")[0]
-    email = mobile = text = ""
-    if file_format == "pdf":
-        try:
-            os.system(
-                "pdftotext '%s' '%s'"
-                % (
-                    settings.BASE_DIR + "/resume/" + file_name,
-                    settings.BASE_DIR + "/resume/" + f_name + ".txt",
-                )
-            )
-            each = open(
-                settings.BASE_DIR + "/resume/" + f_name + ".txt", "r"
-            ).readlines()
-            text = []
-            for pdf_content in each:
-                text.append(pdf_content)
-                if re.search(r"[0-9]{10}", pdf_content):
-                    mobile = re.search(r"[0-9]{10}", pdf_content).group(0)
-                m = re.search(r"[\w\.-]+@[\w\.-]+", pdf_content)
-                if m:
-                    email = m.group(0)
-            text = "\n\n".join(text)
-        except Exception:
-            text = ""
-    elif file_format == "doc":
-        text = document_to_text(file_name, settings.BASE_DIR + "/resume/" + file_name)
-        email, mobile = get_email_resume(text)
-    elif file_format == "odt":
-        text = document_to_text(file_name, settings.BASE_DIR + "/resume/" + file_name)
-        email, mobile = get_email_resume(text)
-    elif file_format == "docx":
-        document = opendocx(settings.BASE_DIR + "/resume/" + file_name)
-        paratextlist = getdocumenttext(document)
-        text = []
-        for paratext in paratextlist:
-            text.append(paratext)
-        for paratext in paratextlist:
-            if re.search(r"[0-9]{10}", (paratext)):
-                mobile = re.search(r"[0-9]{10}", (paratext)).group(0)
-            m = re.search(r"[\w\.-]+@[\w\.-]+", str(paratext.encode("utf-8")))
-            if m:
-                email = m.group(0)
-        text = "\n\n".join(text)
-    remove_file(settings.BASE_DIR + "/resume/" + f_name + ".txt")
-    remove_file(settings.BASE_DIR + "/resume/" + file_name)
+    text = extract_resume_text(file.name, file.read())
+    email, mobile = get_email_resume(text)
     return email, mobile, text
 
 
+def get_resume_status(user):
+    """Status of the text extraction of the last resume uploaded by a user"""
+    if not user.resume:
+        return "not_uploaded"
+    if user.resume_status:
+        return user.resume_status
+    # resumes uploaded before the status was stored
+    return "completed" if user.resume_text else "pending"
+
+
+def set_resume_status(user_id, status, resume_name=None):
+    """Store the status, only while resume_name is the current resume if given"""
+    users = User.objects.filter(id=user_id)
+    if resume_name:
+        users = users.filter(resume=resume_name)
+    users.update(resume_status=status)
+
+
 def float_round(num, places=0, direction=floor):
     num = float("%.10f" % num)
     no_of_digits = str(num)[::-1].find(".")
@@ -477,12 +470,13 @@ def get_aws_file_path(input_file, folder_path, company_name):
 
     # thumb_file = File(thumb_data)
     # ext = input_file.name.split(".")[-1]
-    s3_url = AWS().push_to_s3(
-        file_obj=open(os.path.join(path, file_name), "rb"),
-        bucket_name=settings.AWS_STORAGE_BUCKET_NAME,
-        folder=folder_path,
-        new_name=company_name + "." + img_format,
-    )
+    with open(os.path.join(path, file_name), "rb") as file_obj:
+        s3_url = AWS().push_to_s3(
+            file_obj=file_obj,
+            bucket_name=settings.AWS_STORAGE_BUCKET_NAME,
+            folder=folder_path,
+            new_name=company_name + "." + img_format,
+        )
     file_path = (
         "http://" + settings.AWS_STORAGE_BUCKET_NAME + ".s3.amazonaws.com/" + s3_url[0]
     )
@@ -517,30 +511,72 @@ def get_absolute_url(job):
     return qs
 
 
+META_FIELDS = ("meta_title", "meta_description", "h1_tag")
+meta_registry = {"version": None, "templates": {}}
+
+
+def get_meta_version():
+    return namespace_version("meta")
+
+
+def invalidate_meta_data():
+    """Called when a MetaData row changes, every process reloads its templates"""
+    invalidate_namespace("meta")
+
+
+def get_meta_templates(name, version):
+    """
+    Compiled title, description and h1 templates of a MetaData row. All rows
+    are loaded and parsed once per version and kept in the process.
+    """
+    if meta_registry["version"] != version:
+        templates = {}
+        for meta in MetaData.objects.order_by("id"):
+            if meta.name not in templates:
+                templates[meta.name] = tuple(
+                    Template(getattr(meta, field)) for field in META_FIELDS
+                )
+        meta_registry["templates"] = templates
+        meta_registry["version"] = version
+    return meta_registry["templates"].get(name)
+
+
+def render_meta_templates(name, version, data):
+    templates = get_meta_templates(name, version)
+    if not templates:
+        return "", "", ""
+    context = Context(data)
+    return tuple(template.render(context) for template in templates)
+
+
+@lru_cache(maxsize=getattr(settings, "META_RENDER_CACHE_SIZE", 4096))
+def render_cached_meta(name, version, items):
+    return render_meta_templates(name, version, dict(items))
+
+
+def render_meta(name, data):
+    """
+    Render meta title, description and h1 tag of the MetaData row name.
+    Results for plain value contexts (page, skill, city...) are memoized.
+    """
+    version = get_meta_version()
+    if all(
+        value is None or isinstance(value, (str, int, float))
+        for value in data.values()
+    ):
+        return render_cached_meta(name, version, tuple(sorted(data.items())))
+    return render_meta_templates(name, version, data)
+
+
 def get_404_meta(name, data):
     data["skill"] = ", ".join(data.get("skill")) if data.get("skill") else ""
     data["city"] = ", ".join(data.get("city")) if data.get("city") else ""
-    meta_title = meta_description = ""
-    meta = MetaData.objects.filter(name=name)
-    if meta:
-        meta_title = Template(meta[0].meta_title).render(Context(data))
-        meta_description = Template(meta[0].meta_description).render(Context(data))
+    meta_title, meta_description, h1_tag = render_meta(name, data)
     return meta_title, meta_description
 
 
 def get_meta(name, data):
-    page = data.get("page")
-    meta_title = meta_description = h1_tag = ""
-    meta = MetaData.objects.filter(name=name)
-    if meta:
-        meta_title = Template(meta[0].meta_title).render(
-            Context({"current_page": page})
-        )
-        meta_description = Template(meta[0].meta_description).render(
-            Context({"current_page": page})
-        )
-        h1_tag = Template(meta[0].h1_tag).render(Context({"current_page": page}))
-    return meta_title, meta_description, h1_tag
+    return render_meta(name, {"current_page": data.get("page")})
 
 
 def get_given_meta(value, data):
@@ -585,23 +621,11 @@ def get_meta_data(name, data):
         value = skills[0]
     if value:
         meta_title, meta_description, h1_tag = get_given_meta(value, data)
-    meta = MetaData.objects.filter(name=name)
-    if not meta_title and meta:
-        meta_title = Template(meta[0].meta_title).render(
-            Context(
-                {"city": final_location, "skill": final_skill, "current_page": page}
-            )
-        )
-    if not meta_description and meta:
-        meta_description = Template(meta[0].meta_description).render(
-            Context(
-                {"city": final_location, "skill": final_skill, "current_page": page}
-            )
-        )
-    if not h1_tag and meta:
-        h1_tag = Template(meta[0].h1_tag).render(
-            Context(
-                {"city": final_location, "skill": final_skill, "current_page": page}
-            )
+    if not (meta_title and meta_description and h1_tag):
+        rendered = render_meta(
+            name, {"city": final_location, "skill": final_skill, "current_page": page}
         )
+        meta_title = meta_title or rendered[0]
+        meta_description = meta_description or rendered[1]
+        h1_tag = h1_tag or rendered[2]
     return meta_title, meta_description, h1_tag
@@ -0,0 +1,28 @@
+"""
+Management command to rebuild the precomputed sitemap snapshot.
+
+Usage:
+    python manage.py build_sitemap_snapshot
+    python manage.py build_sitemap_snapshot --section jobs --section skills
+"""
+from django.core.management.base import BaseCommand
+
+from psite.sitemaps import SNAPSHOT_SECTIONS, build_sitemap_snapshot
+
+
+class Command(BaseCommand):
+    help = "Rebuild the sitemap urls served by the sitemap sections"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--section",
+            action="append",
+            dest="sections",
+            choices=list(SNAPSHOT_SECTIONS),
+            help="Only rebuild this section (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        totals = build_sitemap_snapshot(options["sections"])
+        for section, total in totals.items():
+            self.stdout.write(self.style.SUCCESS(f"{section}: {total} urls"))
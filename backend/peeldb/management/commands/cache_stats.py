@@ -0,0 +1,29 @@
+"""
+Management command to show the hit and miss counters of the tiered cache.
+
+Usage:
+    python manage.py cache_stats
+    python manage.py cache_stats --invalidate lookups
+"""
+from django.core.management.base import BaseCommand
+
+from mpcomp.cache import get_cache_stats, invalidate_namespace
+
+
+class Command(BaseCommand):
+    help = "Show the cache hit rate and invalidate cache namespaces"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--invalidate",
+            action="append",
+            default=[],
+            help="Namespace to invalidate, e.g. lookups, facets, jobs or meta",
+        )
+
+    def handle(self, *args, **options):
+        for namespace in options["invalidate"]:
+            invalidate_namespace(namespace)
+            self.stdout.write(f"Invalidated {namespace}")
+        for name, value in get_cache_stats().items():
+            self.stdout.write(f"{name}: {value}")
@@ -0,0 +1,33 @@
+"""
+Management command to regenerate the slugs of live job posts, e.g. after a
+change to mpcomp.views.get_absolute_url.
+
+Usage:
+    python manage.py update_job_slugs
+    python manage.py update_job_slugs --workers 4 --chunk-size 5000
+"""
+from django.core.management.base import BaseCommand
+
+from mpcomp.job_slugs import CHUNK_SIZE, update_job_slugs
+
+
+class Command(BaseCommand):
+    help = "Regenerate the slugs of live job posts in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of chunks updated in parallel",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Number of jobs per chunk",
+        )
+
+    def handle(self, *args, **options):
+        total = update_job_slugs(options["workers"], options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Updated the slugs of {total} jobs"))
@@ -0,0 +1,35 @@
+"""
+Management command to backfill the stored profile completeness of users.
+
+Usage:
+    python manage.py update_profile_completeness
+    python manage.py update_profile_completeness --user-type JS
+"""
+from django.core.management.base import BaseCommand
+
+from mpcomp.profile_completeness import update_profile_completeness
+from peeldb.models import User
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored profile completeness of every user"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user-type",
+            choices=["JS", "EM"],
+            help="Only update job seekers (JS) or employers (EM)",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["user_type"]:
+            users = users.filter(user_type=options["user_type"])
+        ids = list(users.order_by("id").values_list("id", flat=True))
+        for start in range(0, len(ids), CHUNK_SIZE):
+            update_profile_completeness(ids[start : start + CHUNK_SIZE])
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated profile completeness of {len(ids)} users")
+        )
@@ -0,0 +1,66 @@
+"""
+Management command to (re)build the resume full text search vectors.
+
+Usage:
+    python manage.py update_resume_search
+    python manage.py update_resume_search --days 7
+    python manage.py update_resume_search --all
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from mpcomp.resume_search import (
+    update_agency_resume_search_vectors,
+    update_user_search_vectors,
+)
+from peeldb.models import AgencyResume, User
+
+CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Update resume search vectors of job seekers and agency resumes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild every search vector instead of recent changes only",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=1,
+            help="Update profiles changed in the last N days (default: 1)",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(user_type="JS")
+        agency_resumes = AgencyResume.objects.all()
+        if not options["all"]:
+            since = timezone.now() - timedelta(days=options["days"])
+            users = users.filter(
+                Q(search_vector__isnull=True) | Q(profile_updated__gte=since)
+            )
+            agency_resumes = agency_resumes.filter(
+                Q(search_vector__isnull=True) | Q(created_on__gte=since)
+            )
+
+        total_users = self.update_in_chunks(users, update_user_search_vectors)
+        total_resumes = self.update_in_chunks(
+            agency_resumes, update_agency_resume_search_vectors
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated {total_users} profiles and {total_resumes} agency resumes"
+            )
+        )
+
+    def update_in_chunks(self, queryset, update):
+        ids = list(queryset.order_by("id").values_list("id", flat=True))
+        for start in range(0, len(ids), CHUNK_SIZE):
+            update(ids[start : start + CHUNK_SIZE])
+        return len(ids)
@@ -0,0 +1,27 @@
+"""
+Management command to (re)build the precomputed similar and recommended jobs.
+
+Usage:
+    python manage.py update_similar_jobs
+    python manage.py update_similar_jobs --job 12 --job 15
+"""
+from django.core.management.base import BaseCommand
+
+from mpcomp.job_similarity import update_job_neighbours
+
+
+class Command(BaseCommand):
+    help = "Rebuild the similar and recommended jobs of live job posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--job",
+            type=int,
+            action="append",
+            dest="job_ids",
+            help="Only update the neighbours around this job (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        total = update_job_neighbours(options["job_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Updated neighbours of {total} jobs"))
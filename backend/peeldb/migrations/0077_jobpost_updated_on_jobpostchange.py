@@ -0,0 +1,32 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0076_alter_company_company_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='updated_on',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='JobPostChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('change_type', models.CharField(choices=[('Created', 'Created'), ('Updated', 'Updated'), ('Live', 'Live'), ('Expired', 'Expired'), ('Disabled', 'Disabled')], max_length=20)),
+                ('status', models.CharField(max_length=50)),
+                ('changed_on', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('job_post', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='changes', to='peeldb.jobpost')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
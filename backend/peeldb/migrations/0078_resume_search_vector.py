@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:33
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('peeldb', '0077_jobpost_updated_on_jobpostchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agencyresume',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='agencyresume',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='agencyresume_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='user_search_vector_idx'),
+        ),
+    ]
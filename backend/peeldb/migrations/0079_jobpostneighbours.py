@@ -0,0 +1,24 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:40
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0078_resume_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobPostNeighbours',
+            fields=[
+                ('job_post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='neighbours', serialize=False, to='peeldb.jobpost')),
+                ('similar', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None)),
+                ('recommended', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
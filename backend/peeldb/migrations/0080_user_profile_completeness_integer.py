@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:43
+
+from django.db import migrations, models
+
+
+def clear_invalid_completeness(apps, schema_editor):
+    """Blank or non numeric values cannot be cast to an integer column"""
+    User = apps.get_model('peeldb', 'User')
+    User.objects.exclude(profile_completeness__regex=r'^[0-9]{1,3}$').update(
+        profile_completeness='0'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0079_jobpostneighbours'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_invalid_completeness, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='profile_completeness',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0080_user_profile_completeness_integer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appliedjobs',
+            name='recruiter_notified_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-19 20:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0081_appliedjobs_recruiter_notified_on'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=50)),
+                ('position', models.PositiveIntegerField()),
+                ('location', models.CharField(max_length=1000)),
+                ('lastmod', models.DateTimeField(null=True)),
+            ],
+            options={
+                'unique_together': {('section', 'position')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0082_sitemapentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='go_live_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 20:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('peeldb', '0084_fanoutrun_fanoutchunk_fanoutreceipt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='resume_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='', max_length=20),
+        ),
+    ]
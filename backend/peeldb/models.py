@@ -10,8 +10,10 @@ from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, UserM
 # from oauth2client.contrib.django_util.models import CredentialsField
 
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q, Count, F, JSONField
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -495,6 +497,13 @@ MARTIAL_STATUS = (
     ("Married", "Married"),
 )
 
+RESUME_STATUS = (
+    ("pending", "Pending"),
+    ("processing", "Processing"),
+    ("completed", "Completed"),
+    ("failed", "Failed"),
+)
+
 REGISTERED_FROM = (
     ("Email", "Email"),
     ("Social", "Social"),
@@ -613,6 +622,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     show_email = models.BooleanField(default=False)
     resume_title = models.TextField(max_length=2000, blank=True, null=True)
     resume_text = models.TextField(blank=True, null=True)
+    # text extraction of the uploaded resume, see dashboard.tasks.process_resume
+    resume_status = models.CharField(
+        choices=RESUME_STATUS, max_length=20, blank=True, default=""
+    )
     mobile_verification_code = models.CharField(max_length=50, default="")
     last_mobile_code_verified_on = models.DateTimeField(auto_now_add=True)
     mobile_verified = models.BooleanField(default=False)
@@ -620,7 +633,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     email_notifications = models.BooleanField(default=True)
     profile_updated = models.DateTimeField(auto_now_add=True)
     is_admin = models.BooleanField(default=False)  # agency created user
-    profile_completeness = models.CharField(max_length=500, default="")
+    profile_completeness = models.PositiveSmallIntegerField(default=0)
     activation_code = models.CharField(max_length=100, null=True, blank=True)
     # is_register_through_mail = models.BooleanField(default=False)
     registered_from = models.CharField(
@@ -639,6 +652,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     # Password reset fields
     password_reset_token = models.CharField(max_length=100, null=True, blank=True)
     password_reset_token_created = models.DateTimeField(null=True, blank=True)
+    # resume text, skills, role and city, maintained by mpcomp.resume_search
+    search_vector = SearchVectorField(null=True, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
@@ -669,6 +684,7 @@ class User(AbstractBaseUser, PermissionsMixin):
             ("jobposts_invoice_access", "can manage invoice"),
             ("jobposts_resume_profiles", "can manage resume profiles"),
         )
+        indexes = [GinIndex(fields=["search_vector"], name="user_search_vector_idx")]
 
     def __str__(self):
         return self.email
@@ -776,36 +792,8 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     @property
     def profile_completion_percentage(self):
-        complete = 0
-        if self.year:
-            complete += 10
-        if self.mobile:
-            complete += 20
-        if self.is_active:
-            complete += 10
-        if self.user_type == "JS":
-            if self.resume:
-                complete += 15
-            if len(self.profile_description):
-                complete += 5
-            if self.education.all():
-                complete += 10
-            if self.project.all():
-                complete += 10
-            if self.skills.all():
-                complete += 15
-            if self.language.all():
-                complete += 5
-        else:
-            if self.job_role:
-                complete += 10
-            if self.industry.all():
-                complete += 10
-            if self.profile_description:
-                complete += 15
-            if self.technical_skills.all():
-                complete += 15
-        return complete
+        """Stored completeness, kept up to date by peeldb.signals"""
+        return self.profile_completeness
 
     def get_jobposts_count(self):
         return len(JobPost.objects.filter(user=self))
@@ -942,37 +930,14 @@ class User(AbstractBaseUser, PermissionsMixin):
         return JobAlert.objects.filter(email=self.email)
 
     def related_walkin_jobs(self):
-        skill_ids = self.skills.all().values_list("skill_id", flat=True)
-        job_posts = JobPost.objects.filter(status="Live", job_type="walk-in")
-        job_posts = job_posts.filter(skills__in=Skill.objects.filter(id__in=skill_ids))
-        if len(job_posts) > 0:
-            if len(job_posts) < 15:
-                all_job_posts = JobPost.objects.filter(status="Live").order_by(
-                    "-published_on"
-                )
-                rest = 15 - len(job_posts)
-                job_posts = list(job_posts) + list(all_job_posts[:rest])
-        else:
-            job_posts = JobPost.objects.filter(
-                status="Live", job_type="walk-in"
-            ).order_by("-published_on")[:15]
-        return job_posts
+        from mpcomp.job_matching import get_matching_jobs
+
+        return get_matching_jobs(self, job_type="walk-in")
 
     def related_jobs(self):
-        ids = (
-            AppliedJobs.objects.filter(user=self)
-            .exclude(ip_address="", user_agent="")
-            .values_list("job_post", flat=True)
-        )
-        user_skills = Skill.objects.filter(id__in=self.skills.all().values("skill"))
-        related_jobs = JobPost.objects.filter(
-            Q(status="Live") & Q(skills__in=user_skills)
-            | Q(location__in=[self.current_city])
-        ).exclude(id__in=ids)
-        related_jobs = list(related_jobs) + list(
-            JobPost.objects.filter(status="Live").order_by("-published_on")[:15]
-        )
-        return related_jobs[:15]
+        from mpcomp.job_matching import get_matching_jobs
+
+        return get_matching_jobs(self)
 
     def get_similar_recruiters(self):
         if self.agency_admin:
@@ -1307,7 +1272,10 @@ class JobPost(models.Model):
     min_salary = models.IntegerField(default=0)
     max_salary = models.IntegerField(default=0)
     published_on = models.DateTimeField(null=True, blank=True)
+    # when a Published job goes live, see mpcomp.job_publishing
+    go_live_at = models.DateTimeField(null=True, blank=True, db_index=True)
     created_on = models.DateField(auto_now_add=True)
+    updated_on = models.DateTimeField(auto_now=True, db_index=True)
     status = models.CharField(choices=POST_STATUS, max_length=50)
     job_type = models.CharField(choices=JOB_TYPE, max_length=50)
     work_mode = models.CharField(choices=WORK_MODE, max_length=50, default="in-office")
@@ -1451,40 +1419,14 @@ class JobPost(models.Model):
         return 0
 
     def get_similar_jobposts(self):
-        # current_date = datetime.strptime(str(datetime.now().date()), "%Y-%m-%d").strftime("%Y-%m-%d")
-        jobs = (
-            JobPost.objects.filter(Q(skills__in=self.skills.all()))
-            .filter(Q(min_year=self.min_year) | Q(max_year=self.max_year))
-            .exclude(pk=self.id)
-            .distinct()
-        )
-        jobs = (
-            jobs.filter(status="Live")
-            .select_related("company")
-            .prefetch_related("location")
-        )
-        # no_of_jobs = len(jobs)
-        # if no_of_jobs < 10:
-        #     jobs = JobPost.objects.filter(status='Live')
-        return jobs
+        from mpcomp.job_similarity import get_neighbour_jobs
+
+        return get_neighbour_jobs(self.id, "similar")
 
     def get_recommended_jobposts(self):
-        jobs = (
-            JobPost.objects.filter(
-                Q(skills__in=self.skills.all()) | Q(location__in=self.location.all())
-            )
-            .exclude(pk=self.id)
-            .distinct()
-        )
-        jobs = (
-            jobs.filter(status="Live")
-            .select_related("company")
-            .prefetch_related("location")
-        )
-        # no_of_jobs = len(jobs)
-        # if no_of_jobs < 10:
-        #     jobs = JobPost.objects.filter(status='Live')
-        return jobs
+        from mpcomp.job_similarity import get_neighbour_jobs
+
+        return get_neighbour_jobs(self.id, "recommended")
 
     def get_locations(self):
         return self.location.values_list("name", flat=True)
@@ -1515,25 +1457,18 @@ class JobPost(models.Model):
     def can_accept_applications(self):
         """
         Check if this job post can still accept applications.
-        Jobs can only accept applications if:
-        1. Status is 'Live'
-        2. Published within the last 30 days (or configured max age)
+        Only Live jobs accept applications, dashboard.tasks.check_expiring_jobs
+        moves the jobs published JOB_APPLICATION_MAX_AGE_DAYS (default 30) ago
+        to Expired every day. Jobs past the cutoff the run has not reached yet
+        are closed as well.
         """
-        from django.conf import settings
-
-        # Only Live jobs can accept applications
-        if self.status != 'Live':
-            return False
-
-        # Must have a published_on date
-        if not self.published_on:
-            return False
-
-        # Check if within application acceptance period (default 30 days)
-        max_age_days = getattr(settings, 'JOB_APPLICATION_MAX_AGE_DAYS', 30)
-        age = timezone.now() - self.published_on
+        from mpcomp.job_publishing import get_expiry_cutoff
 
-        return age.days < max_age_days
+        return (
+            self.status == 'Live'
+            and self.published_on is not None
+            and self.published_on.date() > get_expiry_cutoff()
+        )
 
     def get_selected_users(self):
         return AppliedJobs.objects.filter(job_post=self, status="Selected")
@@ -1631,6 +1566,136 @@ class JobPost(models.Model):
             return True
         return False
 
+    def log_change(self, change_type):
+        """Record a catalogue change for this job in the delta-sync feed"""
+        from mpcomp.cache import invalidate_namespace
+        from mpcomp.page_cache import purge_job_pages
+
+        purge_job_pages([self.id])
+        transaction.on_commit(lambda: invalidate_namespace("jobs"))
+        return JobPostChange.objects.create(
+            job_post_id=self.id, change_type=change_type, status=self.status
+        )
+
+
+JOBPOST_CHANGE_TYPE = (
+    ("Created", "Created"),
+    ("Updated", "Updated"),
+    ("Live", "Live"),
+    ("Expired", "Expired"),
+    ("Disabled", "Disabled"),
+)
+
+
+class JobPostChange(models.Model):
+    """
+    Append-only change log of the public job catalogue.
+    The auto-incrementing id is the watermark clients sync from.
+    """
+    id = models.BigAutoField(primary_key=True)
+    job_post = models.ForeignKey(
+        JobPost,
+        related_name="changes",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    change_type = models.CharField(choices=JOBPOST_CHANGE_TYPE, max_length=20)
+    status = models.CharField(max_length=50)
+    changed_on = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    @classmethod
+    def log_bulk(cls, job_ids, change_type, status):
+        """Record the same change for many jobs with a single insert"""
+        from mpcomp.cache import invalidate_namespace
+        from mpcomp.page_cache import purge_job_pages
+
+        job_ids = list(job_ids)
+        purge_job_pages(job_ids)
+        transaction.on_commit(lambda: invalidate_namespace("jobs"))
+        return cls.objects.bulk_create(
+            [
+                cls(job_post_id=job_id, change_type=change_type, status=status)
+                for job_id in job_ids
+            ]
+        )
+
+
+class JobPostNeighbours(models.Model):
+    """
+    Precomputed nearest live jobs of a live job, best match first.
+    Rebuilt in the background by mpcomp.job_similarity.
+    """
+    job_post = models.OneToOneField(
+        JobPost,
+        primary_key=True,
+        related_name="neighbours",
+        on_delete=models.CASCADE,
+    )
+    similar = ArrayField(models.IntegerField(), default=list)
+    recommended = ArrayField(models.IntegerField(), default=list)
+    updated_on = models.DateTimeField(auto_now=True)
+
+
+class SitemapEntry(models.Model):
+    """
+    Materialized sitemap urls, numbered from 0 in serving order within each
+    section. Rebuilt in the background by psite.sitemaps.build_sitemap_snapshot.
+    """
+    section = models.CharField(max_length=50)
+    position = models.PositiveIntegerField()
+    location = models.CharField(max_length=1000)
+    lastmod = models.DateTimeField(null=True)
+
+    class Meta:
+        unique_together = ("section", "position")
+
+
+class FanOutRun(models.Model):
+    """
+    One run of a bulk notification, see mpcomp.fanout. The key identifies the
+    run within its fan-out (e.g. the day of a daily alert), starting the same
+    run again does not send anything twice.
+    """
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100)
+    params = models.JSONField(default=dict)
+    chunks_total = models.PositiveIntegerField(default=0)
+    chunks_done = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    created_on = models.DateTimeField(auto_now_add=True)
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("name", "key")
+
+
+class FanOutChunk(models.Model):
+    """Primary key range of a fan-out run, last_id is its checkpoint"""
+    run = models.ForeignKey(FanOutRun, related_name="chunks", on_delete=models.CASCADE)
+    start_id = models.BigIntegerField()
+    end_id = models.BigIntegerField()
+    last_id = models.BigIntegerField(null=True, blank=True)
+    sent = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    updated_on = models.DateTimeField(auto_now=True)
+    done_on = models.DateTimeField(null=True, blank=True)
+
+
+class FanOutReceipt(models.Model):
+    """A row of a fan-out run was handled, its email is never queued again"""
+    id = models.BigAutoField(primary_key=True)
+    run = models.ForeignKey(
+        FanOutRun, related_name="receipts", on_delete=models.CASCADE
+    )
+    recipient_id = models.BigIntegerField()
+
+    class Meta:
+        unique_together = ("run", "recipient_id")
+
 
 POST = (
     ("Page", "Page"),
@@ -1673,6 +1738,12 @@ class AgencyResume(models.Model):
         User, blank=True, null=True, related_name="Applicant", on_delete=models.SET_NULL
     )
     created_on = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="agencyresume_search_vector_idx")
+        ]
 
 
 POST = (
@@ -1695,6 +1766,8 @@ class AppliedJobs(models.Model):
     resume_applicant = models.ForeignKey(
         AgencyResume, null=True, blank=True, on_delete=models.CASCADE
     )
+    # set once the recruiter was notified, see dashboard.tasks.application_submitted
+    recruiter_notified_on = models.DateTimeField(null=True, blank=True)
 
 
 ENQUERY_TYPES = (
@@ -1901,6 +1974,19 @@ class MetaData(models.Model):
     meta_description = models.CharField(max_length=2000)
     h1_tag = models.CharField(max_length=2000)
 
+    def save(self, *args, **kwargs):
+        from mpcomp.views import invalidate_meta_data
+
+        super().save(*args, **kwargs)
+        invalidate_meta_data()
+
+    def delete(self, *args, **kwargs):
+        from mpcomp.views import invalidate_meta_data
+
+        result = super().delete(*args, **kwargs)
+        invalidate_meta_data()
+        return result
+
 
 class UserMessage(models.Model):
     message = models.CharField(max_length=2000)
@@ -0,0 +1,219 @@
+"""
+Keep the stored profile completeness of users in sync with their profiles.
+
+Changes to the profile relations arrive as m2m_changed. Deleting an
+education, project, skill or language row removes its through rows without
+any m2m signal, so the users holding it are collected in pre_delete and
+updated in post_delete.
+
+Uploaded company logos and profile pictures get their thumbnails generated
+in the background, once per new picture. Pictures that are links to other
+sites, such as Google avatars, are left alone.
+
+Changes to skills, qualifications, industries, locations and companies
+invalidate the cached lookup and facet lists.
+
+Saving a job seeker or an agency resume with changes to the searchable
+fields, or changing their skills, refreshes their search vectors.
+"""
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from jobsp.thumbnailname import get_thumbnail_variants, queue_thumbnails
+from mpcomp.cache import invalidate_namespace
+from mpcomp.resume_search import (
+    SEARCH_FIELDS,
+    SEARCH_RELATIONS,
+    queue_search_vectors,
+)
+from mpcomp.profile_completeness import (
+    PROFILE_FIELDS,
+    PROFILE_RELATIONS,
+    refresh_profile_completeness,
+    update_profile_completeness,
+)
+from peeldb.models import (
+    AgencyResume,
+    City,
+    Company,
+    Industry,
+    Qualification,
+    Skill,
+    State,
+    TechnicalSkill,
+    User,
+)
+
+LOOKUP_MODELS = (Skill, Qualification, Industry, City, State, Company)
+PROFILE_FIELDS_BY_THROUGH = {
+    getattr(User, relation).field.remote_field.through: getattr(User, relation).field
+    for relation in PROFILE_RELATIONS
+}
+SEARCH_THROUGHS = {getattr(User, relation).through for relation in SEARCH_RELATIONS}
+SEARCH_MODELS = {
+    getattr(User, relation).field.related_model for relation in SEARCH_RELATIONS
+}
+
+
+def get_profile_pic_name(instance):
+    # read the raw value, a deferred profile_pic must not cost a query
+    value = instance.__dict__.get("profile_pic")
+    return getattr(value, "name", value) or ""
+
+
+def profile_pic_loaded(sender, instance, **kwargs):
+    instance._saved_profile_pic = get_profile_pic_name(instance)
+
+
+def new_profile_pic(instance, created, update_fields):
+    """Whether the save stored a new picture uploaded to our storage"""
+    if update_fields is not None and "profile_pic" not in update_fields:
+        return False
+    name = get_profile_pic_name(instance)
+    if not created and name == getattr(instance, "_saved_profile_pic", ""):
+        return False
+    instance._saved_profile_pic = name
+    return bool(name) and "://" not in name
+
+
+@receiver(post_save, sender=User)
+def user_saved(
+    sender, instance, created=False, update_fields=None, raw=False, **kwargs
+):
+    if raw:
+        return
+    if update_fields is None or PROFILE_FIELDS.intersection(update_fields):
+        refresh_profile_completeness(instance)
+    if instance.user_type == "JS" and (
+        update_fields is None or SEARCH_FIELDS.intersection(update_fields)
+    ):
+        queue_search_vectors("user", [instance.pk])
+    if new_profile_pic(instance, created, update_fields):
+        queue_thumbnails(
+            instance.profile_pic.url, get_thumbnail_variants("profile_pic")
+        )
+
+
+@receiver(post_save, sender=Company)
+def company_saved(
+    sender, instance, created=False, update_fields=None, raw=False, **kwargs
+):
+    if raw:
+        return
+    if new_profile_pic(instance, created, update_fields):
+        queue_thumbnails(
+            instance.get_logo_url(), get_thumbnail_variants("company_logo")
+        )
+
+
+for model in (User, Company):
+    post_init.connect(
+        profile_pic_loaded, sender=model, dispatch_uid="profile_pic_" + model.__name__
+    )
+
+
+def profile_relation_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_profile_completeness(instance)
+            if sender in SEARCH_THROUGHS:
+                queue_search_vectors("user", [instance.pk])
+    elif action == "pre_clear":
+        # pk_set is None on clear, remember who is about to lose the relation
+        field = PROFILE_FIELDS_BY_THROUGH[sender].m2m_reverse_field_name()
+        instance._profile_user_ids = list(
+            sender.objects.filter(**{field: instance.pk}).values_list(
+                "user_id", flat=True
+            )
+        )
+    elif action == "post_clear":
+        user_ids = getattr(instance, "_profile_user_ids", [])
+        update_profile_completeness(user_ids)
+        if sender in SEARCH_THROUGHS:
+            queue_search_vectors("user", user_ids)
+    elif action in ("post_add", "post_remove"):
+        update_profile_completeness(pk_set)
+        if sender in SEARCH_THROUGHS:
+            queue_search_vectors("user", pk_set)
+
+
+def collect_profile_users(sender, instance, **kwargs):
+    instance._profile_user_ids = []
+    for through, field in PROFILE_FIELDS_BY_THROUGH.items():
+        if field.related_model is sender:
+            instance._profile_user_ids += through.objects.filter(
+                **{field.m2m_reverse_field_name(): instance.pk}
+            ).values_list("user_id", flat=True)
+
+
+def profile_related_deleted(sender, instance, **kwargs):
+    user_ids = getattr(instance, "_profile_user_ids", None)
+    if user_ids:
+        update_profile_completeness(user_ids)
+        if sender in SEARCH_MODELS:
+            queue_search_vectors("user", user_ids)
+
+
+@receiver(post_save, sender=TechnicalSkill)
+def technical_skill_saved(sender, instance, created, raw=False, **kwargs):
+    # a new row reaches its user through m2m_changed
+    if raw or created:
+        return
+    queue_search_vectors(
+        "user",
+        User.skills.through.objects.filter(technicalskill_id=instance.pk).values_list(
+            "user_id", flat=True
+        ),
+    )
+
+
+for through, field in PROFILE_FIELDS_BY_THROUGH.items():
+    m2m_changed.connect(
+        profile_relation_changed,
+        sender=through,
+        dispatch_uid="profile_" + field.name,
+    )
+    pre_delete.connect(
+        collect_profile_users,
+        sender=field.related_model,
+        dispatch_uid="profile_" + field.related_model.__name__,
+    )
+    post_delete.connect(
+        profile_related_deleted,
+        sender=field.related_model,
+        dispatch_uid="profile_" + field.related_model.__name__,
+    )
+
+
+def lookup_changed(sender, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_namespace("lookups")
+    invalidate_namespace("facets")
+
+
+for model in LOOKUP_MODELS:
+    post_save.connect(
+        lookup_changed, sender=model, dispatch_uid="lookups_" + model.__name__
+    )
+    post_delete.connect(
+        lookup_changed, sender=model, dispatch_uid="lookups_" + model.__name__
+    )
+
+
+@receiver(post_save, sender=AgencyResume)
+def agency_resume_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_search_vectors("agency_resume", [instance.pk])
+
+
+@receiver(m2m_changed, sender=AgencyResume.skill.through)
+def agency_resume_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        queue_search_vectors("agency_resume", [instance.pk])
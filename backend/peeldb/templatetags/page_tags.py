@@ -1,5 +1,4 @@
 import datetime
-from datetime import date
 import arrow
 import re
 import locale
@@ -10,6 +9,8 @@ from django.conf import settings
 from django.db.models import Count, Q, Prefetch
 from django.core.cache import cache
 import boto3
+from mpcomp.cache import namespaced_key
+from mpcomp.job_publishing import get_expiry_cutoff
 from peeldb.models import (
     AppliedJobs,
     JobPost,
@@ -132,14 +133,15 @@ def get_latest_walkins():
     # date = datetime.date.today()
     # start_week = date - datetime.timedelta(date.weekday())
     # end_week = start_week + datetime.timedelta(30)
-    latest_walkins = cache.get("latest_walkins")
+    key = namespaced_key("jobs", "latest_walkins")
+    latest_walkins = cache.get(key)
     if not latest_walkins:
         latest_walkins = (
             JobPost.objects.filter(job_type="walk-in", status="Live")
             .prefetch_related("location", "company")
             .order_by("-walkin_to_date")[:10]
         )
-        cache.set("latest_walkins", latest_walkins, 60 * 60 * 48)
+        cache.set(key, latest_walkins, 60 * 60 * 48)
 
     # jobs_list = jobs_list.filter(Q(walkin_from_date__range=[start_week, end_week]) | Q(walkin_to_date__range=[start_week, end_week]))
     return latest_walkins
@@ -147,18 +149,20 @@ def get_latest_walkins():
 
 @register.simple_tag
 def get_latest_jobposts():
-    latest_jobposts = cache.get("latest_jobposts")
+    key = namespaced_key("jobs", "latest_jobposts")
+    latest_jobposts = cache.get(key)
     if not latest_jobposts:
         latest_jobposts = JobPost.objects.filter(status="Live").exclude(
             job_type="walk-in"
         )[:10]
-        cache.set("latest_jobposts", latest_jobposts, 60 * 5)
+        cache.set(key, latest_jobposts, 60 * 5)
     return latest_jobposts
 
 
 @register.simple_tag
 def get_latest_recruiters():
-    latest_recruiters = cache.get("latest_recruiters")
+    key = namespaced_key("lookups", "latest_recruiters")
+    latest_recruiters = cache.get(key)
     if not latest_recruiters:
         latest_recruiters = (
             User.objects.filter(
@@ -170,7 +174,7 @@ def get_latest_recruiters():
             .prefetch_related("company")
             .order_by("-num_posts")[:7]
         )
-        cache.set("latest_recruiters", latest_recruiters, 60 * 60 * 48)
+        cache.set(key, latest_recruiters, 60 * 60 * 48)
     return latest_recruiters
 
 
@@ -223,14 +227,15 @@ def get_industry_name(value):
 
 @register.simple_tag
 def get_industries():
-    all_industries = cache.get("list_all_industries")
+    key = namespaced_key("lookups", "list_all_industries")
+    all_industries = cache.get(key)
     if not all_industries:
         all_industries = (
             Industry.objects.filter(status="Active")
             .annotate(num_posts=Count("jobpost"))
             .order_by("-num_posts")[:17]
         )
-        cache.set("list_all_industries", all_industries, 60 * 60 * 24)
+        cache.set(key, all_industries, 60 * 60 * 24)
     return all_industries
 
 
@@ -246,7 +251,8 @@ def get_all_industries():
 
 @register.simple_tag
 def get_skills():
-    all_skills = cache.get("list_all_skills")
+    key = namespaced_key("lookups", "list_all_skills")
+    all_skills = cache.get(key)
     if not all_skills:
         all_skills = (
             Skill.objects.annotate(num_posts=Count("jobpost"))
@@ -254,7 +260,7 @@ def get_skills():
             .exclude(name="Fresher")
             .order_by("-num_posts")
         )
-        cache.set("list_all_skills", all_skills, 60 * 60 * 24)
+        cache.set(key, all_skills, 60 * 60 * 24)
     return all_skills[:17]
 
 
@@ -271,14 +277,15 @@ def get_all_skills():
 
 @register.simple_tag
 def get_refine_skills(skills):
-    all_refine_skills = cache.get("all_refine_skills")
+    key = namespaced_key("facets", "all_refine_skills")
+    all_refine_skills = cache.get(key)
     if not all_refine_skills:
         all_refine_skills = list(
             Skill.objects.filter(status="Active")
             .annotate(num_posts=Count("jobpost"))
             .order_by("-num_posts")
         )
-        cache.set("all_refine_skills", all_refine_skills, 10000)
+        cache.set(key, all_refine_skills, 10000)
     if skills:
         each_skill = skills.annotate(num_posts=Count("jobpost")).order_by("num_posts")
         for each in each_skill.iterator():
@@ -292,14 +299,15 @@ def get_refine_skills(skills):
 
 @register.simple_tag
 def get_refine_locations(locations):
-    all_refine_locations = cache.get("all_refine_locations")
+    key = namespaced_key("facets", "all_refine_locations")
+    all_refine_locations = cache.get(key)
     if not all_refine_locations:
         all_refine_locations = list(
             City.objects.annotate(num_posts=Count("locations"))
             .filter(status="Enabled")
             .order_by("-num_posts")
         )
-        cache.set("all_refine_locations", all_refine_locations, 10000)
+        cache.set(key, all_refine_locations, 10000)
     if locations:
         each_location = locations.annotate(num_posts=Count("locations")).order_by(
             "num_posts"
@@ -315,14 +323,15 @@ def get_refine_locations(locations):
 
 @register.simple_tag
 def get_refine_states(states):
-    all_refine_states = cache.get("all_refine_states")
+    key = namespaced_key("facets", "all_refine_states")
+    all_refine_states = cache.get(key)
     if not all_refine_states:
         all_refine_states = list(
             State.objects.annotate(num_posts=Count("state__locations"))
             .filter(status="Enabled")
             .order_by("-num_posts")
         )
-        cache.set("all_refine_states", all_refine_states, 10000)
+        cache.set(key, all_refine_states, 10000)
     if states:
         each_location = states.annotate(num_posts=Count("state__locations")).order_by(
             "num_posts"
@@ -338,14 +347,15 @@ def get_refine_states(states):
 
 @register.simple_tag
 def get_refine_industries(industry):
-    all_refine_industries = cache.get("all_refine_industries")
+    key = namespaced_key("facets", "all_refine_industries")
+    all_refine_industries = cache.get(key)
     if not all_refine_industries:
         all_refine_industries = list(
             Industry.objects.annotate(num_posts=Count("jobpost"))
             .filter(status="Active")
             .order_by("-num_posts")
         )
-        cache.set("all_refine_industries", all_refine_industries, 10000)
+        cache.set(key, all_refine_industries, 10000)
     if industry:
         each_industry = industry.annotate(num_posts=Count("jobpost")).order_by(
             "num_posts"
@@ -361,14 +371,15 @@ def get_refine_industries(industry):
 
 @register.simple_tag
 def get_refine_educations(education):
-    all_refine_educations = cache.get("all_refine_educations")
+    key = namespaced_key("facets", "all_refine_educations")
+    all_refine_educations = cache.get(key)
     if not all_refine_educations:
         all_refine_educations = list(
             Qualification.objects.annotate(num_posts=Count("jobpost"))
             .filter(status="Active")
             .order_by("-num_posts")
         )
-        cache.set("all_refine_educations", all_refine_educations, 10000)
+        cache.set(key, all_refine_educations, 10000)
     if education:
         each_edu = education.annotate(num_posts=Count("jobpost")).order_by("num_posts")
         for each in each_edu.iterator():
@@ -382,47 +393,51 @@ def get_refine_educations(education):
 
 @register.simple_tag
 def get_locations():
-    all_locations = cache.get("list_all_locations")
+    key = namespaced_key("lookups", "list_all_locations")
+    all_locations = cache.get(key)
     if not all_locations:
         all_locations = (
             City.objects.annotate(num_posts=Count("locations"))
             .filter(status="Enabled")
             .order_by("-num_posts")
         )
-        cache.set("list_all_locations", all_locations, 60 * 60 * 48)
+        cache.set(key, all_locations, 60 * 60 * 48)
     return all_locations
 
 
 @register.simple_tag
 def get_full_time_jobs():
-    all_jobs = cache.get("list_all_jobs")
+    key = namespaced_key("jobs", "list_all_jobs")
+    all_jobs = cache.get(key)
     if not all_jobs:
         all_jobs = JobPost.objects.filter(job_type="full-time", status="Live").order_by(
             "-published_on"
         )[:10]
-        cache.set("list_all_jobs", all_jobs, 60 * 60 * 48)
+        cache.set(key, all_jobs, 60 * 60 * 48)
     return all_jobs
 
 
 @register.simple_tag
 def get_internships():
-    internship_locations = cache.get("list_all_internship_jobs")
+    key = namespaced_key("lookups", "list_all_internship_jobs")
+    internship_locations = cache.get(key)
     if not internship_locations:
         internship_locations = (
             City.objects.filter(locations__job_type="internship", status="Enabled")
             .annotate(num_posts=Count("locations"))
             .distinct()
         )
-        cache.set("list_all_internship_jobs", internship_locations, 60 * 60 * 24)
+        cache.set(key, internship_locations, 60 * 60 * 24)
     return internship_locations[:17]
 
 
 @register.simple_tag
 def get_government_jobs():
-    all_jobs = cache.get("list_all_government_jobs")
+    key = namespaced_key("jobs", "list_all_government_jobs")
+    all_jobs = cache.get(key)
     if not all_jobs:
         all_jobs = JobPost.objects.filter(job_type="governament", status="Live")[:17]
-        cache.set("list_all_government_jobs", all_jobs, 60 * 60 * 48)
+        cache.set(key, all_jobs, 60 * 60 * 48)
     return all_jobs
 
 
@@ -443,14 +458,15 @@ def filter_users(value, status):
 
 @register.simple_tag
 def get_companies():
-    all_companies = cache.get("list_all_companies")
+    key = namespaced_key("lookups", "list_all_companies")
+    all_companies = cache.get(key)
     if not all_companies:
         all_companies = (
             Company.objects.filter(is_active=True)
             .annotate(num_posts=Count("jobpost"))
             .order_by("-num_posts")[:50]
         )
-        cache.set("list_all_companies", all_companies, 60 * 60 * 48)
+        cache.set(key, all_companies, 60 * 60 * 48)
     return all_companies
 
 
@@ -593,42 +609,35 @@ def get_skill_icon(value):
 
 @register.simple_tag
 def get_qualifications():
-    latest_qualifications = cache.get("latest_qualifications")
+    key = namespaced_key("lookups", "latest_qualifications")
+    latest_qualifications = cache.get(key)
     if not latest_qualifications:
         latest_qualifications = (
             Qualification.objects.annotate(num_posts=Count("jobpost"))
             .filter(status="Active")
             .order_by("-num_posts")
         )
-        cache.set("latest_qualifications", latest_qualifications, 60 * 60 * 48)
+        cache.set(key, latest_qualifications, 60 * 60 * 48)
     return latest_qualifications
 
 
 @register.simple_tag
 def get_all_cities():
-    latest_cities = cache.get("latest_cities")
+    key = namespaced_key("lookups", "latest_cities")
+    latest_cities = cache.get(key)
     if not latest_cities:
-        print("no cache")
         latest_cities = City.objects.filter(status="Enabled").order_by("name")
-        cache.set("latest_cities", latest_cities, 60 * 60 * 48)
+        cache.set(key, latest_cities, 60 * 60 * 48)
     return latest_cities
 
 
 @register.simple_tag
 def get_years():
-    years = cache.get("years")
-    if not years:
-        years = YEARS
-        cache.set("years", years, 60 * 60 * 48)
     return YEARS
 
 
 @register.simple_tag
 def get_months():
-    months = cache.get("months")
-    if not months:
-        months = MONTHS
-        cache.set("months", MONTHS, 60 * 60 * 48)
     return MONTHS
 
 
@@ -686,7 +695,8 @@ def get_related_skills(search_skills):
     for job in jobs:
         skills.extend(job.skills.all())
     if len(skills) < 20:
-        latest = cache.get("get_top_skills")
+        key = namespaced_key("lookups", "get_top_skills")
+        latest = cache.get(key)
         if not latest:
             latest = (
                 Skill.objects.filter(status="Active")
@@ -694,7 +704,7 @@ def get_related_skills(search_skills):
                 .annotate(num_posts=Count("jobpost"))
                 .order_by("-num_posts")
             )
-            cache.set("get_top_skills", latest, 60 * 60 * 24)
+            cache.set(key, latest, 60 * 60 * 24)
         latest = latest.filter(skill_type=status)
         skills.extend(latest[:20])
     c = Counter(skills)
@@ -705,12 +715,9 @@ def get_related_skills(search_skills):
 @register.filter()
 def is_events_created(request, job):
     """Google Calendar integration removed - check job expiry using 30-day rule"""
-    from datetime import timedelta
     if not job.published_on:
         return True
-    max_age_days = getattr(settings, 'JOB_APPLICATION_MAX_AGE_DAYS', 30)
-    expiry_date = job.published_on.date() + timedelta(days=max_age_days)
-    return date.today() >= expiry_date
+    return job.status == "Expired" or job.published_on.date() <= get_expiry_cutoff()
 
 
 @register.simple_tag()
@@ -0,0 +1,21 @@
+"""
+Helpers shared by the test suites of the apps.
+"""
+from datetime import datetime
+
+from peeldb.models import JobPost
+
+
+def create_job(user, title, skills=(), locations=(), **fields):
+    """A Live job post of the user, published now unless fields say otherwise"""
+    fields.setdefault("vacancies", "1")
+    fields.setdefault("description", "job post description")
+    fields.setdefault("job_type", "full-time")
+    fields.setdefault("status", "Live")
+    fields.setdefault("published_on", datetime.now())
+    job = JobPost.objects.create(user=user, title=title, **fields)
+    if skills:
+        job.skills.add(*skills)
+    if locations:
+        job.location.add(*locations)
+    return job
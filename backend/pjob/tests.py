@@ -1,7 +1,15 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
 from django.test import Client
+from django.core.cache import cache
 from django.urls import reverse
-from datetime import datetime
+from django.utils import timezone
+from django.utils.http import http_date
+from datetime import datetime, timedelta
 from peeldb.models import (
     User,
     Country,
@@ -13,8 +21,16 @@ from peeldb.models import (
     FunctionalArea,
     JobPost,
     InterviewLocation,
+    MetaData,
+    AppliedJobs,
 )
-from django.core import management
+from django.core import mail, management
+from django.core.files.base import ContentFile
+from dashboard.tasks import application_submitted
+from mpcomp.job_similarity import update_job_neighbours
+from mpcomp.page_cache import purge_tags, tag_page
+from mpcomp.views import get_meta, render_meta
+from peeldb.testing import create_job
 
 
 class BaseTest(TestCase):
@@ -487,3 +503,262 @@ class calendar_views_get(BaseTest):
         )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "calendar/calendar_day_results.html")
+
+
+class conditional_get_views(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create(email="test@mp.com", username="test")
+        self.jobpost = JobPost.objects.create(
+            user=self.user,
+            title="test-jobpost",
+            vacancies="6",
+            description="job post description",
+            job_type="government",
+            status="Live",
+        )
+
+    def test_job_detail_not_modified(self):
+        url = reverse(
+            "job_detail",
+            kwargs={"job_title_slug": "test-jobpost-0-to-0-years", "job_id": str(self.jobpost.id)},
+        )
+        if_modified_since = http_date(
+            timezone.make_aware(self.jobpost.updated_on + timedelta(minutes=1)).timestamp()
+        )
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=if_modified_since)
+        self.assertEqual(response.status_code, 304)
+
+    def test_listing_etag_follows_live_set(self):
+        response = self.client.get(reverse("government_jobs"))
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = self.client.get(reverse("government_jobs"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jobpost.status = "Disabled"
+            self.jobpost.save()
+            self.jobpost.log_change("Disabled")
+        response = self.client.get(reverse("government_jobs"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_listing_etag_is_cached_until_a_change(self):
+        response = self.client.get(reverse("government_jobs"))
+        etag = response["ETag"]
+
+        # only the session lookup of the middleware
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("government_jobs"), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+
+class page_cache_views(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create(email="test@mp.com", username="test")
+        self.jobpost = JobPost.objects.create(
+            user=self.user,
+            title="test-jobpost",
+            vacancies="6",
+            description="job post description",
+            job_type="government",
+            status="Live",
+        )
+
+    def test_anonymous_page_is_cached(self):
+        response = self.client.get(reverse("government_jobs"))
+        self.assertEqual(response["X-Page-Cache"], "MISS")
+
+        response = self.client.get(reverse("government_jobs"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Page-Cache"], "HIT")
+        self.assertIn(b"test-jobpost", response.content)
+        self.assertNotIn(b"__csrf_token__", response.content)
+
+    def test_job_change_purges_page(self):
+        self.client.get(reverse("government_jobs"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jobpost.status = "Disabled"
+            self.jobpost.save()
+            self.jobpost.log_change("Disabled")
+
+        response = self.client.get(reverse("government_jobs"))
+        self.assertEqual(response["X-Page-Cache"], "MISS")
+        self.assertNotIn(b"test-jobpost", response.content)
+
+    def test_unrelated_change_keeps_page(self):
+        self.client.get(reverse("government_jobs"))
+        other_job = JobPost.objects.create(
+            user=self.user,
+            title="other-jobpost",
+            vacancies="1",
+            description="job post description",
+            job_type="full-time",
+            status="Live",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            other_job.log_change("Live")
+
+        response = self.client.get(reverse("government_jobs"))
+        self.assertEqual(response["X-Page-Cache"], "HIT")
+
+    def test_purge_is_applied_on_commit(self):
+        self.client.get(reverse("government_jobs"))
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.jobpost.log_change("Updated")
+            response = self.client.get(reverse("government_jobs"))
+            self.assertEqual(response["X-Page-Cache"], "HIT")
+        for callback in callbacks:
+            callback()
+
+        response = self.client.get(reverse("government_jobs"))
+        self.assertEqual(response["X-Page-Cache"], "MISS")
+
+    def test_page_rendered_during_a_purge_is_not_stored(self):
+        def tag_page_and_purge(request, jobs=(), **facets):
+            tag_page(request, jobs, **facets)
+            purge_tags(["job:0"])
+
+        with mock.patch("pjob.views.tag_page", side_effect=tag_page_and_purge):
+            response = self.client.get(reverse("government_jobs"))
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(reverse("government_jobs"))
+        self.assertEqual(response["X-Page-Cache"], "MISS")
+
+
+class meta_data_rendering(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.meta = MetaData.objects.create(
+            name="government_jobs",
+            meta_title="Government Jobs - Page {{ current_page }}",
+            meta_description="Latest government jobs",
+            h1_tag="Government Jobs",
+        )
+
+    def test_rendered_meta_is_memoized(self):
+        self.assertEqual(
+            get_meta("government_jobs", {"page": 2}),
+            ("Government Jobs - Page 2", "Latest government jobs", "Government Jobs"),
+        )
+        with self.assertNumQueries(0):
+            get_meta("government_jobs", {"page": 2})
+            get_meta("government_jobs", {"page": 3})
+
+    def test_save_invalidates_templates(self):
+        get_meta("government_jobs", {"page": 1})
+        self.meta.meta_title = "Sarkari Naukri {{ current_page }}"
+        self.meta.save()
+
+        meta_title, meta_description, h1_tag = get_meta("government_jobs", {"page": 1})
+        self.assertEqual(meta_title, "Sarkari Naukri 1")
+
+    def test_missing_meta_data(self):
+        self.assertEqual(render_meta("unknown_page", {}), ("", "", ""))
+
+
+class similar_jobs(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="test@mp.com", username="test")
+        self.python = Skill.objects.create(name="Python", slug="python")
+        self.django = Skill.objects.create(name="Django", slug="django")
+        self.java = Skill.objects.create(name="Java", slug="java")
+        self.job = self.create_job("python-developer", [self.python, self.django])
+        self.close_job = self.create_job("django-developer", [self.python, self.django])
+        self.far_job = self.create_job("python-lead", [self.python], min_year=8)
+        self.other_job = self.create_job("java-developer", [self.java])
+
+    def create_job(self, title, skills, min_year=1):
+        return create_job(
+            self.user,
+            title,
+            skills,
+            published_on=None,
+            min_year=min_year,
+            max_year=min_year + 2,
+        )
+
+    def test_neighbours_are_ranked(self):
+        update_job_neighbours()
+        with self.assertNumQueries(3):
+            jobs = self.job.get_similar_jobposts()
+        self.assertEqual(jobs, [self.close_job, self.far_job])
+        self.assertNotIn(self.job, self.job.get_recommended_jobposts())
+
+    def test_changed_jobs_are_refreshed(self):
+        update_job_neighbours()
+        new_job = self.create_job("flask-developer", [self.python, self.django])
+        update_job_neighbours([new_job.id])
+        self.assertIn(new_job, self.job.get_similar_jobposts())
+
+        self.close_job.status = "Disabled"
+        self.close_job.save()
+        update_job_neighbours([self.close_job.id])
+        self.assertNotIn(self.close_job, self.job.get_similar_jobposts())
+        self.assertEqual(self.close_job.get_similar_jobposts(), [])
+
+    def test_changes_only_reach_the_closest_jobs(self):
+        update_job_neighbours()
+        new_job = self.create_job("flask-developer", [self.python, self.django])
+        with self.settings(JOB_NEIGHBOURS_MAX_TARGETS=1):
+            self.assertEqual(update_job_neighbours([new_job.id]), 2)
+        self.assertIn(new_job, self.close_job.get_similar_jobposts())
+        self.assertNotIn(new_job, self.far_job.get_similar_jobposts())
+        self.assertEqual(
+            new_job.get_similar_jobposts(), [self.close_job, self.job, self.far_job]
+        )
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class job_application_pipeline(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings.enable()
+        self.recruiter = User.objects.create(
+            email="recruiter@mp.com", username="recruiter", user_type="EM"
+        )
+        self.applicant = User.objects.create(
+            email="applicant@mp.com",
+            username="applicant",
+            user_type="JS",
+            is_active=True,
+        )
+        self.applicant.resume.save("resume.pdf", ContentFile(b"%PDF-1.4 resume"))
+        self.jobpost = JobPost.objects.create(
+            user=self.recruiter,
+            title="python-developer",
+            vacancies="1",
+            description="job post description",
+            job_type="full-time",
+            company_name="Peel",
+            status="Live",
+        )
+        self.client.force_login(self.applicant)
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_apply_notifies_recruiter_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(
+                reverse("jobs:job_apply", kwargs={"job_id": self.jobpost.id}),
+                HTTP_USER_AGENT="test",
+            )
+        self.assertFalse(json.loads(response.content)["error"])
+        application = AppliedJobs.objects.get(user=self.applicant)
+        self.assertIsNotNone(application.recruiter_notified_on)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["recruiter@mp.com"])
+        self.assertEqual(mail.outbox[0].attachments[0][1], b"%PDF-1.4 resume")
+
+        application_submitted.delay(application.id)
+        self.assertEqual(len(mail.outbox), 1)
@@ -1,7 +1,6 @@
 import json
 import math
 import re
-import os
 import boto3
 import random
 
@@ -11,9 +10,10 @@ from django.contrib.auth.decorators import login_required
 from django.conf import settings
 from django.utils import timezone
 from datetime import date
+from django.db import transaction
 from django.db.models import Q, F, Case, When, Value
 from django.urls import reverse
-from django.template import loader, Template, Context
+from django.template import loader
 from django.db.models import Count
 from django.core import serializers
 from django.contrib.auth import authenticate, login
@@ -29,17 +29,21 @@ from mpcomp.views import (
     get_valid_locations_list,
     get_social_referer,
     get_resume_data,
-    handle_uploaded_file,
     get_valid_qualifications,
     get_meta,
     get_ordered_skill_degrees,
     get_404_meta,
+    render_meta,
     rand_string,
 )
+from mpcomp.conditional import job_detail_condition, listing_condition
+from mpcomp.cache import cached
+from mpcomp.db_router import read_replica
+from mpcomp.page_cache import page_cache, tag_page
+from mpcomp.search_log import log_search
 from peeldb.models import (
     JobPost,
     AppliedJobs,
-    MetaData,
     User,
     City,
     Industry,
@@ -59,8 +63,7 @@ from psite.forms import (
 )
 from .refine_search import refined_search
 from django.db.models import Prefetch
-from django.core.cache import cache
-from dashboard.tasks import save_search_results, send_email
+from dashboard.tasks import application_submitted, process_resume, send_email
 
 
 months = [
@@ -120,6 +123,75 @@ def get_prev_month(month, year, current_year):
     return next((item for item in months if item["id"] == month["id"] - 1), None)
 
 
+def facet_jobs(job_type=None, **refine):
+    """Live jobs of a listing facet, searched the same way as the listing views"""
+    search_dict = QueryDict("", mutable=True)
+    for key, values in refine.items():
+        search_dict.setlist(key, values)
+    if job_type:
+        search_dict.update({"job_type": job_type})
+    return refined_search(search_dict)[0]
+
+
+def get_skill_facet(skill):
+    final_skill = cached(
+        "lookups",
+        "final_skill" + skill,
+        lambda: get_valid_skills_list(skill),
+        60 * 60 * 24,
+    )
+    final_edu = cached(
+        "lookups",
+        "final_edu" + skill,
+        lambda: get_valid_qualifications(skill),
+        60 * 60 * 24,
+    )
+    return final_skill, final_edu
+
+
+def skill_jobs_facet(skill, **kwargs):
+    final_skill, final_edu = get_skill_facet(skill)
+    if final_skill or final_edu:
+        return facet_jobs(refine_skill=final_skill, refine_education=final_edu)
+    return facet_jobs(refine_skill=[skill])
+
+
+def location_jobs_facet(location=None, city_name=None, job_type=None, **kwargs):
+    location = location or city_name
+    state = State.objects.filter(slug__iexact=location).first()
+    if state:
+        return facet_jobs(job_type, refine_state=[state.name])
+    final_location = get_valid_locations_list(location)
+    if final_location:
+        return facet_jobs(job_type, refine_location=final_location)
+    return None
+
+
+def fresher_location_jobs_facet(city_name, **kwargs):
+    return location_jobs_facet(city_name=city_name, job_type="Fresher")
+
+
+def fresher_skill_jobs_facet(skill_name, **kwargs):
+    final_skill = get_valid_skills_list(skill_name)
+    if final_skill and not get_valid_locations_list(skill_name):
+        return facet_jobs("Fresher", refine_skill=final_skill)
+    return None
+
+
+def industry_jobs_facet(industry, **kwargs):
+    searched_industry = Industry.objects.filter(slug=industry).first()
+    if searched_industry:
+        return facet_jobs(refine_industry=[searched_industry.name])
+    return None
+
+
+def job_type_facet(job_type):
+    def facet_func(**kwargs):
+        return JobPost.objects.filter(status="Live", job_type=job_type)
+
+    return facet_func
+
+
 def subscribers_creation_with_skills(email, skill, user):
     subscribers = Subscriber.objects.filter(email=email, user=None, skill=skill)
     if subscribers:
@@ -221,6 +293,7 @@ def jobs_applied(request):
         return HttpResponseRedirect("/")
 
 
+@job_detail_condition
 def job_detail(request, job_title_slug, job_id):
     if not job_id or bool(re.search(r"[A-Za-z]", job_id)):
         reason = "The URL may be misspelled or the page you're looking for is no longer available."
@@ -284,13 +357,9 @@ def job_detail(request, job_title_slug, job_id):
                 status=404,
             )
         show_pop = True if field == "fb" or field == "tw" or field == "ln" else False
-        meta_title = meta_description = ""
-        meta = MetaData.objects.filter(name="job_detail_page")
-        if meta:
-            meta_title = Template(meta[0].meta_title).render(Context({"job": job}))
-            meta_description = Template(meta[0].meta_description).render(
-                Context({"job": job})
-            )
+        meta_title, meta_description, h1_tag = render_meta(
+            "job_detail_page", {"job": job}
+        )
         template = "jobs/detail.html"
         data = {
             "job": job,
@@ -355,18 +424,9 @@ def recruiter_profile(request, recruiter_name, **kwargs):
             page, no_pages
         )
         job_list = job_list[(page - 1) * items_per_page : page * items_per_page]
-        meta_title = meta_description = h1_tag = ""
-        meta = MetaData.objects.filter(name="recruiter_profile")
-        if meta:
-            meta_title = Template(meta[0].meta_title).render(
-                Context({"current_page": page, "user": user[0]})
-            )
-            meta_description = Template(meta[0].meta_description).render(
-                Context({"current_page": page, "user": user[0]})
-            )
-            h1_tag = Template(meta[0].h1_tag).render(
-                Context({"current_page": page, "user": user[0]})
-            )
+        meta_title, meta_description, h1_tag = render_meta(
+            "recruiter_profile", {"current_page": page, "user": user[0]}
+        )
         template = "jobs/recruiter_profile.html"
         return render(
             request,
@@ -522,6 +582,9 @@ def index(request, **kwargs):
     return render(request, template, data)
 
 
+@read_replica()
+@listing_condition(location_jobs_facet)
+@page_cache
 def job_locations(request, location, **kwargs):
     current_url = reverse("job_locations", kwargs={"location": location})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -569,7 +632,7 @@ def job_locations(request, location, **kwargs):
     else:
         job_list = []
     if request.POST.get("location"):
-        save_search_results.delay(
+        log_search(
             request.META["REMOTE_ADDR"],
             request.POST,
             job_list.count() if job_list else 0,
@@ -586,6 +649,7 @@ def job_locations(request, location, **kwargs):
         if not page:
             return HttpResponseRedirect(current_url)
         jobs_list = job_list[(page - 1) * items_per_page : page * items_per_page]
+        tag_page(request, jobs_list, city=searched_locations, state=state)
         prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
             page, no_pages
         )
@@ -664,6 +728,9 @@ def list_deserializer(key, value, flags):
     return value
 
 
+@read_replica()
+@listing_condition(skill_jobs_facet)
+@page_cache
 def job_skills(request, skill, **kwargs):
     current_url = reverse("job_skills", kwargs={"skill": skill})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -673,24 +740,7 @@ def job_skills(request, skill, **kwargs):
         url = current_url + request.GET.get("page") + "/"
         return redirect(url, permanent=True)
 
-    final_skill = cache.get("final_skill" + skill)
-    if not final_skill:
-        final_skill = get_valid_skills_list(skill)
-        cache.set("final_skill" + skill, final_skill, timeout=60 * 60 * 24)
-    # The original code handled b"[]" specifically because of memcached raw return, 
-    # but Django cache handles python objects. 
-    # We ensure it is a list if it happens to be None or empty differently if needed, 
-    # but strictly following logic:
-    if final_skill == []: 
-        final_skill = []
-
-    final_edu = cache.get("final_edu" + skill)
-    if not final_edu:
-        final_edu = get_valid_qualifications(skill)
-        cache.set("final_edu" + skill, final_edu, timeout=60 * 60 * 24)
-
-    if final_edu == []:
-        final_edu = []
+    final_skill, final_edu = get_skill_facet(skill)
     if request.POST.get("refine_search") == "True":
         (
             job_list,
@@ -726,7 +776,7 @@ def job_skills(request, skill, **kwargs):
     )
 
     if request.POST.get("q"):
-        save_search_results.delay(
+        log_search(
             request.META["REMOTE_ADDR"], request.POST, job_list.count(), request.user.id
         )
 
@@ -741,6 +791,7 @@ def job_skills(request, skill, **kwargs):
             return HttpResponseRedirect(current_url)
 
         jobs_list = job_list[(page - 1) * 20 : page * 20]
+        tag_page(request, jobs_list, skill=searched_skills, education=searched_edu)
         prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
             page, no_pages
         )
@@ -750,30 +801,14 @@ def job_skills(request, skill, **kwargs):
         meta_title = meta_description = h1_tag = ""
         final_edu = ", ".join(final_edu)
         if searched_edu and not searched_skills:
-            meta = MetaData.objects.filter(name="education_jobs")
-            if meta:
-                meta_title = Template(meta[0].meta_title).render(
-                    Context({"current_page": page, "degree": final_edu})
-                )
-                meta_description = Template(meta[0].meta_description).render(
-                    Context({"current_page": page, "degree": final_edu})
-                )
-                h1_tag = Template(meta[0].h1_tag).render(
-                    Context({"current_page": page, "degree": final_edu})
-                )
+            meta_title, meta_description, h1_tag = render_meta(
+                "education_jobs", {"current_page": page, "degree": final_edu}
+            )
         elif searched_edu and searched_skills:
-            meta = MetaData.objects.filter(name="skill_education_jobs")
-            if meta:
-                search = ", ".join(searched_text)
-                meta_title = Template(meta[0].meta_title).render(
-                    Context({"current_page": page, "search": search})
-                )
-                meta_description = Template(meta[0].meta_description).render(
-                    Context({"current_page": page, "search": search})
-                )
-                h1_tag = Template(meta[0].h1_tag).render(
-                    Context({"current_page": page, "search": search})
-                )
+            meta_title, meta_description, h1_tag = render_meta(
+                "skill_education_jobs",
+                {"current_page": page, "search": ", ".join(searched_text)},
+            )
         elif searched_skills:
             meta_title, meta_description, h1_tag = get_meta_data(
                 "skill_jobs",
@@ -837,6 +872,9 @@ def job_skills(request, skill, **kwargs):
         )
 
 
+@read_replica()
+@listing_condition(industry_jobs_facet)
+@page_cache
 def job_industries(request, industry, **kwargs):
     current_url = reverse("job_industries", kwargs={"industry": industry})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -876,24 +914,17 @@ def job_industries(request, industry, **kwargs):
             return HttpResponseRedirect(current_url)
 
         jobs_list = job_list[(page - 1) * items_per_page : page * items_per_page]
+        tag_page(request, jobs_list, industry=searched_industry)
         prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
             page, no_pages
         )
 
         field = get_social_referer(request)
         show_pop = True if field == "fb" or field == "tw" or field == "ln" else False
-        meta_title = meta_description = h1_tag = ""
-        meta = MetaData.objects.filter(name="industry_jobs")
-        if meta:
-            meta_title = Template(meta[0].meta_title).render(
-                Context({"current_page": page, "industry": searched_industry[0].name})
-            )
-            meta_description = Template(meta[0].meta_description).render(
-                Context({"current_page": page, "industry": searched_industry[0].name})
-            )
-            h1_tag = Template(meta[0].h1_tag).render(
-                Context({"current_page": page, "industry": searched_industry[0].name})
-            )
+        meta_title, meta_description, h1_tag = render_meta(
+            "industry_jobs",
+            {"current_page": page, "industry": searched_industry[0].name},
+        )
         data = {
             "job_list": jobs_list,
             "aft_page": aft_page,
@@ -956,86 +987,31 @@ def job_apply(request, job_id):
     ) and request.user.user_type == "JS":
         job_post = JobPost.objects.filter(id=job_id, status="Live").first()
         if job_post:
-            if not AppliedJobs.objects.filter(user=request.user, job_post=job_post):
+            if not AppliedJobs.objects.filter(
+                user=request.user, job_post=job_post
+            ).exists():
                 if (
                     request.user.resume
                     or request.user.profile_completion_percentage >= 50
                 ):
                     # need to check user uploaded a resume or not
-                    AppliedJobs.objects.create(
+                    application = AppliedJobs.objects.create(
                         user=request.user,
                         job_post=job_post,
                         status="Pending",
                         ip_address=request.META["REMOTE_ADDR"],
                         user_agent=request.META["HTTP_USER_AGENT"],
                     )
+                    # the recruiter email is sent by a worker
+                    transaction.on_commit(
+                        lambda: application_submitted.delay(application.id)
+                    )
                     message = (
                         "Your Application successfully sent for "
                         + str(job_post.title)
                         + " at "
                         + job_post.company_name
                     )
-                    t = loader.get_template("email/applicant_apply_job.html")
-                    c = {
-                        "user": request.user,
-                        "recruiter": job_post.user,
-                        "job_post": job_post,
-                    }
-                    rendered = t.render(c)
-                    
-                    # Prepare email content
-                    subject = "Resume Alert - " + job_post.title
-                    from_email = settings.DEFAULT_FROM_EMAIL
-                    to_email = job_post.user.email
-                    
-                    # Handle resume attachment if exists
-                    if request.user.resume:
-                        try:
-                            import urllib.request
-                            resume_filename = str(request.user.email) + ".docx"
-                            urllib.request.urlretrieve(
-                                "https://inaworks.s3.amazonaws.com/"
-                                + str(
-                                    request.user.resume.encode("ascii", "ignore").decode(
-                                        "ascii"
-                                    )
-                                ),
-                                resume_filename,
-                            )
-                            if os.path.exists(resume_filename):
-                                with open(resume_filename, "rb") as f:
-                                    f.read()
-                                os.remove(resume_filename)
-                        except Exception:
-                            # Log error but continue without attachment
-                            pass
-                    
-                    # Use SES to send email
-                    try:
-                        ses_client = boto3.client(
-                            'ses',
-                            region_name=getattr(settings, 'AWS_SES_REGION_NAME', 'eu-west-1'),
-                            aws_access_key_id=getattr(settings, 'AWS_ACCESS_KEY_ID', settings.AM_ACCESS_KEY),
-                            aws_secret_access_key=getattr(settings, 'AWS_SECRET_ACCESS_KEY', settings.AM_PASS_KEY),
-                        )
-                        
-                        # Create email message
-                        email_data = {
-                            'Source': from_email,
-                            'Destination': {'ToAddresses': [to_email]},
-                            'Message': {
-                                'Subject': {'Data': subject},
-                                'Body': {'Html': {'Data': rendered}}
-                            }
-                        }
-                        
-                        # Send email (attachment handling would need additional implementation)
-                        ses_client.send_email(**email_data)
-                        
-                    except Exception:
-                        # Log error but don't fail the application process
-                        pass
-                    
                     data = {
                         "error": False,
                         "response": message,
@@ -1140,18 +1116,15 @@ def jobposts_by_date(request, year, month, date, **kwargs):
     prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
         page, no_pages
     )
-    meta_title = meta_description = h1_tag = ""
-    meta = MetaData.objects.filter(name="day_calendar")
-    if meta:
-        meta_title = Template(meta[0].meta_title).render(
-            Context({"date": date, "searched_month": day.strftime("%B"), "year": year})
-        )
-        meta_description = Template(meta[0].meta_description).render(
-            Context({"date": date, "searched_month": day.strftime("%B"), "year": year})
-        )
-        h1_tag = Template(meta[0].h1_tag).render(
-            Context({"date": date, "month": day.strftime("%B"), "year": year})
-        )
+    meta_title, meta_description, h1_tag = render_meta(
+        "day_calendar",
+        {
+            "date": date,
+            "searched_month": day.strftime("%B"),
+            "month": day.strftime("%B"),
+            "year": year,
+        },
+    )
     return render(
         request,
         "calendar/calendar_day_results.html",
@@ -1198,16 +1171,9 @@ def jobs_by_location(request, job_type):
     )
     if request.method == "POST":
         states = states.filter(name__icontains=request.POST.get("location"))
-    meta_title = meta_description = h1_tag = ""
-    meta = MetaData.objects.filter(name="jobs_by_location")
-    if meta:
-        meta_title = Template(meta[0].meta_title).render(
-            Context({"job_type": job_type})
-        )
-        meta_description = Template(meta[0].meta_description).render(
-            Context({"job_type": job_type})
-        )
-        h1_tag = Template(meta[0].h1_tag).render(Context({"job_type": job_type}))
+    meta_title, meta_description, h1_tag = render_meta(
+        "jobs_by_location", {"job_type": job_type}
+    )
     data = {
         "states": states,
         "job_type": job_type,
@@ -1258,16 +1224,9 @@ def fresher_jobs_by_skills(request, job_type):
             all_skills = all_skills.order_by("-name")
         else:
             all_skills = all_skills.order_by("name")
-    meta_title = meta_description = h1_tag = ""
-    meta = MetaData.objects.filter(name="fresher_jobs_by_skills")
-    if meta:
-        meta_title = Template(meta[0].meta_title).render(
-            Context({"job_type": job_type})
-        )
-        meta_description = Template(meta[0].meta_description).render(
-            Context({"job_type": job_type})
-        )
-        h1_tag = Template(meta[0].h1_tag).render(Context({"job_type": job_type}))
+    meta_title, meta_description, h1_tag = render_meta(
+        "fresher_jobs_by_skills", {"job_type": job_type}
+    )
     data = {
         "all_skills": all_skills,
         "job_type": job_type,
@@ -1330,6 +1289,9 @@ def jobs_by_degree(request):
     return render(request, template, data)
 
 
+@read_replica()
+@listing_condition(job_type_facet("full-time"))
+@page_cache
 def full_time_jobs(request, **kwargs):
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
         return redirect(reverse("full_time_jobs"), permanent=True)
@@ -1366,6 +1328,7 @@ def full_time_jobs(request, **kwargs):
         return HttpResponseRedirect(reverse("full_time_jobs"))
 
     jobs_list = jobs_list[(page - 1) * items_per_page : page * items_per_page]
+    tag_page(request, jobs_list, job_type="full-time")
     prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
         page, no_pages
     )
@@ -1398,6 +1361,9 @@ def full_time_jobs(request, **kwargs):
     return render(request, template, data)
 
 
+@read_replica()
+@listing_condition(job_type_facet("internship"))
+@page_cache
 def internship_jobs(request, **kwargs):
     request.session["formdata"] = ""
     jobs_list = (
@@ -1412,6 +1378,7 @@ def internship_jobs(request, **kwargs):
         return HttpResponseRedirect(reverse("internship_jobs"))
 
     jobs_list = jobs_list[(page - 1) * 20 : page * 20]
+    tag_page(request, jobs_list, job_type="internship")
     prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
         page, no_pages
     )
@@ -1431,6 +1398,8 @@ def internship_jobs(request, **kwargs):
     )
 
 
+@page_cache
+@read_replica()
 def city_internship_jobs(request, location, **kwargs):
     current_url = reverse("city_internship_jobs", kwargs={"location": location})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -1470,6 +1439,7 @@ def city_internship_jobs(request, location, **kwargs):
         return HttpResponseRedirect(current_url)
 
     jobs_list = jobs_list[(page - 1) * items_per_page : page * items_per_page]
+    tag_page(request, jobs_list, job_type="internship", city=location)
     prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
         page, no_pages
     )
@@ -1510,6 +1480,9 @@ def city_internship_jobs(request, location, **kwargs):
     return render(request, template, data)
 
 
+@read_replica()
+@listing_condition(job_type_facet("walk-in"))
+@page_cache
 def walkin_jobs(request, **kwargs):
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
         return redirect(reverse("walkin_jobs"), permanent=True)
@@ -1541,6 +1514,7 @@ def walkin_jobs(request, **kwargs):
         return HttpResponseRedirect(reverse("walkin_jobs"))
 
     jobs_list = jobs_list[(page - 1) * items_per_page : page * items_per_page]
+    tag_page(request, jobs_list, job_type="walk-in")
     prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
         page, no_pages
     )
@@ -1575,6 +1549,9 @@ def walkin_jobs(request, **kwargs):
     return render(request, template, data)
 
 
+@read_replica()
+@listing_condition(job_type_facet("government"))
+@page_cache
 def government_jobs(request, **kwargs):
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
         return redirect(reverse("government_jobs"), permanent=True)
@@ -1595,6 +1572,7 @@ def government_jobs(request, **kwargs):
     if not page:
         return HttpResponseRedirect(reverse("government_jobs"))
     jobs_list = jobs_list[(page - 1) * items_per_page : page * items_per_page]
+    tag_page(request, jobs_list, job_type="government")
     prev_page, previous_page, aft_page, after_page = get_prev_after_pages_count(
         page, no_pages
     )
@@ -1621,6 +1599,8 @@ def government_jobs(request, **kwargs):
     return render(request, template, data)
 
 
+@page_cache
+@read_replica()
 def each_company_jobs(request, company_name, **kwargs):
     current_url = reverse("company_jobs", kwargs={"company_name": company_name})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -1668,20 +1648,12 @@ def each_company_jobs(request, company_name, **kwargs):
         industries = Industry.objects.filter(status="Active")[:6]
 
         jobs_list = job_list[(page - 1) * items_per_page : page * items_per_page]
+        tag_page(request, jobs_list, company=company)
         field = get_social_referer(request)
         show_pop = True if field == "fb" or field == "tw" or field == "ln" else False
-        meta_title = meta_description = h1_tag = ""
-        meta = MetaData.objects.filter(name="company_jobs")
-        if meta:
-            meta_title = Template(meta[0].meta_title).render(
-                Context({"current_page": page, "company": company})
-            )
-            meta_description = Template(meta[0].meta_description).render(
-                Context({"current_page": page, "company": company})
-            )
-            h1_tag = Template(meta[0].h1_tag).render(
-                Context({"current_page": page, "company": company})
-            )
+        meta_title, meta_description, h1_tag = render_meta(
+            "company_jobs", {"current_page": page, "company": company}
+        )
         data = {
             "job_list": jobs_list,
             "aft_page": aft_page,
@@ -1749,14 +1721,20 @@ def companies(request, **kwargs):
 
 
 def get_skills(request):
-    skills = cache.get("subscribing_skills")
-    if not skills:
-        skills = Skill.objects.filter(status="Active").order_by("name")
-        skills = serializers.serialize("json", skills)
-        cache.set("subscribing_skills", skills, 60 * 60 * 24)
+    skills = cached(
+        "lookups",
+        "subscribing_skills",
+        lambda: serializers.serialize(
+            "json", Skill.objects.filter(status="Active").order_by("name")
+        ),
+        60 * 60 * 24,
+    )
     return HttpResponse(json.dumps({"response": skills}))
 
 
+@read_replica()
+@listing_condition(fresher_skill_jobs_facet)
+@page_cache
 def skill_fresher_jobs(request, skill_name, **kwargs):
     current_url = reverse("skill_fresher_jobs", kwargs={"skill_name": skill_name})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -1794,7 +1772,7 @@ def skill_fresher_jobs(request, skill_name, **kwargs):
         jobs_list = searched_skills = []
     if request.POST.get("q"):
         ip_address = request.META["REMOTE_ADDR"]
-        save_search_results.delay(
+        log_search(
             ip_address,
             request.POST,
             jobs_list.count() if jobs_list else 0,
@@ -1811,6 +1789,7 @@ def skill_fresher_jobs(request, skill_name, **kwargs):
             page, no_pages
         )
         jobs_list = jobs_list[(page - 1) * items_per_page : page * items_per_page]
+        tag_page(request, jobs_list, job_type="Fresher", skill=searched_skills)
         field = get_social_referer(request)
         show_pop = True if field == "fb" or field == "tw" or field == "ln" else False
         meta_title, meta_description, h1_tag = get_meta_data(
@@ -1880,6 +1859,9 @@ def skill_fresher_jobs(request, skill_name, **kwargs):
         )
 
 
+@read_replica()
+@listing_condition(fresher_location_jobs_facet)
+@page_cache
 def location_fresher_jobs(request, city_name, **kwargs):
     current_url = reverse("location_fresher_jobs", kwargs={"city_name": city_name})
     if kwargs.get("page_num") == "1" or request.GET.get("page") == "1":
@@ -1925,7 +1907,7 @@ def location_fresher_jobs(request, city_name, **kwargs):
         jobs_list = searched_locations = []
     if request.POST.get("location") or request.POST.get("q"):
         ip_address = request.META["REMOTE_ADDR"]
-        save_search_results.delay(
+        log_search(
             ip_address,
             request.POST,
             jobs_list.count() if jobs_list else 0,
@@ -1942,6 +1924,9 @@ def location_fresher_jobs(request, city_name, **kwargs):
             page, no_pages
         )
         jobs_list = jobs_list[(page - 1) * items_per_page : page * items_per_page]
+        tag_page(
+            request, jobs_list, job_type="Fresher", city=searched_locations, state=state
+        )
         field = get_social_referer(request)
         show_pop = True if field == "fb" or field == "tw" or field == "ln" else False
         meta_title, meta_description, h1_tag = get_meta_data(
@@ -2013,6 +1998,8 @@ def location_fresher_jobs(request, city_name, **kwargs):
         )
 
 
+@page_cache
+@read_replica()
 def skill_location_walkin_jobs(request, skill_name, **kwargs):
     if "-in-" in request.path:
         current_url = reverse("location_walkin_jobs", kwargs={"skill_name": skill_name})
@@ -2068,7 +2055,7 @@ def skill_location_walkin_jobs(request, skill_name, **kwargs):
         jobs_list = []
     if request.POST.get("location") or request.POST.get("q"):
         ip_address = request.META["REMOTE_ADDR"]
-        save_search_results.delay(
+        log_search(
             ip_address,
             request.POST,
             jobs_list.count() if jobs_list else 0,
@@ -2085,6 +2072,14 @@ def skill_location_walkin_jobs(request, skill_name, **kwargs):
             page, no_pages
         )
         jobs_list = jobs_list[(page - 1) * items_per_page : page * items_per_page]
+        tag_page(
+            request,
+            jobs_list,
+            job_type="walk-in",
+            skill=searched_skills,
+            city=searched_locations,
+            state=state,
+        )
         field = get_social_referer(request)
         show_pop = True if field == "fb" or field == "tw" or field == "ln" else False
         if final_locations:
@@ -2186,6 +2181,8 @@ def skill_location_walkin_jobs(request, skill_name, **kwargs):
         )
 
 
+@page_cache
+@read_replica()
 def skill_location_wise_fresher_jobs(request, skill_name, city_name, **kwargs):
     current_url = reverse(
         "skill_location_wise_fresher_jobs",
@@ -2222,7 +2219,7 @@ def skill_location_wise_fresher_jobs(request, skill_name, city_name, **kwargs):
         jobs_list = []
     if request.POST.get("location") or request.POST.get("q"):
         ip_address = request.META["REMOTE_ADDR"]
-        save_search_results.delay(
+        log_search(
             ip_address,
             request.POST,
             jobs_list.count() if jobs_list else 0,
@@ -2239,6 +2236,13 @@ def skill_location_wise_fresher_jobs(request, skill_name, city_name, **kwargs):
             page, no_pages
         )
         jobs_list = jobs_list[(page - 1) * items_per_page : page * items_per_page]
+        tag_page(
+            request,
+            jobs_list,
+            job_type="Fresher",
+            skill=searched_skills,
+            city=searched_locations,
+        )
         field = get_social_referer(request)
         show_pop = True if field == "fb" or field == "tw" or field == "ln" else False
         meta_title, meta_description, h1_tag = get_meta_data(
@@ -2365,9 +2369,8 @@ def save_codes_and_send_mail(user, request, passwd):
 def register_using_email(request):
     if request.method == "POST":
         if request.FILES.get("get_resume"):
-            handle_uploaded_file(
-                request.FILES["get_resume"], request.FILES["get_resume"].name
-            )
+            # prefills the registration form, so the parsed email and mobile
+            # are needed in this response and nothing is stored to process later
             email, mobile, text = get_resume_data(request.FILES["get_resume"])
             data = {
                 "error": False,
@@ -2429,7 +2432,9 @@ def register_using_email(request):
                     )
                     user.resume = path
                     user.profile_updated = timezone.now()
+                    user.resume_status = "pending"
                     user.save()
+                    process_resume.delay(user.id, path)
                 registered_user = authenticate(username=user.username)
                 if registered_user:
                     login(request, registered_user)
@@ -2591,8 +2596,11 @@ def user_reg_success(request):
                     ACL='public-read'
                 )
                 user.resume = path
+                user.resume_status = "pending"
             user.profile_updated = timezone.now()
             user.save()
+            if "resume" in request.FILES:
+                process_resume.delay(user.id, path)
             data = {"error": False, "response": "Profile Updated Successfully"}
             return HttpResponse(json.dumps(data))
         data = {"error": True, "response": validate_user.errors}
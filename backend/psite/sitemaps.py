@@ -2,12 +2,23 @@
 InaWorks Django Sitemap Configuration
 Modern, dynamic sitemap generation using Django's sitemap framework.
 Only includes URLs for pages with actual content (jobs, skills, locations, etc.)
+
+The job, skill, location and company sections are not computed per crawler
+request: build_sitemap_snapshot materializes every url with its lastmod into
+SitemapEntry, numbered in serving order, and the sections page through it by
+position range. dashboard.tasks.update_sitemap_snapshot rebuilds it when the
+job catalogue changed, or use the build_sitemap_snapshot command.
 """
 
 from django.contrib.sitemaps import Sitemap
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.functions import Coalesce
 from django.urls import reverse
-from django.db.models import Count, Q
-from peeldb.models import JobPost, Skill, City, Company
+from peeldb.models import JobPost, SitemapEntry
+
+SNAPSHOT_BATCH_SIZE = 5000
 
 
 class InaWorksSitemap(Sitemap):
@@ -18,155 +29,193 @@ class InaWorksSitemap(Sitemap):
     protocol = 'https'  # Use HTTPS for all URLs (inaworks.id)
 
 
-class JobPostSitemap(InaWorksSitemap):
+def job_entries():
+    jobs = (
+        JobPost.objects.filter(status='Live')
+        .annotate(lastmod=Coalesce('published_on', 'created_on'))
+        .order_by('-created_on', '-id')
+        .values_list('slug', 'lastmod')
+    )
+    for slug, lastmod in jobs.iterator(chunk_size=SNAPSHOT_BATCH_SIZE):
+        # Job detail URL pattern: /jobs/{job-title-slug}-{job-id}/
+        yield f"/jobs/{slug.lstrip('/')}", lastmod
+
+
+def skill_location_entries(pattern, **filters):
+    """Every skill and city pair of live jobs, each with its latest job"""
+    combinations = (
+        JobPost.objects.filter(
+            status='Live',
+            skills__status='Active',
+            location__status='Enabled',
+            **filters
+        )
+        .values_list('skills__slug', 'location__slug')
+        .annotate(lastmod=Max('published_on'))
+        .order_by('skills__slug', 'location__slug')
+    )
+    for skill_slug, city_slug, lastmod in combinations.iterator(
+        chunk_size=SNAPSHOT_BATCH_SIZE
+    ):
+        if skill_slug and city_slug:
+            yield pattern.format(skill=skill_slug, city=city_slug), lastmod
+
+
+def facet_entries(pattern, field, **filters):
+    """Every facet value of live jobs, the ones with most jobs first"""
+    facets = (
+        JobPost.objects.filter(status='Live', **filters)
+        .values_list(field)
+        .annotate(job_count=Count('id', distinct=True), lastmod=Max('published_on'))
+        .order_by('-job_count', field)
+    )
+    for slug, job_count, lastmod in facets.iterator(chunk_size=SNAPSHOT_BATCH_SIZE):
+        if slug:
+            yield pattern.format(slug=slug), lastmod
+
+
+SNAPSHOT_SECTIONS = {
+    'jobs': job_entries,
+    'skill-locations': lambda: skill_location_entries('/{skill}-jobs-in-{city}/'),
+    'fresher-skill-locations': lambda: skill_location_entries(
+        '/{skill}-fresher-jobs-in-{city}/', min_year=0
+    ),
+    'skills': lambda: facet_entries(
+        '/{slug}-jobs/', 'skills__slug', skills__status='Active'
+    ),
+    'locations': lambda: facet_entries(
+        '/jobs-in-{slug}/', 'location__slug', location__status='Enabled'
+    ),
+    'companies': lambda: facet_entries(
+        '/{slug}-job-openings/', 'company__slug', company__is_active=True
+    ),
+}
+
+
+def build_sitemap_snapshot(sections=None):
+    """
+    Rebuild the SitemapEntry rows of the given sections, all by default.
+    Each section is swapped in one transaction, readers see the old or the
+    new snapshot. Returns the number of urls per section.
+    """
+    totals = {}
+    for section in sections or SNAPSHOT_SECTIONS:
+        entries = SNAPSHOT_SECTIONS[section]()
+        with transaction.atomic():
+            SitemapEntry.objects.filter(section=section).delete()
+            batch = []
+            total = 0
+            for location, lastmod in entries:
+                batch.append(
+                    SitemapEntry(
+                        section=section,
+                        position=total,
+                        location=location,
+                        lastmod=lastmod,
+                    )
+                )
+                total += 1
+                if len(batch) == SNAPSHOT_BATCH_SIZE:
+                    SitemapEntry.objects.bulk_create(batch)
+                    batch = []
+            SitemapEntry.objects.bulk_create(batch)
+        totals[section] = total
+    return totals
+
+
+class SnapshotPaginator(Paginator):
+    """Pages a snapshot section by position range instead of OFFSET"""
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = self.object_list.filter(
+            position__gte=bottom, position__lt=bottom + self.per_page
+        )
+        return self._get_page(object_list, number, self)
+
+
+class SnapshotSitemap(InaWorksSitemap):
+    """Section served from the precomputed SitemapEntry rows"""
+    section = None
+    limit = 50000  # Max URLs per sitemap file
+
+    def items(self):
+        return SitemapEntry.objects.filter(section=self.section).order_by('position')
+
+    @property
+    def paginator(self):
+        return SnapshotPaginator(self._items(), self.limit)
+
+    def location(self, item):
+        return item.location
+
+    def lastmod(self, item):
+        return item.lastmod
+
+    def get_latest_lastmod(self):
+        return self.items().aggregate(latest=Max('lastmod'))['latest']
+
+
+class JobPostSitemap(SnapshotSitemap):
     """
     Sitemap for individual job postings - highest priority
     Only includes live jobs
     """
+    section = 'jobs'
     changefreq = "daily"
     priority = 0.9
-    limit = 50000  # Max URLs per sitemap file
-
-    def items(self):
-        return JobPost.objects.filter(
-            status='Live'
-        ).select_related('company').prefetch_related('location').order_by('-created_on')
-
-    def lastmod(self, obj):
-        """Return last modification date"""
-        return obj.published_on or obj.created_on
-
-    def location(self, obj):
-        """Job detail URL pattern: /jobs/{job-title-slug}-{job-id}/"""
-        # The slug field already contains the full path, but we need /jobs/ prefix
-        # Remove leading slash from slug and add /jobs/ prefix
-        slug_without_slash = obj.slug.lstrip('/')
-        return f"/jobs/{slug_without_slash}"
 
 
-class SkillLocationSitemap(InaWorksSitemap):
+class SkillLocationSitemap(SnapshotSitemap):
     """
     Sitemap for skill + location combinations (e.g., python-jobs-in-bangalore)
-    OPTIMIZED: Only includes combinations that have active jobs
+    Only includes combinations that have active jobs
     """
+    section = 'skill-locations'
     changefreq = "daily"
     priority = 0.8
-    limit = 10000
 
-    def items(self):
-        """
-        Use Django ORM to get skill+location combinations with active jobs
-        This avoids the cartesian product of all skills × all locations
-        """
-        # Get all skill-location pairs from live jobs
-        combinations = JobPost.objects.filter(
-            status='Live',
-            skills__status='Active',
-            location__status='Enabled'
-        ).values_list(
-            'skills__slug', 'location__slug'
-        ).distinct().order_by('skills__slug', 'location__slug')[:10000]
 
-        # Convert to list of dicts for easier template access
-        return [
-            {'skill': skill_slug, 'city': city_slug}
-            for skill_slug, city_slug in combinations
-            if skill_slug and city_slug  # Filter out None values
-        ]
-
-    def location(self, item):
-        return f"/{item['skill']}-jobs-in-{item['city']}/"
-
-
-class FresherSkillLocationSitemap(InaWorksSitemap):
+class FresherSkillLocationSitemap(SnapshotSitemap):
     """
     Sitemap for fresher jobs by skill and location
     Only includes combinations with actual fresher jobs
     """
+    section = 'fresher-skill-locations'
     changefreq = "daily"
     priority = 0.7
-    limit = 10000
 
-    def items(self):
-        """Use Django ORM to get fresher job skill-location combinations"""
-        combinations = JobPost.objects.filter(
-            status='Live',
-            min_year=0,  # Fresher jobs
-            skills__status='Active',
-            location__status='Enabled'
-        ).values_list(
-            'skills__slug', 'location__slug'
-        ).distinct().order_by('skills__slug', 'location__slug')[:5000]
-
-        return [
-            {'skill': skill_slug, 'city': city_slug}
-            for skill_slug, city_slug in combinations
-            if skill_slug and city_slug
-        ]
 
-    def location(self, item):
-        return f"/{item['skill']}-fresher-jobs-in-{item['city']}/"
-
-
-class SkillSitemap(InaWorksSitemap):
+class SkillSitemap(SnapshotSitemap):
     """
     Sitemap for skill-based job listings (e.g., /python-jobs/)
     Only includes skills that have live jobs
     """
+    section = 'skills'
     changefreq = "weekly"
     priority = 0.6
 
-    def items(self):
-        return Skill.objects.filter(
-            status='Active',
-            jobpost__status='Live'
-        ).annotate(
-            job_count=Count('jobpost', filter=Q(jobpost__status='Live'))
-        ).filter(job_count__gt=0).distinct().order_by('-job_count')
-
-    def location(self, obj):
-        return f"/{obj.slug}-jobs/"
-
 
-class LocationSitemap(InaWorksSitemap):
+class LocationSitemap(SnapshotSitemap):
     """
     Sitemap for location-based job listings (e.g., /jobs-in-bangalore/)
     Only includes locations with live jobs
     """
+    section = 'locations'
     changefreq = "weekly"
     priority = 0.6
 
-    def items(self):
-        return City.objects.filter(
-            status='Enabled',
-            locations__status='Live'
-        ).annotate(
-            job_count=Count('locations', filter=Q(locations__status='Live'))
-        ).filter(job_count__gt=0).distinct().order_by('-job_count')
-
-    def location(self, obj):
-        return f"/jobs-in-{obj.slug}/"
-
 
-class CompanySitemap(InaWorksSitemap):
+class CompanySitemap(SnapshotSitemap):
     """
     Sitemap for company job listings
     Only includes companies with active jobs
     """
+    section = 'companies'
     changefreq = "weekly"
     priority = 0.5
 
-    def items(self):
-        return Company.objects.filter(
-            is_active=True,
-            jobpost__status='Live'
-        ).annotate(
-            job_count=Count('jobpost', filter=Q(jobpost__status='Live'))
-        ).filter(job_count__gt=0).distinct().order_by('-job_count')
-
-    def location(self, obj):
-        return f"/{obj.slug}-job-openings/"
-
 
 class StaticPagesSitemap(InaWorksSitemap):
     """
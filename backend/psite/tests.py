@@ -5,8 +5,15 @@ when you run "manage.py test".
 Replace this with more appropriate tests for your application.
 """
 
+import gzip
+from datetime import datetime
+from unittest import mock
+
 from django.test import TestCase
 
+from peeldb.models import City, Country, JobPost, Skill, SitemapEntry, State, User
+from psite import sitemaps
+
 # from django.test import Client
 from .forms import SimpleContactForm, SubscribeForm
 
@@ -45,3 +52,72 @@ class SubscribeForm_test(TestCase):
     def test_subscribe_form_invalid(self):
         form = SubscribeForm(data={"email": ""})
         self.assertFalse(form.is_valid())
+
+
+class sitemap_snapshot_test(TestCase):
+    def setUp(self):
+        user = User.objects.create(email="test@mp.com", username="test")
+        state = State.objects.create(
+            name="Telangana", country=Country.objects.create(name="India")
+        )
+        cities = [
+            City.objects.create(name="Hyderabad", slug="hyderabad", state=state),
+            City.objects.create(name="Pune", slug="pune", state=state),
+        ]
+        skills = [
+            Skill.objects.create(name="Python", slug="python", status="Active"),
+            Skill.objects.create(name="Django", slug="django", status="Active"),
+        ]
+        for index in range(3):
+            job = JobPost.objects.create(
+                user=user,
+                title="developer",
+                slug="/developer-%s/" % index,
+                vacancies="1",
+                description="job post description",
+                job_type="full-time",
+                status="Live",
+                min_year=index,
+                max_year=index + 2,
+                published_on=datetime(2026, 1, index + 1),
+            )
+            job.skills.add(*skills)
+            job.location.add(*cities)
+
+    def test_snapshot_has_every_combination(self):
+        totals = sitemaps.build_sitemap_snapshot()
+        self.assertEqual(totals["jobs"], 3)
+        self.assertEqual(totals["skill-locations"], 4)
+        self.assertEqual(totals["fresher-skill-locations"], 4)
+        self.assertEqual(totals["skills"], 2)
+        self.assertEqual(totals["locations"], 2)
+
+        entry = SitemapEntry.objects.get(
+            section="skill-locations", location="/django-jobs-in-hyderabad/"
+        )
+        self.assertEqual(entry.position, 0)
+        self.assertEqual(entry.lastmod, datetime(2026, 1, 3))
+        self.assertEqual(
+            SitemapEntry.objects.get(section="jobs", position=0).location,
+            "/jobs/developer-2/",
+        )
+
+        # rebuilding replaces the section
+        JobPost.objects.filter(min_year=2).update(status="Expired")
+        self.assertEqual(sitemaps.build_sitemap_snapshot(["jobs"]), {"jobs": 2})
+        self.assertEqual(SitemapEntry.objects.filter(section="jobs").count(), 2)
+
+    def test_sections_are_paged_from_the_snapshot(self):
+        sitemaps.build_sitemap_snapshot()
+        with mock.patch.object(sitemaps.SkillLocationSitemap, "limit", 2):
+            response = self.client.get("/sitemap.xml")
+            self.assertContains(response, "sitemap-skill-locations.xml?p=2")
+
+            with self.assertNumQueries(2):
+                response = self.client.get(
+                    "/sitemap-skill-locations.xml?p=2", HTTP_ACCEPT_ENCODING="gzip"
+                )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(response.content).decode()
+        self.assertIn("/python-jobs-in-pune/", content)
+        self.assertNotIn("/django-jobs-in-pune/", content)
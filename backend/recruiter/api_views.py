@@ -587,6 +587,9 @@ def new_job(request, job_type):
         save_job_post(validate_post, request)
         validate_form.save_m2m()
         adding_other_fields_data(request.POST, validate_post, request.user)
+        validate_post.log_change(
+            "Live" if validate_post.status == "Live" else "Created"
+        )
         c = {"job_post": validate_post, "user": request.user}
         t = loader.get_template("email/jobpost_notification.html")
         subject = "InaWorks New JobPost"
@@ -692,6 +695,9 @@ def edit_job(request, job_post_id):
         validate_form.save_m2m()
         validate_post.job_interview_location.clear()
         adding_other_fields_data(request.POST, validate_post, request.user)
+        validate_post.log_change(
+            "Live" if validate_post.status == "Live" else "Updated"
+        )
         data = {
             "error": False,
             "response": "Jobpost Updated Successfully",
@@ -709,6 +715,7 @@ def delete_job(request, job_post_id):
     job_post.status = "Disabled"
     job_post.closed_date = timezone.now()
     job_post.save()
+    job_post.log_change("Disabled")
     data = {"error": False, "response": "Job Post deleted Successfully"}
     return JsonResponse(data, status=status.HTTP_200_OK)
 
@@ -805,7 +812,6 @@ def edit_profile(request):
         user.technical_skills.add(*request.data.getlist("technical_skills"))
         user.industry.add(*request.data.getlist("industry"))
         user.functional_area.add(*request.data.getlist("functional_area"))
-        user.profile_completeness = user.profile_completion_percentage
         user.save()
         data = {"error": False, "response": '', "is_login": user_login}
         return JsonResponse(data, status=status.HTTP_200_OK)
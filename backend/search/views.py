@@ -19,6 +19,10 @@ from mpcomp.views import (
     get_meta_data,
     get_404_meta,
 )
+from mpcomp.conditional import listing_condition
+from mpcomp.db_router import read_replica
+from mpcomp.page_cache import page_cache, tag_page
+from mpcomp.search_log import log_search
 from peeldb.models import (
     City,
     FunctionalArea,
@@ -29,9 +33,8 @@ from peeldb.models import (
     State,
 )
 from pjob.refine_search import refined_search
-from pjob.views import get_page_number
+from pjob.views import facet_jobs, get_page_number
 from search.forms import JobSearchForm
-from dashboard.tasks import save_search_results
 
 
 # class search_job(SearchView):
@@ -174,6 +177,22 @@ def custom_search(data, request):
     return {"job_list": []}
 
 
+def skill_location_facet(job_type=None):
+    def facet_func(skill_name, city_name, **kwargs):
+        final_skill = get_valid_skills_list(skill_name)
+        final_location = get_valid_locations_list(city_name)
+        if not final_location or not final_skill:
+            return None
+        return facet_jobs(
+            job_type, refine_skill=final_skill, refine_location=final_location
+        )
+
+    return facet_func
+
+
+@read_replica()
+@listing_condition(skill_location_facet())
+@page_cache
 def custome_search(request, skill_name, city_name, **kwargs):
     current_url = reverse(
         "custome_search", kwargs={"skill_name": skill_name, "city_name": city_name}
@@ -186,7 +205,7 @@ def custome_search(request, skill_name, city_name, **kwargs):
     final_skill = get_valid_skills_list(skill_name)
     final_location = get_valid_locations_list(city_name)
     if request.POST:
-        save_search_results.delay(
+        log_search(
             request.META["REMOTE_ADDR"], request.POST, 0, request.user.id
         )
     if not final_location or not final_skill:
@@ -241,6 +260,7 @@ def custome_search(request, skill_name, city_name, **kwargs):
             page, no_pages
         )
         job_list = job_list[(page - 1) * items_per_page : page * items_per_page]
+        tag_page(request, job_list, skill=searched_skills, city=searched_locations)
         meta_title, meta_description, h1_tag = get_meta_data(
             "skill_location_jobs",
             {
@@ -294,6 +314,9 @@ def custome_search(request, skill_name, city_name, **kwargs):
         )
 
 
+@read_replica()
+@listing_condition(skill_location_facet("walk-in"))
+@page_cache
 def custom_walkins(request, skill_name, city_name, **kwargs):
     current_url = reverse(
         "custom_walkins", kwargs={"skill_name": skill_name, "city_name": city_name}
@@ -307,7 +330,7 @@ def custom_walkins(request, skill_name, city_name, **kwargs):
     final_location = get_valid_locations_list(city_name)
     if not final_location or not final_skill:
         if request.POST:
-            save_search_results.delay(
+            log_search(
                 request.META["REMOTE_ADDR"], request.POST, 0, request.user.id
             )
         location = final_location or [city_name]
@@ -365,6 +388,13 @@ def custom_walkins(request, skill_name, city_name, **kwargs):
             page, no_pages
         )
         job_list = job_list[(page - 1) * items_per_page : page * items_per_page]
+        tag_page(
+            request,
+            job_list,
+            job_type="walk-in",
+            skill=searched_skills,
+            city=searched_locations,
+        )
         meta_title, meta_description, h1_tag = get_meta_data(
             "skill_location_walkin_jobs",
             {
@@ -419,6 +449,7 @@ def custom_walkins(request, skill_name, city_name, **kwargs):
         )
 
 
+@read_replica()
 def skill_auto_search(request):
     text = request.GET.get("text", "").split(", ")[:-1]
     search = request.GET.get("q", "")
@@ -457,6 +488,7 @@ def skill_auto_search(request):
     return HttpResponse(the_data, content_type="application/json")
 
 
+@read_replica()
 def city_auto_search(request):
     text = request.GET.get("text", "").split(", ")[:-1]
     search = request.GET.get("location", "")
@@ -490,6 +522,7 @@ def city_auto_search(request):
     return HttpResponse(the_data, content_type="application/json")
 
 
+@read_replica()
 def industry_auto_search(request):
     search_term = request.GET.get("industry", "")
     print(f"Debug: Search term: '{search_term}'")
@@ -530,6 +563,7 @@ def industry_auto_search(request):
     return HttpResponse(the_data, content_type="application/json")
 
 
+@read_replica()
 def functional_area_auto_search(request):
     sqs = (
         SearchQuerySet()
@@ -547,6 +581,7 @@ def functional_area_auto_search(request):
     return HttpResponse(the_data, content_type="application/json")
 
 
+@read_replica()
 def education_auto_search(request):
     degrees = (
         SearchQuerySet()
@@ -570,6 +605,7 @@ def education_auto_search(request):
     return HttpResponse(the_data, content_type="application/json")
 
 
+@read_replica()
 def state_auto_search(request):
     text = request.GET.get("text", "").split(", ")[:-1]
     states = (
@@ -596,6 +632,7 @@ def state_auto_search(request):
     return HttpResponse(the_data, content_type="application/json")
 
 
+@read_replica()
 def search_slugs(request):
     searched = request.GET.get("q_slug", "").replace("jobs", "").replace("job", "")
     search_list = [i.strip() for i in searched.split(",") if i.strip()]